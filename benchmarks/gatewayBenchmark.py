@@ -0,0 +1,296 @@
+# ==============================================================================
+# GATEWAY BENCHMARK
+#
+# Headless throughput / latency benchmark of the message bus.
+#
+# It starts a real processGateway and drives it with synthetic producer and
+# consumer processes built on messageHandlerSender / messageHandlerSubscriber,
+# exactly like the car's processes do. Each case of the sweep combines:
+#   - payload:      "lane"  -> LaneData-sized dict
+#                   "frame" -> base64 JPEG-sized string (lores camera frame)
+#   - subscribers:  number of consumer processes subscribed to every message
+#   - critical:     fraction of the messages sent on the Critical queue
+#
+# REPORTED PER CASE:
+#   - msgs/s delivered (summed over subscribers) and msgs/s accepted by the bus
+#   - drain time (how long the subscribers kept receiving after the producers
+#     stopped)
+#   - p50 / p99 / p999 end-to-end latency (send() -> receive()), per priority
+#   - drops   (messages sent but never received by a subscriber)
+#   - evicted (messages discarded by each full gateway queue; the queues are
+#              bounded like in main.py, see boundedQueue.py)
+#   - backlog (messages still queued in front of the gateway when the
+#              producers stop)
+#
+# USAGE (from the repository root):
+#   python3 benchmarks/gatewayBenchmark.py --duration 5 --output gateway.json
+#   python3 benchmarks/gatewayBenchmark.py --payloads lane --subscribers 1 4 8
+#
+# The JSON output contains the git commit and machine description so runs can
+# be compared across commits.
+# ==============================================================================
+
+import sys
+sys.path.append(".")
+
+import argparse
+import base64
+import json
+import logging
+import os
+import platform
+import subprocess
+import time
+from enum import Enum
+from multiprocessing import Event, Process, Queue
+from multiprocessing.connection import wait
+
+import src.utils.messages.allMessages as allMessages
+from src.gateway.processGateway import processGateway
+from src.utils.messages.boundedQueue import boundedQueue, QUEUE_CAPACITY
+from src.utils.messages.mailboxChannel import mailboxChannel
+from src.utils.messages.messageHandlerSender import messageHandlerSender
+from src.utils.messages.messageHandlerSubscriber import messageHandlerSubscriber
+
+
+# ===================================== MESSAGES =========================================
+
+class BenchCritical(Enum):
+    Queue = "Critical"
+    Owner = "gatewayBenchmark"
+    msgID = 1
+    msgType = "dict"
+
+class BenchGeneral(Enum):
+    Queue = "General"
+    Owner = "gatewayBenchmark"
+    msgID = 2
+    msgType = "dict"
+
+
+def make_payload(kind):
+    """Builds the synthetic payload of a case."""
+    if kind == "lane":
+        return {"e_y": 0.0123, "theta_e": -0.0456, "reliability": 1.0}
+    if kind == "frame":
+        # A 512x270 lores JPEG is roughly 25-35 kB, i.e. ~40 kB once base64 encoded
+        return base64.b64encode(os.urandom(30000)).decode("utf-8")
+    raise ValueError(f"Unknown payload {kind}")
+
+
+def percentile(sortedValues, fraction):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sortedValues:
+        return None
+    index = min(len(sortedValues) - 1, max(0, int(round(fraction * len(sortedValues))) - 1))
+    return sortedValues[index]
+
+
+# ===================================== WORKERS ==========================================
+
+def producer(queueList, payloadKind, criticalRatio, rate, duration, startEvent, results):
+    """Sends messages for 'duration' seconds, at 'rate' msgs/s (0 = as fast as possible)."""
+    payload = make_payload(payloadKind)
+    criticalSender = messageHandlerSender(queueList, BenchCritical)
+    generalSender = messageHandlerSender(queueList, BenchGeneral)
+    sent = {"Critical": 0, "General": 0}
+    period = 1.0 / rate if rate > 0 else 0.0
+    accumulator = 0.0
+
+    startEvent.wait()
+    start = time.perf_counter()
+    nextSend = start
+    while time.perf_counter() - start < duration:
+        accumulator += criticalRatio
+        if accumulator >= 1.0:
+            accumulator -= 1.0
+            criticalSender.send({"t": time.perf_counter(), "data": payload})
+            sent["Critical"] += 1
+        else:
+            generalSender.send({"t": time.perf_counter(), "data": payload})
+            sent["General"] += 1
+        if period:
+            nextSend += period
+            delay = nextSend - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+    results.put(("producer", sent, (start, time.perf_counter())))
+
+
+def consumer(queueList, readyEvent, stopEvent, results):
+    """Receives every message (FIFO) and records its end-to-end latency."""
+    subscribers = {
+        "Critical": messageHandlerSubscriber(queueList, BenchCritical, "fifo", True, receiver=f"bench{os.getpid()}"),
+        "General": messageHandlerSubscriber(queueList, BenchGeneral, "fifo", True, receiver=f"bench{os.getpid()}"),
+    }
+    latencies = {"Critical": [], "General": []}
+    readyEvent.set()
+
+    lastReceive = None
+    idleSince = None
+    while True:
+        ready = wait(list(subscribers.values()), timeout=0.05)
+        if ready:
+            idleSince = None
+            for name, subscriber in subscribers.items():
+                while subscriber.is_data_in_pipe():
+                    message = subscriber.receive()
+                    lastReceive = time.perf_counter()
+                    latencies[name].append(lastReceive - message["t"])
+        elif stopEvent.is_set():
+            # stop once the bus has been quiet for a moment, so in-flight messages are counted
+            if idleSince is None:
+                idleSince = time.perf_counter()
+            elif time.perf_counter() - idleSince > 0.5:
+                break
+    results.put(("consumer", latencies, lastReceive))
+
+
+# ===================================== CASE =============================================
+
+def run_case(payloadKind, subscriberCount, criticalRatio, duration, rate, producers):
+    """Runs one benchmark case against a fresh gateway and returns its statistics."""
+    queueList = {name: boundedQueue(capacity) for name, capacity in QUEUE_CAPACITY.items()}
+    gateway = processGateway(queueList, logging.getLogger())
+    gateway.daemon = True
+    gateway.start()
+
+    results = Queue()
+    startEvent = Event()
+    stopEvent = Event()
+
+    consumers = []
+    for _ in range(subscriberCount):
+        readyEvent = Event()
+        proc = Process(target=consumer, args=(queueList, readyEvent, stopEvent, results), daemon=True)
+        proc.start()
+        readyEvent.wait(5)
+        consumers.append(proc)
+    # The gateway has no subscription acknowledgement: give it time to apply the Config queue
+    time.sleep(0.5)
+
+    producerProcs = [
+        Process(target=producer, args=(queueList, payloadKind, criticalRatio, rate, duration, startEvent, results), daemon=True)
+        for _ in range(producers)
+    ]
+    for proc in producerProcs:
+        proc.start()
+    startEvent.set()
+
+    sent = {"Critical": 0, "General": 0}
+    sendStart, sendEnd = None, None
+    for _ in producerProcs:
+        _, producerSent, (start, end) = results.get()
+        for name in sent:
+            sent[name] += producerSent[name]
+        sendStart = start if sendStart is None else min(sendStart, start)
+        sendEnd = end if sendEnd is None else max(sendEnd, end)
+    backlog = {name: queueList[name].qsize() for name in ("Critical", "Warning", "General")}
+    stopEvent.set()
+
+    latencies = {"Critical": [], "General": []}
+    deliveryEnd = sendStart
+    for _ in consumers:
+        _, consumerLatencies, lastReceive = results.get()
+        for name in latencies:
+            latencies[name].extend(consumerLatencies[name])
+        if lastReceive is not None:
+            deliveryEnd = max(deliveryEnd, lastReceive)
+
+    for proc in producerProcs + consumers:
+        proc.join(2)
+    gateway.stop()
+    gateway.join(2)
+    if gateway.is_alive():
+        gateway.terminate()
+
+    # perf_counter() is a system-wide monotonic clock, so timestamps from different processes are comparable
+    sendTime = sendEnd - sendStart
+    deliveryTime = deliveryEnd - sendStart
+    received = sum(len(values) for values in latencies.values())
+    expected = sum(sent.values()) * subscriberCount
+    case = {
+        "payload": payloadKind,
+        "payload_bytes": len(json.dumps(make_payload(payloadKind))),
+        "subscribers": subscriberCount,
+        "critical_ratio": criticalRatio,
+        "producers": producers,
+        "target_rate": rate,
+        "sent": sent,
+        "received": received,
+        "sent_msgs_per_s": sum(sent.values()) / sendTime if sendTime else 0.0,
+        "delivered_msgs_per_s": received / deliveryTime if deliveryTime > 0 else 0.0,
+        "drain_s": max(0.0, deliveryEnd - sendEnd),
+        "drops": max(0, expected - received),
+        "backlog": backlog,
+        "evicted": {name: queueList[name].dropped() for name in ("Critical", "Warning", "General")},
+        "latency_ms": {},
+    }
+    for name, values in latencies.items():
+        values.sort()
+        case["latency_ms"][name] = {
+            "count": len(values),
+            "p50": None if not values else percentile(values, 0.50) * 1000,
+            "p99": None if not values else percentile(values, 0.99) * 1000,
+            "p999": None if not values else percentile(values, 0.999) * 1000,
+            "max": None if not values else values[-1] * 1000,
+        }
+    return case
+
+
+def describe_environment():
+    """Collects what is needed to compare runs across commits and machines."""
+    try:
+        commit = subprocess.check_output(["git", "rev-parse", "HEAD"], stderr=subprocess.DEVNULL).decode().strip()
+    except Exception:
+        commit = None
+    return {
+        "commit": commit,
+        "date": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+    }
+
+
+# ===================================== MAIN =============================================
+
+def main():
+    parser = argparse.ArgumentParser(description="Throughput and latency benchmark of processGateway.")
+    parser.add_argument("--payloads", nargs="+", default=["lane", "frame"], choices=["lane", "frame"])
+    parser.add_argument("--subscribers", nargs="+", type=int, default=[1, 4, 8])
+    parser.add_argument("--critical-ratios", nargs="+", type=float, default=[0.0, 0.1, 0.5])
+    parser.add_argument("--duration", type=float, default=3.0, help="seconds of sending per case")
+    parser.add_argument("--rate", type=float, default=0.0, help="msgs/s per producer, 0 = as fast as possible")
+    parser.add_argument("--producers", type=int, default=1)
+    parser.add_argument("--output", default="gateway_benchmark.json")
+    args = parser.parse_args()
+
+    report = {"environment": describe_environment(), "cases": []}
+    # Mailboxes (e.g. the gateway's SubscriberCount) are owned here as main.py would, and removed at the end
+    mailboxChannel.create_all(allMessages)
+    try:
+        for payloadKind in args.payloads:
+            for subscriberCount in args.subscribers:
+                for criticalRatio in args.critical_ratios:
+                    case = run_case(payloadKind, subscriberCount, criticalRatio, args.duration, args.rate, args.producers)
+                    report["cases"].append(case)
+                    general = case["latency_ms"]["General"]
+                    critical = case["latency_ms"]["Critical"]
+                    print(
+                        f"[Gateway Benchmark] {payloadKind:5s} subs={subscriberCount:2d} crit={criticalRatio:.2f} | "
+                        f"{case['delivered_msgs_per_s']:9.0f} msgs/s | "
+                        f"general p50/p99/p999 = {general['p50'] or 0:.2f}/{general['p99'] or 0:.2f}/{general['p999'] or 0:.2f} ms | "
+                        f"critical p99 = {critical['p99'] or 0:.2f} ms | drops={case['drops']} evicted={sum(case['evicted'].values())} backlog={sum(case['backlog'].values())}"
+                    )
+    finally:
+        mailboxChannel.release_all()
+
+    with open(args.output, "w") as file:
+        json.dump(report, file, indent=4)
+    print(f"[Gateway Benchmark] Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
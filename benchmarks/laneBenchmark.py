@@ -0,0 +1,248 @@
+# ==============================================================================
+# LANE BENCHMARK
+#
+# Offline latency benchmark and regression test of the lane perception,
+# without the camera.
+#
+# Recorded 512x270 BGR lores frames (a directory of images, sorted by name,
+# or a video, read with replaySource) are fed through the code the car runs:
+#   - stage by stage: bevRemap.warp -> HSV conversion -> white mask
+#     -> window search / tracking -> polynomial fit -> filtering
+#     (threadLane.calculate_filtered_data)
+#   - end to end: threadLane.thread_work, the frame published in a
+#     latestFrame exactly like threadCamera does, LaneData read back from
+#     its mailbox
+# Without --frames / --video, the synthetic drive of frameSources.py is used:
+# a lane drawn in the Bird's Eye View with a drifting offset and curvature,
+# warped back into the camera view with the calibration of bevCalibration.json.
+#
+# REPORTED:
+#   - p50 / p99 / max time per frame of every stage and of thread_work
+#   - e_y / theta_e / curvature / reliability of every frame (LaneData)
+#
+# REGRESSION: the LaneData of every frame is compared with a golden file
+# (--golden); --write-golden stores the current ones instead. An algorithm
+# speedup must not change the steering inputs beyond the tolerances. The
+# golden LaneData of the synthetic drive (600 frames) is kept in
+# benchmarks/laneGolden.json and checked by default: a plain run reports
+# regressions (a shorter --count is compared with its first frames).
+#
+# USAGE (from the repository root):
+#   python3 benchmarks/laneBenchmark.py --output lane.json
+#   python3 benchmarks/laneBenchmark.py --write-golden          # after an intended change
+#   python3 benchmarks/laneBenchmark.py --frames run1/ --golden run1.golden.json --write-golden
+#   python3 benchmarks/laneBenchmark.py --video run1.avi --golden run1.golden.json
+# ==============================================================================
+
+import sys
+sys.path.append(".")
+
+import argparse
+import json
+import logging
+import time
+
+import cv2
+
+import src.utils.messages.allMessages as allMessages
+from src.utils.messages.allMessages import LaneData
+from src.utils.messages.mailboxChannel import mailboxChannel
+from src.utils.messages.messageHandlerSubscriber import messageHandlerSubscriber
+from src.hardware.camera.threads.frameSources import replaySource, synthetic_frames
+from src.hardware.camera.threads.laneTracker import laneTracker
+from src.hardware.camera.threads.latestFrame import latestFrame
+from src.hardware.camera.threads.threadLane import threadLane
+
+sys.path.append("benchmarks")
+from lidarBenchmark import summary, describe_environment
+
+STAGES = ("remap", "hsv", "mask", "windows", "fit", "filter", "thread_work")
+SYNTHETIC_GOLDEN = "benchmarks/laneGolden.json"
+
+
+# ===================================== FRAMES ===========================================
+
+def read_frames(path, size):
+    """Yields the recorded frames of a video or a directory of images, resized to 'size' if needed."""
+    source = replaySource(path, speed=0.0, lores_size=size)
+    if not source.start():
+        return
+    try:
+        while True:
+            frames = source.capture()
+            if frames is None:
+                return
+            yield frames[1]
+    finally:
+        source.stop()
+
+
+# ===================================== PIPELINE =========================================
+
+class timedLaneTracker(laneTracker):
+    """laneTracker recording the time of each of its stages in 'times'."""
+
+    def __init__(self, *args, **kwargs):
+        super(timedLaneTracker, self).__init__(*args, **kwargs)
+        self.times = dict.fromkeys(("hsv", "mask", "windows", "fit"), 0.0)
+
+    def mask(self, roi_frame):
+        start = time.perf_counter()
+        hsv = cv2.cvtColor(roi_frame, cv2.COLOR_BGR2HSV)
+        converted = time.perf_counter()
+        mask = cv2.inRange(hsv, self.lower_white, self.upper_white)
+        self.times["hsv"] += converted - start
+        self.times["mask"] += time.perf_counter() - converted
+        return mask
+
+    def _bases(self, mask):
+        start = time.perf_counter()
+        bases = super(timedLaneTracker, self)._bases(mask)
+        self.times["windows"] += time.perf_counter() - start
+        return bases
+
+    def _follow(self, mask, base, previous):
+        start = time.perf_counter()
+        pixels = super(timedLaneTracker, self)._follow(mask, base, previous)
+        self.times["windows"] += time.perf_counter() - start
+        return pixels
+
+    def _fit(self, rows, cols):
+        start = time.perf_counter()
+        fit = super(timedLaneTracker, self)._fit(rows, cols)
+        self.times["fit"] += time.perf_counter() - start
+        return fit
+
+
+def make_lane(frames):
+    """A threadLane reading from 'frames', outside any process."""
+    queues = {name: None for name in ("Critical", "Warning", "General", "Config")}
+    return threadLane(queues, logging.getLogger("laneBenchmark"), False, {"frames": frames})
+
+
+def run(frames):
+    """Feeds the frames through the staged pipeline and through thread_work."""
+    staged = make_lane(latestFrame())
+    bev = staged.bev
+    staged.tracker = timedLaneTracker(bev.width, bev.height, staged.lower_white, staged.upper_white,
+                                      roi_top=bev.roi_fraction)
+    published = latestFrame()
+    lane = make_lane(published)
+    laneData = messageHandlerSubscriber({}, LaneData, "lastOnly", True)
+
+    timings = {name: [] for name in STAGES}
+    outputs = []
+    start = time.perf_counter()
+    for seq, frame in enumerate(frames, 1):
+        # Stage by stage
+        times = staged.tracker.times
+        for name in times:
+            times[name] = 0.0
+        t0 = time.perf_counter()
+        roi_frame = bev.warp(frame)
+        t1 = time.perf_counter()
+        staged.calculate_filtered_data(roi_frame)
+        t2 = time.perf_counter()
+        timings["remap"].append(t1 - t0)
+        for name, value in times.items():
+            timings[name].append(value)
+        timings["filter"].append(max(0.0, (t2 - t1) - sum(times.values())))
+
+        # End to end, as on the car
+        published.publish(frame, time.perf_counter(), seq)
+        t3 = time.perf_counter()
+        lane.thread_work()
+        timings["thread_work"].append(time.perf_counter() - t3)
+        data = laneData.receive()
+        outputs.append({key: round(float(value), 6) for key, value in data.items()} if data is not None else None)
+    elapsed = time.perf_counter() - start
+
+    return {
+        "frames": len(outputs),
+        "elapsed_s": elapsed,
+        "skipped_frames": lane.skipped_frames,
+        "stage_ms": {name: summary(values) for name, values in timings.items()},
+    }, outputs
+
+
+def compare(outputs, golden, e_y_tol=1e-4, theta_tol=1e-4, curvature_tol=1e-3, reliability_tol=1e-6):
+    """Returns the frames whose LaneData differs from the golden one."""
+    tolerances = {"e_y": e_y_tol, "theta_e": theta_tol, "curvature": curvature_tol, "reliability": reliability_tol}
+    mismatches = []
+    if len(outputs) != len(golden):
+        mismatches.append({"frames": len(outputs), "golden_frames": len(golden)})
+    for index, (current, expected) in enumerate(zip(outputs, golden)):
+        if current is None or expected is None:
+            same = current is None and expected is None
+        else:
+            same = all(abs(current.get(key, 0.0) - value) <= tolerances.get(key, 0.0) for key, value in expected.items())
+        if not same:
+            mismatches.append({"frame": index, "current": current, "golden": expected})
+    return mismatches
+
+
+# ===================================== MAIN =============================================
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline benchmark and regression test of the lane perception.")
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument("--frames", default=None, help="directory of recorded frames, synthetic when missing")
+    source.add_argument("--video", default=None, help="recorded video, synthetic when missing")
+    parser.add_argument("--count", type=int, default=600, help="length of the synthetic drive")
+    parser.add_argument("--golden", default=None, help=f"LaneData to compare with, {SYNTHETIC_GOLDEN} for the synthetic drive")
+    parser.add_argument("--write-golden", action="store_true", help="store the LaneData in --golden instead")
+    parser.add_argument("--output", default="lane_benchmark.json")
+    args = parser.parse_args()
+
+    # LaneData travels through a mailbox, owned here as main.py would
+    mailboxChannel.create_all(allMessages)
+    try:
+        bev = make_lane(latestFrame()).bev
+        if args.frames is None and args.video is None:
+            frames = synthetic_frames(bev, args.count)
+            recording = "synthetic"
+        else:
+            frames = read_frames(args.frames or args.video, bev.input_size)
+            recording = args.frames or args.video
+        result, outputs = run(frames)
+    finally:
+        mailboxChannel.release_all()
+    result["recording"] = recording
+    golden_path = args.golden
+    if golden_path is None and recording == "synthetic":
+        golden_path = SYNTHETIC_GOLDEN
+
+    stages = result["stage_ms"]
+    print(
+        f"[Lane Benchmark] {result['frames']} frames | thread_work p50/p99/max = "
+        f"{stages['thread_work']['p50'] or 0:.2f}/{stages['thread_work']['p99'] or 0:.2f}/"
+        f"{stages['thread_work']['max'] or 0:.2f} ms | "
+        + " | ".join(f"{name} p99 = {stages[name]['p99'] or 0:.2f} ms" for name in STAGES[:-1])
+    )
+
+    report = {"environment": describe_environment(), "result": result, "lane_data": outputs}
+    status = 0
+    if golden_path is not None:
+        if args.write_golden:
+            with open(golden_path, "w") as file:
+                json.dump(outputs, file, indent=1)
+            print(f"[Lane Benchmark] Golden LaneData written to {golden_path}")
+        else:
+            with open(golden_path) as file:
+                golden = json.load(file)
+            if args.golden is None:
+                # Default synthetic golden: the drive is deterministic, a shorter run matches its beginning
+                golden = golden[:len(outputs)]
+            mismatches = compare(outputs, golden)
+            report["mismatches"] = mismatches
+            print(f"[Lane Benchmark] {len(mismatches)} frame(s) differ from {golden_path}")
+            status = 1 if mismatches else 0
+
+    with open(args.output, "w") as file:
+        json.dump(report, file, indent=4)
+    print(f"[Lane Benchmark] Results written to {args.output}")
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,281 @@
+# ==============================================================================
+# LIDAR BENCHMARK
+#
+# Offline throughput / latency benchmark and regression test of the Lidar
+# pipeline, without the sensor.
+#
+# A recording of the raw LD19 stream (see ld19Recording.py, made on the car
+# with main.py -> LIDAR_RECORD_PATH) is replayed through the same code the
+# car runs, in a single thread:
+#   ld19Framer -> threadReader.process_packets (decode + polarGrid)
+#              -> threadDetector zones -> obstacleTracker
+# Without --recording, a synthetic recording is generated first: a round
+# room of 3 m radius, a static obstacle on the left and one ahead closing at
+# 0.3 m/s.
+#
+# REPORTED:
+#   - revolutions/s and points/s processed (meaningful with --speed 0)
+#   - p50 / p99 / max time of each stage per revolution and of the whole
+#     pipeline, from the chunk completing a revolution being read to the
+#     tracks being ready (with --speed 0 a chunk holds several revolutions,
+#     so the pipeline time also includes the revolutions before it)
+#   - framer statistics (reads, bad CRCs, skipped bytes)
+#
+# REGRESSION: the zones and tracks of every revolution are compared with a
+# golden file (--golden); --write-golden stores the current ones instead.
+#
+# USAGE (from the repository root):
+#   python3 benchmarks/lidarBenchmark.py --speed 0 --output lidar.json
+#   python3 benchmarks/lidarBenchmark.py --recording run1.ld19 --golden run1.golden.json
+# ==============================================================================
+
+import sys
+sys.path.append(".")
+
+import argparse
+import json
+import logging
+import math
+import os
+import platform
+import struct
+import subprocess
+import tempfile
+import time
+
+import numpy as np
+
+from src.hardware.Lidar.threads import ld19Protocol, obstacleTracker
+from src.hardware.Lidar.threads.ld19Recording import MAGIC, replaySerial
+from src.hardware.Lidar.threads.scanBuffer import scanBuffer
+from src.hardware.Lidar.threads.threadDetector import threadDetector
+from src.hardware.Lidar.threads.threadReader import threadReader
+
+_RECORD = struct.Struct("<dI")
+
+
+# ===================================== SYNTHETIC RECORDING ==============================
+
+def synthesize(path, revolutions, packets_per_rev=38, packets_per_record=4, seed=0):
+    """Writes a synthetic LD19 recording at 10 revolutions/s."""
+    rng = np.random.default_rng(seed)
+    span = 36000 // packets_per_rev
+    period = 0.1 / packets_per_rev
+    obstacles = [
+        # (x, y, radius, vx) in metres, m/s, car frame
+        (2.5, 0.0, 0.10, -0.3),
+        (0.6, 0.6, 0.15, 0.0),
+    ]
+
+    with open(path, "wb") as file:
+        file.write(MAGIC)
+        for rev in range(revolutions):
+            packets = np.zeros(packets_per_rev, dtype=ld19Protocol.PACKET_DTYPE)
+            packets["header"] = ld19Protocol.HEADER
+            packets["verlen"] = ld19Protocol.VERLEN
+            packets["speed"] = 3600
+            start = np.arange(packets_per_rev) * span
+            packets["start_angle"] = start
+            packets["end_angle"] = (start + span * (ld19Protocol.POINTS - 1) // ld19Protocol.POINTS) % 36000
+            packets["timestamp"] = (rev * 100 + np.arange(packets_per_rev) * 100 // packets_per_rev) % 30000
+
+            angle, _, _ = ld19Protocol.packet_points(packets, drop_zero=False)
+            phi = np.radians(angle - obstacleTracker.FORWARD_DEG)
+            dx, dy = np.cos(phi), -np.sin(phi)
+            distance = np.full(angle.size, 3.0)
+            for x, y, radius, vx in obstacles:
+                x = x + vx * rev * 0.1
+                b = dx * x + dy * y
+                disc = b * b - (x * x + y * y) + radius * radius
+                hit = (disc > 0) & (b > 0)
+                distance[hit] = np.minimum(distance[hit], b[hit] - np.sqrt(disc[hit]))
+            distance = distance * 1000.0 + rng.normal(0.0, 5.0, angle.size)
+            points = packets["points"]
+            points["distance"] = np.clip(distance, 1, 65535).astype(np.uint16).reshape(packets_per_rev, -1)
+            points["intensity"] = 200
+            packets["points"] = points
+            packets["crc"] = ld19Protocol.crc8(packets)
+
+            raw = packets.tobytes()
+            size = ld19Protocol.PACKET_SIZE * packets_per_record
+            for index, offset in enumerate(range(0, len(raw), size)):
+                timestamp = rev * 0.1 + index * packets_per_record * period
+                chunk = raw[offset:offset + size]
+                file.write(_RECORD.pack(timestamp, len(chunk)))
+                file.write(chunk)
+
+
+# ===================================== PIPELINE =========================================
+
+def percentile(values, fraction):
+    return values[min(len(values) - 1, int(fraction * len(values)))]
+
+
+def summary(values):
+    values = sorted(values)
+    if not values:
+        return {"p50": None, "p99": None, "max": None}
+    return {"p50": percentile(values, 0.50) * 1000, "p99": percentile(values, 0.99) * 1000, "max": values[-1] * 1000}
+
+
+def finite(value, digits):
+    return None if math.isinf(value) else round(value, digits)
+
+
+class benchmarkReader(threadReader):
+    """threadReader that hands every scan it publishes to the rest of the pipeline right away."""
+
+    def __init__(self, serial_port, on_scan):
+        self.on_scan = on_scan
+        shared_container = {"scans": scanBuffer(readers=1)}
+        super(benchmarkReader, self).__init__(serial_port, shared_container, {}, logging.getLogger("lidarBenchmark"))
+
+    def _publish_scan(self):
+        super(benchmarkReader, self)._publish_scan()
+        scan = self.scans.acquire(self.scans.seq - 1, timeout=0)
+        try:
+            self.on_scan(scan)
+        finally:
+            self.scans.release(scan)
+
+
+def run(recording, speed):
+    """Replays a recording through the pipeline, returning the timings and the detections."""
+    tracker = obstacleTracker.obstacleTracker()
+    timings = {"reader": [], "detector": [], "tracker": [], "pipeline": []}
+    detections = []
+    points = [0]
+    # arrival of the chunk being processed, end of the previous stage
+    clock = {"arrived": 0.0, "mark": 0.0}
+
+    def on_scan(scan):
+        published = time.perf_counter()
+        zones = {}
+        for name, (distance, count) in scan.grid.zones(threadDetector.ZONES).items():
+            zones[name] = distance if count >= threadDetector.MIN_POINTS else math.inf
+        detected = time.perf_counter()
+
+        angle, distance, _ = scan.points()
+        clusters = obstacleTracker.segment(angle, distance)
+        tracks = tracker.update(clusters, scan.sensor_time)
+        tracked = time.perf_counter()
+
+        timings["reader"].append(published - clock["mark"])
+        timings["detector"].append(detected - published)
+        timings["tracker"].append(tracked - detected)
+        timings["pipeline"].append(tracked - clock["arrived"])
+        clock["mark"] = tracked
+        points[0] += scan.size
+        detections.append({
+            "zones": {name: finite(value, 0) for name, value in zones.items()},
+            "tracks": len(tracks),
+            "min_ttc": finite(min((track["ttc"] for track in tracks), default=math.inf), 2),
+        })
+
+    port = replaySerial(recording, speed=speed, timeout=0.2)
+    reader = benchmarkReader(port, on_scan)
+    start = time.perf_counter()
+    while not port.finished:
+        packets = reader.framer.read(port)
+        if packets is None or packets.size == 0:
+            continue
+        clock["arrived"] = clock["mark"] = time.perf_counter()
+        reader.process_packets(packets)
+    elapsed = time.perf_counter() - start
+
+    revolutions = len(detections)
+    return {
+        "recording": recording,
+        "speed": speed,
+        "revolutions": revolutions,
+        "points": points[0],
+        "elapsed_s": elapsed,
+        "revolutions_per_s": revolutions / elapsed if elapsed > 0 else 0.0,
+        "points_per_s": points[0] / elapsed if elapsed > 0 else 0.0,
+        "stage_ms": {name: summary(values) for name, values in timings.items()},
+        "framer": reader.framer.stats(),
+    }, detections
+
+
+def compare(detections, golden, distance_tol=2.0, ttc_tol=0.1):
+    """Returns the revolutions whose detections differ from the golden ones."""
+    mismatches = []
+    if len(detections) != len(golden):
+        mismatches.append({"revolutions": len(detections), "golden_revolutions": len(golden)})
+    for index, (current, expected) in enumerate(zip(detections, golden)):
+        same = current["tracks"] == expected["tracks"]
+        for name, value in expected["zones"].items():
+            other = current["zones"].get(name)
+            same &= (value is None and other is None) or (
+                value is not None and other is not None and abs(value - other) <= distance_tol)
+        a, b = current["min_ttc"], expected["min_ttc"]
+        same &= (a is None and b is None) or (a is not None and b is not None and abs(a - b) <= ttc_tol)
+        if not same:
+            mismatches.append({"revolution": index, "current": current, "golden": expected})
+    return mismatches
+
+
+def describe_environment():
+    """Collects what is needed to compare runs across commits and machines."""
+    try:
+        commit = subprocess.check_output(["git", "rev-parse", "HEAD"], stderr=subprocess.DEVNULL).decode().strip()
+    except Exception:
+        commit = None
+    return {
+        "commit": commit,
+        "date": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+    }
+
+
+# ===================================== MAIN =============================================
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline benchmark and regression test of the Lidar pipeline.")
+    parser.add_argument("--recording", default=None, help="LD19 recording, synthetic when missing")
+    parser.add_argument("--revolutions", type=int, default=300, help="length of the synthetic recording")
+    parser.add_argument("--speed", type=float, default=0.0, help="replay pace, 1.0 = real time, 0 = as fast as possible")
+    parser.add_argument("--golden", default=None, help="detections to compare with")
+    parser.add_argument("--write-golden", action="store_true", help="store the detections in --golden instead")
+    parser.add_argument("--output", default="lidar_benchmark.json")
+    args = parser.parse_args()
+
+    recording = args.recording
+    if recording is None:
+        recording = os.path.join(tempfile.gettempdir(), f"lidar_synthetic_{args.revolutions}.ld19")
+        synthesize(recording, args.revolutions)
+
+    result, detections = run(recording, args.speed)
+    stages = result["stage_ms"]
+    print(
+        f"[Lidar Benchmark] {result['revolutions']} revolutions | {result['revolutions_per_s']:.0f} rev/s | "
+        f"pipeline p50/p99/max = {stages['pipeline']['p50'] or 0:.2f}/{stages['pipeline']['p99'] or 0:.2f}/"
+        f"{stages['pipeline']['max'] or 0:.2f} ms | reader p99 = {stages['reader']['p99'] or 0:.2f} ms | "
+        f"tracker p99 = {stages['tracker']['p99'] or 0:.2f} ms"
+    )
+
+    report = {"environment": describe_environment(), "result": result}
+    status = 0
+    if args.golden is not None:
+        if args.write_golden:
+            with open(args.golden, "w") as file:
+                json.dump(detections, file, indent=1)
+            print(f"[Lidar Benchmark] Golden detections written to {args.golden}")
+        else:
+            with open(args.golden) as file:
+                mismatches = compare(detections, json.load(file))
+            report["mismatches"] = mismatches
+            print(f"[Lidar Benchmark] {len(mismatches)} revolution(s) differ from {args.golden}")
+            status = 1 if mismatches else 0
+
+    with open(args.output, "w") as file:
+        json.dump(report, file, indent=4)
+    print(f"[Lidar Benchmark] Results written to {args.output}")
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
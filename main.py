@@ -48,7 +48,7 @@ available_cores = list(range(psutil.cpu_count()))
 psutil.Process(os.getpid()).cpu_affinity(available_cores)
 
 sys.path.append(".")
-from multiprocessing import Queue, Event
+from multiprocessing import Event
 from src.utils.bigPrintMessages import BigPrint
 from src.utils.outputWriters import QueueWriter, MultiWriter
 import logging
@@ -59,19 +59,43 @@ logging.basicConfig(level=logging.INFO)
 # ===================================== PROCESS IMPORTS ==================================
 
 IS_SIMULATION = False
+# Stamps every message with enqueue/dispatch/receive times and publishes BusLatencyStats once per second
+TRACE_BUS_LATENCY = False
+# Raw LD19 stream: file to record it to, or a recording to replay instead of the sensor (see ld19Recording.py),
+# at the recorded pace (1.0) or as fast as possible (0)
+LIDAR_RECORD_PATH = None
+LIDAR_REPLAY_PATH = None
+LIDAR_REPLAY_SPEED = 1.0
+# Camera frames: recorded video / image directory to replay instead of the camera, or a synthetic drive
+# (see frameSources.py), e.g. to profile the vision pipeline on a machine without the camera
+CAMERA_REPLAY_PATH = None
+CAMERA_REPLAY_SPEED = 1.0
+CAMERA_SYNTHETIC = False
+# Sign detector (processSigns): highest inference rate (Hz), frame-skip policy ("latest" / "oldest")
+# and frames per inference
+SIGNS_INFERENCE_RATE = 10.0
+SIGNS_SKIP_POLICY = "latest"
+SIGNS_BATCH_SIZE = 1
 
 from src.gateway.processGateway import processGateway
 from src.dashboard.processDashboard import processDashboard
 if not IS_SIMULATION:
     from src.hardware.camera.processCamera import processCamera
     from src.hardware.serialhandler.processSerialHandler import processSerialHandler
+    from src.hardware.signs.processSigns import processSigns
+    from src.hardware.camera.threads.frameSources import replaySource, syntheticSource
 else:
     processCamera = None
     processSerialHandler = None
+    processSigns = None
 from src.data.Semaphores.processSemaphores import processSemaphores
 from src.data.TrafficCommunication.processTrafficCommunication import processTrafficCommunication
 from src.utils.messages.messageHandlerSubscriber import messageHandlerSubscriber
+from src.utils.messages.mailboxChannel import mailboxChannel
+from src.utils.messages.boundedQueue import boundedQueue, QUEUE_CAPACITY
+from src.utils.messages import messageTracer
 from src.utils.messages.allMessages import StateChange
+import src.utils.messages.allMessages as allMessages
 from src.statemachine.stateMachine import StateMachine
 from src.statemachine.systemMode import SystemMode
 
@@ -121,15 +145,17 @@ print(BigPrint.PLEASE_WAIT.value)
 allProcesses = list()
 allEvents = list()
 
-queueList = {
-    "Critical": Queue(),
-    "Warning": Queue(),
-    "General": Queue(),
-    "Config": Queue(),
-    "Log": Queue(),
-}
+# Gateway queues, bounded with the capacities of boundedQueue.QUEUE_CAPACITY
+queueList = {name: boundedQueue(capacity) for name, capacity in QUEUE_CAPACITY.items()}
 logger = logging.getLogger()
 
+# Latest-value channels live in shared memory owned by the main process, so they survive process restarts
+mailboxChannel.create_all(allMessages)
+
+# Must be enabled before any process is started, they inherit the flag
+if TRACE_BUS_LATENCY:
+    messageTracer.enable()
+
 original_stdout = sys.stdout
 original_stderr = sys.stderr
 
@@ -157,7 +183,19 @@ processCam = None
 camera_ready = None
 if not IS_SIMULATION:
     camera_ready = Event()
-    processCam = processCamera(queueList, logger, camera_ready, debugging = False)
+    camera_source = None
+    if CAMERA_REPLAY_PATH is not None:
+        camera_source = replaySource(CAMERA_REPLAY_PATH, speed=CAMERA_REPLAY_SPEED, loop=True)
+    elif CAMERA_SYNTHETIC:
+        camera_source = syntheticSource()
+    processCam = processCamera(queueList, logger, camera_ready, debugging = False, source = camera_source)
+
+# Initializing sign detector (reads the camera frames from shared memory)
+processSign = None
+signs_ready = None
+if not IS_SIMULATION:
+    signs_ready = Event()
+    processSign = processSigns(queueList, logger, signs_ready, False, SIGNS_INFERENCE_RATE, SIGNS_SKIP_POLICY, SIGNS_BATCH_SIZE)
 
 # Initializing semaphores
 semaphore_ready = Event()
@@ -179,8 +217,8 @@ allProcesses.extend([processSemaphore, processTrafficCom, processDash])
 allEvents.extend([semaphore_ready, traffic_com_ready, dashboard_ready])
 
 if not IS_SIMULATION:
-    allProcesses.extend([processCam, processSerialHand])
-    allEvents.extend([camera_ready, serial_handler_ready])
+    allProcesses.extend([processCam, processSign, processSerialHand])
+    allEvents.extend([camera_ready, signs_ready, serial_handler_ready])
 
 # ------ New component initialize starts here ------#
 
@@ -228,7 +266,7 @@ try:
             modeDictLidar = SystemMode[message].value.get("Lidar", {}).get("process", {"enabled": False})
             modeDictControl = SystemMode[message].value.get("Control", {}).get("process", {"enabled": False})
 
-            processLid = manage_process_life(processLidar, processLid, [queueList, logger, Lidar_ready, False], modeDictLidar["enabled"], allProcesses)
+            processLid = manage_process_life(processLidar, processLid, [queueList, logger, Lidar_ready, False, LIDAR_RECORD_PATH, LIDAR_REPLAY_PATH, LIDAR_REPLAY_SPEED], modeDictLidar["enabled"], allProcesses)
             processCont = manage_process_life(processControl, processCont, [queueList, logger, Control_ready, False], modeDictControl["enabled"], allProcesses)
 
             modeDictSemaphore = SystemMode[message].value["semaphore"]["process"]
@@ -250,3 +288,5 @@ except KeyboardInterrupt:
     for proc in reversed(allProcesses):
         shutdown_process(proc)
     shutdown_process(processGate)
+
+    mailboxChannel.release_all()
@@ -20,7 +20,8 @@
 #
 # OUTPUT:
 #   - Name: SteerMotor (ID 2) and SpeedMotor (ID 1)
-#   - Format: String (str) as required by the NUCLEO Serial Protocol.
+#   - Format: Integer (int) mm/s and deci-degrees, packed by the message schema;
+#     processSerialHandler formats them for the NUCLEO Serial Protocol.
 #   - Destination: processSerialHandler (via Gateway) -> NUCLEO
 # ==============================================================================
 
@@ -28,7 +29,7 @@ from src.templates.threadwithstop import ThreadWithStop
 from src.utils.messages.messageHandlerSubscriber import messageHandlerSubscriber
 from src.utils.messages.messageHandlerSender import messageHandlerSender
 from src.utils.messages.allMessages import (
-    ControlAction, SpeedMotor, SteerMotor
+    ControlAction, SpeedMotor, SteerMotor, RequestLoopStats, LoopStats
 )
 from src.control.Control.threads.allStates import BehaviorState
 import time
@@ -69,15 +70,20 @@ class threadControl(ThreadWithStop):
         # Senders for the NUCLEO motor and steering actuators
         self.steerSender = messageHandlerSender(self.queuesList, SteerMotor)
         self.speedSender = messageHandlerSender(self.queuesList, SpeedMotor)
+        self.loopStatsSender = messageHandlerSender(self.queuesList, LoopStats)
         
-        # Runs at 100Hz (0.01s) for high-fidelity control response
-        super(threadControl, self).__init__(pause=0.01)
+        # Runs at 100Hz (0.01s) for high-fidelity control response, on fixed deadlines so the
+        # Stanley computation time does not lower the actual rate
+        super(threadControl, self).__init__(pause=0.01, fixed_rate=True)
 
     def subscribe(self):
         """Initializes subscribers for the unified command from threadLogic."""
         self.commandSubscriber = messageHandlerSubscriber(
             self.queuesList, ControlAction, deliveryMode="lastOnly", subscribe=True
         )
+        self.loopStatsSubscriber = messageHandlerSubscriber(
+            self.queuesList, RequestLoopStats, deliveryMode="lastOnly", subscribe=True
+        )
 
     def state_change_handler(self):
         """Standard handler for system mode transitions."""
@@ -88,6 +94,10 @@ class threadControl(ThreadWithStop):
         Main Loop: Behavior Execution.
         Executes the BehaviorState decided by threadFSM.
         """
+        stats_request = self.loopStatsSubscriber.receive()
+        if stats_request is not None:
+            self.loopStatsSender.send(self.loop_stats(reset=stats_request))
+
         new_packet = self.commandSubscriber.receive()
         if new_packet:
             self._last_command = new_packet
@@ -206,8 +216,8 @@ class threadControl(ThreadWithStop):
     def send_commands(self, speed_m_s, steer_deg):
         """
         Scales metric values to the specific units required by the NUCLEO firmware.
-        - Speed: m/s -> mm/s (integer string)
-        - Steer: degrees -> deci-degrees (integer string)
+        - Speed: m/s -> mm/s (integer)
+        - Steer: degrees -> deci-degrees (integer)
         """
         try:
             # Fixes physical camera/servo tilt without re-tuning Stanley
@@ -222,9 +232,9 @@ class threadControl(ThreadWithStop):
             steer_decideg = int(round(steer_deg * 10))
             steer_decideg = np.clip(steer_decideg, -250, 250)
 
-            # DISPATCH to NUCLEO as strings
-            self.speedSender.send(str(speed_mm_s))
-            self.steerSender.send(str(steer_decideg))
+            # DISPATCH to NUCLEO (packed as binary integers, see SpeedMotor/SteerMotor schema)
+            self.speedSender.send(int(speed_mm_s))
+            self.steerSender.send(int(steer_decideg))
 
             if self.debugging:
                 # Log the actual values being sent to serial
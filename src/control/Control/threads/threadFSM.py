@@ -3,8 +3,9 @@ from src.utils.messages.messageHandlerSubscriber import messageHandlerSubscriber
 from src.utils.messages.messageHandlerSender import messageHandlerSender
 from src.control.Control.threads.allStates import BehaviorState, SignType, ObstacleZone, SpeedLimit
 from src.utils.messages.allMessages import (
-    ControlAction, FsmStatus, LaneData, LidarObstacle, SignDetection
+    ControlAction, FsmStatus, LaneData, LidarObstacle, LidarTracks, SignDetection, RequestLoopStats, FsmLoopStats
 )
+import math
 import time
 
 # =============================================================================
@@ -41,6 +42,13 @@ _STRAIGHT_TURN_DUR  =  1.2
 
 _DECEL_RAMP_DURATION = 2.0   # DECELERATION RAMP CONSTANT
 
+# Time-to-collision of the lidar tracks (LidarTracks) that escalates the obstacle zone
+_TTC_DANGER  = 0.8   # s
+_TTC_WARNING = 2.0   # s
+
+# Sign detections of frames captured longer ago than this are ignored (the car has moved on)
+_SIGN_MAX_AGE = 1.0   # s
+
 # =============================================================================
 # PARKING MANEUVER CONSTANTS
 #
@@ -80,7 +88,9 @@ class threadFSM(ThreadWithStop):
         self.lane_info = {"e_y": 0.0, "theta_e": 0.0, "reliability": 0.0}
         self.obstacle_info = {"distance": 9999.0, "reliability": 1.0}
         self.lidar_data_received = False  # True after first real LidarObstacle message
+        self.min_ttc = math.inf           # Closest time-to-collision of the tracked obstacles
         self.active_sign = {"type": None, "distance": 2000.0}
+        self.sign_age = math.inf          # s since the frame of the last SignDetection was captured
         self.current_target_speed = SpeedLimit.CITY_MIN.value
         self.stop_timer_start = None
         self.stop_reason = None  # "SIGN" or "PEDESTRIAN"
@@ -108,9 +118,14 @@ class threadFSM(ThreadWithStop):
         # Action Sender (The output of the FSM)
         self.controlSender = messageHandlerSender(self.queuesList, ControlAction)
         self.fsmStatusSender = messageHandlerSender(self.queuesList, FsmStatus)
+        # Own message: with a shared one the dashboard (lastOnly) would only ever show one of the two loops
+        self.loopStatsSender = messageHandlerSender(self.queuesList, FsmLoopStats)
         self._last_status = None
 
-        super(threadFSM, self).__init__(pause=0.01)  # 100 Hz Decision Loop
+        super(threadFSM, self).__init__(pause=0.01, fixed_rate=True)  # 100 Hz Decision Loop
+        # Signs arrive through the gateway and wake the FSM right away. LaneData, LidarObstacle and LidarTracks are
+        # mailboxes (no pipe to wait on) and are sampled on the 100 Hz deadlines.
+        self.wait_on(self.signSub)
 
     # =========================================================================
     # SENSOR PIPELINE
@@ -129,9 +144,10 @@ class threadFSM(ThreadWithStop):
         if reliability < 0.2:
             return ObstacleZone.DANGER  # Sensor lost mid-run → emergency stop
 
-        if distance < 300.0:
+        # A closing obstacle escalates the zone before it is near
+        if distance < 300.0 or self.min_ttc < _TTC_DANGER:
             return ObstacleZone.DANGER
-        elif distance < 900.0:
+        elif distance < 900.0 or self.min_ttc < _TTC_WARNING:
             return ObstacleZone.WARNING
         else:
             return ObstacleZone.CLEAR
@@ -142,8 +158,12 @@ class threadFSM(ThreadWithStop):
             self.queuesList, LaneData, "lastOnly", True)
         self.lidarSub = messageHandlerSubscriber(
             self.queuesList, LidarObstacle, "lastOnly", True)
+        self.tracksSub = messageHandlerSubscriber(
+            self.queuesList, LidarTracks, "lastOnly", True)
         self.signSub = messageHandlerSubscriber(
             self.queuesList, SignDetection, "lastOnly", True)
+        self.loopStatsSub = messageHandlerSubscriber(
+            self.queuesList, RequestLoopStats, "lastOnly", True)
 
     def update_inputs(self):
         """
@@ -168,7 +188,16 @@ class threadFSM(ThreadWithStop):
             self.obstacle_info['reliability'] = lidar_data.get('reliability', 0.0)
             self.lidar_data_received = True
 
+        tracks_data = self.tracksSub.receive()
+        if tracks_data:
+            self.min_ttc = tracks_data.get('min_ttc', math.inf)
+
         sign_data = self.signSub.receive()
+        if sign_data and 'timestamp' in sign_data:
+            # Capture time of the frame (perf_counter is system-wide, so it compares across processes)
+            self.sign_age = time.perf_counter() - sign_data['timestamp']
+            if self.sign_age > _SIGN_MAX_AGE:
+                sign_data = None
         if sign_data:
             raw_type = sign_data.get('type', None)
             if isinstance(raw_type, SignType):
@@ -347,6 +376,7 @@ class threadFSM(ThreadWithStop):
         if fresh_entry:
             self.lane_info = {"e_y": 0.0, "theta_e": 0.0, "reliability": 0.0}
             self.obstacle_info = {"distance": 2000.0, "reliability": 0.0}
+            self.min_ttc = math.inf
             self.active_sign = {"type": None, "distance": 2000.0}
             self.stop_timer_start = None
             self.stop_reason = None
@@ -588,3 +618,7 @@ class threadFSM(ThreadWithStop):
         self.update_state()
         self.execute_behavior()
         self._publish_status()
+
+        stats_request = self.loopStatsSub.receive()
+        if stats_request is not None:
+            self.loopStatsSender.send(self.loop_stats(reset=stats_request))
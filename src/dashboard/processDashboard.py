@@ -99,6 +99,7 @@ class processDashboard(WorkerProcess):
         # session management
         self.sessionActive = False
         self.activeUser = None
+        self.viewers = set()   # socket ids of the connected clients
 
         # serial connection state
         self.serialConnected = False
@@ -132,12 +133,16 @@ class processDashboard(WorkerProcess):
         """Initialize message handling systems."""
         self.get_name_and_vals()
         self.messagesAndVals.pop("mainCamera", None)
+        self.messagesAndVals.pop("mainCameraFrame", None)
+        self.messagesAndVals.pop("serialCameraFrame", None)
         self.messagesAndVals.pop("Semaphores", None)
         self.subscribe()
     
 
     def _setup_websocket_handlers(self):
         """Setup WebSocket event handlers."""
+        self.socketio.on_event('connect', self.handle_connect)
+        self.socketio.on_event('disconnect', self.handle_disconnect)
         self.socketio.on_event('message', self.handle_message)
         self.socketio.on_event('save', self.handle_save_table_state)
         self.socketio.on_event('load', self.handle_load_table_state)
@@ -254,6 +259,18 @@ class processDashboard(WorkerProcess):
             self.socketio.emit('response', {'error': 'Invalid JSON format'}, room=socketId) # type: ignore
 
 
+    def handle_connect(self, auth=None):
+        """Counts a new client: the camera previews are only encoded while someone is watching."""
+        self.viewers.add(request.sid)
+        self.send_message_to_brain("DashboardViewers", {"Value": len(self.viewers)})
+
+
+    def handle_disconnect(self, *args):
+        """Forgets a client that left."""
+        self.viewers.discard(request.sid)
+        self.send_message_to_brain("DashboardViewers", {"Value": len(self.viewers)})
+
+
     def handle_heartbeat(self):
         """Handle heartbeat message."""
         self.heartbeat_retries = 0
@@ -0,0 +1,142 @@
+# ==============================================================================
+# SUBSCRIBER OUTBOX
+#
+# Flow control between threadGateway and one subscriber pipe.
+#
+# The gateway never blocks on a subscriber pipe: it would block every other
+# subscriber until the slow reader (typically the dashboard) catches up. Messages that cannot be written yet wait in a small
+# bounded outbox; when it is full the message's DropPolicy decides what is
+# lost (declared in allMessages.py, "dropOldest" when missing):
+#   - "dropOldest"     : discard the oldest pending message, keep the new one
+#   - "dropNewest"     : discard the new message, keep the pending ones
+#   - "coalesceLatest" : keep only the newest pending message (outbox of 1)
+#
+# The write end of the pipe is put in non-blocking mode and the gateway
+# writes the framed message itself (the length prefix of
+# multiprocessing.connection, then the payload): a full pipe raises
+# BlockingIOError, which means "no room", whatever the pipe's slot
+# accounting (Linux pipes hold 16 page-sized slots, so many small messages
+# fill one long before its byte capacity). Messages up to PIPE_BUF bytes are
+# written atomically; when only the beginning of a larger one fits, the rest
+# is kept and written first at the next flush, so the stream is never torn.
+# ==============================================================================
+
+import os
+import struct
+from collections import deque
+
+DROP_POLICIES = ("dropoldest", "dropnewest", "coalescelatest")
+
+# Length prefix multiprocessing.connection adds to every message ("!i", or -1 then "!Q" above 2 GiB)
+_LENGTH = struct.Struct("!i")
+_LONG_LENGTH = struct.Struct("!Q")
+# Below this size the prefix and the payload are joined into a single write, as multiprocessing does
+_JOIN_LIMIT = 16384
+
+
+class subscriberOutbox:
+    """Pending messages of one subscriber of one message type.\n
+    Args:
+        receiver (string): Name of the subscriber.
+        pipe (multiprocessing.connection.Connection): Sending end of the subscriber pipe.
+        policy (string, optional): "dropOldest", "dropNewest" or "coalesceLatest". Defaults to "dropOldest".
+        capacity (int, optional): Maximum number of pending messages. Defaults to 64.
+    """
+
+    def __init__(self, receiver, pipe, policy="dropOldest", capacity=64):
+        self.receiver = receiver
+        self.pipe = pipe
+        self.policy = str.lower(policy)
+        if self.policy not in DROP_POLICIES:
+            print("WARNING! Wrong drop policy supplied.", policy, "for", receiver)
+            print("WARNING! Switching to dropOldest")
+            self.policy = "dropoldest"
+        self.capacity = 1 if self.policy == "coalescelatest" else max(1, capacity)
+        self.pending = deque()
+        self.dropped = 0
+        self.broken = False
+
+        # Rest of a message the pipe only took the beginning of (list of memoryviews), None otherwise
+        self._partial = None
+        try:
+            self._fd = pipe.fileno()
+            os.set_blocking(self._fd, False)
+        except (OSError, ValueError):
+            self.broken = True
+
+    def __repr__(self):
+        return f"subscriberOutbox({self.receiver}, {self.policy}, pending={len(self.pending)}, dropped={self.dropped})"
+
+    def waiting(self):
+        """Checks whether messages (or the rest of one) wait for room in the pipe."""
+        return bool(self.pending) or self._partial is not None
+
+    def push(self, envelope):
+        """Writes the message now if the pipe can take it, otherwise queues it in the outbox."""
+        if self.broken:
+            return
+        if not self.waiting() and self._write(envelope):
+            return
+        if len(self.pending) >= self.capacity:
+            self.dropped += 1
+            if self.policy == "dropnewest":
+                return
+            self.pending.popleft()
+        self.pending.append(envelope)
+
+    def flush(self):
+        """Writes as many pending messages as the pipe can take.
+
+        Returns:
+            bool: True if messages are still pending.
+        """
+        while not self.broken:
+            if self._partial is not None:
+                self._partial = self._send(self._partial)
+                if self._partial is not None:
+                    break
+            elif self.pending and self._write(self.pending[0]):
+                self.pending.popleft()
+            else:
+                break
+        return self.waiting() and not self.broken
+
+    def _write(self, envelope):
+        """Starts writing a message.
+
+        Returns:
+            bool: False if the pipe had no room for any of it (the message is not consumed).
+        """
+        size = len(envelope)
+        if size > 0x7fffffff:
+            chunks = [memoryview(_LENGTH.pack(-1) + _LONG_LENGTH.pack(size)), memoryview(envelope)]
+        elif size <= _JOIN_LIMIT:
+            chunks = [memoryview(_LENGTH.pack(size) + envelope)]
+        else:
+            chunks = [memoryview(_LENGTH.pack(size)), memoryview(envelope)]
+        try:
+            written = os.write(self._fd, chunks[0])
+        except BlockingIOError:
+            return False
+        except OSError:
+            self.broken = True
+            return True
+        chunks[0] = chunks[0][written:]
+        self._partial = self._send(chunks)
+        return True
+
+    def _send(self, chunks):
+        """Writes chunks until the pipe is full. Returns the chunks left, None once everything is written."""
+        while chunks:
+            if not len(chunks[0]):
+                chunks.pop(0)
+                continue
+            try:
+                written = os.write(self._fd, chunks[0])
+            except BlockingIOError:
+                return chunks
+            except OSError:
+                self.broken = True
+                return None
+            chunks[0] = chunks[0][written:]
+        return None
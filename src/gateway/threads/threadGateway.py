@@ -28,30 +28,68 @@
 
 
 from src.templates.threadwithstop import ThreadWithStop
+from src.gateway.threads.subscriberOutbox import subscriberOutbox
+from src.utils.messages import allMessages
+from src.utils.messages.messageHandlerSender import messageHandlerSender
+from multiprocessing.connection import wait
+from multiprocessing.reduction import ForkingPickler
+from src.utils.messages.messageSchema import TRACE_SUFFIX
+from enum import Enum
+import queue
 import time
 
+# Priority order used by the dispatcher (highest first).
+_PRIORITY_QUEUES = ("Critical", "Warning", "General")
+
+
 class threadGateway(ThreadWithStop):
     """Thread which will handle processGateway functionalities.\n
     Args:
         queuesList (dictionary of multiprocessing.queues.Queue): Dictionary of queues where the ID is the type of messages.
         logger (logging object): Made for debugging.
         debugger (bool): A flag for debugging.
+        dispatchMode (string, optional): "batch" drains the priority queues in bounded batches and blocks on queue readiness,
+            "single" keeps the legacy one-message-per-cycle polling. Defaults to "batch".
+        batchSize (int, optional): Maximum number of messages forwarded per cycle in "batch" mode. Defaults to 64.
+        idleTimeout (float, optional): Maximum time in seconds the dispatcher blocks waiting for a queue. Defaults to 0.05.
+        outboxSize (int, optional): Messages kept per subscriber while its pipe is full. Defaults to 64.
+        statsInterval (float, optional): Seconds between two GatewayStats messages. Defaults to 1.0.
     """
 
     # ===================================== INIT =========================================
 
-    def __init__(self, queueList, logger, debugging):
-        super(threadGateway, self).__init__(pause=0.001)
+    def __init__(self, queueList, logger, debugging, dispatchMode="batch", batchSize=64, idleTimeout=0.05,
+                 outboxSize=64, statsInterval=1.0):
+        self.dispatchMode = str.lower(dispatchMode)
+        if self.dispatchMode not in ["batch", "single"]:
+            print("WARNING! Wrong dispatch mode supplied.", dispatchMode, "instead of batch or single.")
+            print("WARNING! Switching to batch")
+            self.dispatchMode = "batch"
+
+        # In batch mode the thread blocks inside thread_work, so there is no need for an extra pause.
+        pause = 0.0 if self.dispatchMode == "batch" else 0.001
+        super(threadGateway, self).__init__(pause=pause)
         self.logger = logger
         self.debugging = debugging
         self.sendingList = {}
         self.queuesList = queueList
-        self.messageApproved = []
+        self.routes = {}
+        self.batchSize = batchSize
+        self.idleTimeout = idleTimeout
+        self.outboxSize = outboxSize
+        self.statsInterval = statsInterval
+        self.dropPolicies = self.load_drop_policies()
+        self.pending = set()
+        self.lastStats = time.perf_counter()
+        # Subscribers per (Owner, msgID), published in the SubscriberCount mailbox whenever they change
+        self.subscriberCounts = {}
+        self.countsChanged = True
+        self.subscriberCountSender = messageHandlerSender(self.queuesList, allMessages.SubscriberCount)
 
     # =================================== SUBSCRIBE ======================================
 
     def subscribe(self, message):
-        """This functin will add the pipe into the approved messages list and it will be added into the dictionary of sending
+        """This functin will add the pipe into the dictionary of sending and refresh the routing index of the message
         Args:
             message(dictionary): Dictionary received from the multiprocessing queues ( the config one).
         """
@@ -66,10 +104,12 @@ class threadGateway(ThreadWithStop):
         if not Id in self.sendingList[Owner].keys():
             self.sendingList[Owner][Id] = {}
         # Always overwrite — refreshes stale pipes from restarted processes (e.g. processControl)
-        self.sendingList[Owner][Id][To] = Pipe
-        # Avoid duplicate entries that would cause double-removal on BrokenPipeError
-        if (Owner, Id) not in self.messageApproved:
-            self.messageApproved.append((Owner, Id))
+        previous = self.sendingList[Owner][Id].get(To)
+        if previous is not None:
+            self.pending.discard(previous)
+        policy = self.dropPolicies.get((Owner, Id), "dropOldest")
+        self.sendingList[Owner][Id][To] = subscriberOutbox(To, Pipe, policy, self.outboxSize)
+        self.update_route(Owner, Id)
         # Debugging( you can comment this):
         if self.debugging:
             self.print_list()
@@ -77,7 +117,7 @@ class threadGateway(ThreadWithStop):
     # ================================== UNSUBSCRIBE =====================================
 
     def unsubscribe(self, message):
-        """This functin will remove the pipe into the approved messages list and it will be added into the dictionary of sending
+        """This functin will remove the pipe from the dictionary of sending and refresh the routing index of the message
         Args:
             message(dictionary): Dictionary received from the multiprocessing queues ( the config one).
         """
@@ -87,44 +127,165 @@ class threadGateway(ThreadWithStop):
         To = message["To"]["receiver"]
 
         # We delete the value from Dictionary
-        del self.sendingList[Owner][Id][To]
-        self.messageApproved.remove((Owner, Id))
+        outbox = self.sendingList.get(Owner, {}).get(Id, {}).pop(To, None)
+        if outbox is not None:
+            self.pending.discard(outbox)
+        self.update_route(Owner, Id)
         if self.debugging:
             self.print_list()
 
+    # ================================== ROUTING INDEX ===================================
+
+    def update_route(self, Owner, Id):
+        """Recompiles the routing entry of one message from the sending list.\n
+        The index maps (Owner, msgID) to a tuple of subscriber outboxes, so sending needs a single dict lookup.
+        Messages without subscribers are removed from the index.
+        """
+
+        receivers = self.sendingList.get(Owner, {}).get(Id, {})
+        if receivers:
+            self.routes[(Owner, Id)] = tuple(receivers.values())
+        else:
+            self.routes.pop((Owner, Id), None)
+        if self.subscriberCounts.get((Owner, Id), 0) != len(receivers):
+            self.subscriberCounts[(Owner, Id)] = len(receivers)
+            self.countsChanged = True
+
+    def publish_subscriber_counts(self):
+        """Writes the subscriber table to the SubscriberCount mailbox if it changed (once per cycle)."""
+
+        if not self.countsChanged:
+            return
+        self.countsChanged = False
+        self.subscriberCountSender.send(
+            {f"{Owner}/{Id}": count for (Owner, Id), count in self.subscriberCounts.items() if count > 0}
+        )
+
+    # ================================== DROP POLICIES ===================================
+
+    @staticmethod
+    def load_drop_policies():
+        """Reads the optional DropPolicy of every message declared in allMessages.py.
+
+        Returns:
+            dict: (Owner, msgID) -> drop policy.
+        """
+
+        policies = {}
+        for value in vars(allMessages).values():
+            if isinstance(value, type) and issubclass(value, Enum) and value is not Enum:
+                policy = getattr(value, "DropPolicy", None)
+                if policy is not None:
+                    policies[(value.Owner.value, value.msgID.value)] = policy.value
+        return policies
+
     # =================================== SENDING ========================================
 
     def send(self, message):
-        """This functin will send the message on all the pipes that are in the sending list of the message ID.
+        """This functin will send the message on all the pipes that are routed for the message ID.\n
+        The envelope is pickled once and the same bytes are handed to every subscriber outbox. A subscriber whose
+        pipe is full keeps the message in its outbox, so one slow reader never blocks the others.
         Args:
             message(dictionary): Dictionary received from the multiprocessing queues ( the config one).
         """
 
         Owner = message["Owner"]
         Id = message["msgID"]
-        Type = message["msgType"]
-        Value = message["msgValue"]
-        if (Owner, Id) in self.messageApproved:
-            broken = []
-            for element in self.sendingList[Owner][Id]:
-                try:
-                    # We send a dictionary that contain the type of the message and message
-                    self.sendingList[Owner][Id][element].send(
-                        {"Type": Type, "value": Value, "id": Id, "Owner": Owner}
-                    )
-                    if self.debugging:
-                        self.logger.warning(message)
-                except (BrokenPipeError, OSError):
-                    broken.append(element)
-            for element in broken:
-                del self.sendingList[Owner][Id][element]
-            # Only remove from approved if NO subscribers remain — removing on every broken pipe
-            # would kill delivery to all other valid subscribers for this message type.
-            if not self.sendingList[Owner][Id]:
-                try:
-                    self.messageApproved.remove((Owner, Id))
-                except ValueError:
-                    pass
+        route = self.routes.get((Owner, Id))
+        if route is None:
+            return
+
+        if message.get("Packed"):
+            # Schema messages are already packed by the sender: the subscribers unpack the raw bytes
+            envelope = message["msgValue"]
+            if "t0" in message:
+                envelope += TRACE_SUFFIX.pack(message["t0"], time.perf_counter())
+        else:
+            # We send a dictionary that contain the type of the message and message
+            forwarded = {"Type": message["msgType"], "value": message["msgValue"], "id": Id, "Owner": Owner}
+            if "t0" in message:
+                # Traced message (see messageTracer.py): add the dispatch time
+                forwarded["t0"] = message["t0"]
+                forwarded["t1"] = time.perf_counter()
+            envelope = ForkingPickler.dumps(forwarded)
+        broken = []
+        for outbox in route:
+            outbox.push(envelope)
+            if outbox.broken:
+                broken.append(outbox)
+            elif outbox.waiting():
+                self.pending.add(outbox)
+        if self.debugging:
+            self.logger.warning(message)
+
+        # Only the broken receivers are dropped, every other subscriber keeps receiving this message type.
+        if broken:
+            for outbox in broken:
+                self.remove_broken(Owner, Id, outbox)
+            self.update_route(Owner, Id)
+
+    def remove_broken(self, Owner, Id, outbox):
+        """Removes a subscriber whose pipe is closed (its process stopped)."""
+
+        receivers = self.sendingList.get(Owner, {}).get(Id, {})
+        if receivers.get(outbox.receiver) is outbox:
+            del receivers[outbox.receiver]
+        self.pending.discard(outbox)
+
+    def flush_pending(self):
+        """Writes the pending messages of the subscribers whose pipes have room again."""
+
+        for outbox in list(self.pending):
+            if not outbox.flush():
+                self.pending.discard(outbox)
+            if outbox.broken:
+                for (Owner, Id), route in list(self.routes.items()):
+                    if outbox in route:
+                        self.remove_broken(Owner, Id, outbox)
+                        self.update_route(Owner, Id)
+
+    # ==================================== STATISTICS ====================================
+
+    def publish_stats(self):
+        """Sends a GatewayStats message with the backlog of the queues and the dropped message counts."""
+
+        now = time.perf_counter()
+        if now - self.lastStats < self.statsInterval:
+            return
+        self.lastStats = now
+
+        queues = {}
+        for name in _PRIORITY_QUEUES + ("Config", "Log"):
+            gatewayQueue = self.queuesList.get(name)
+            if gatewayQueue is None:
+                continue
+            try:
+                backlog = gatewayQueue.qsize()
+            except NotImplementedError:
+                backlog = None   # not available on macOS
+            dropped = getattr(gatewayQueue, "dropped", None)
+            queues[name] = {"backlog": backlog, "dropped": dropped() if dropped is not None else 0}
+
+        subscribers = {}
+        for Owner, messages in self.sendingList.items():
+            for Id, receivers in messages.items():
+                for receiver, outbox in receivers.items():
+                    if outbox.dropped or outbox.pending:
+                        subscribers[f"{Owner}/{Id}/{receiver}"] = {"dropped": outbox.dropped, "pending": len(outbox.pending)}
+
+        self.send(
+            {
+                "Owner": allMessages.GatewayStats.Owner.value,
+                "msgID": allMessages.GatewayStats.msgID.value,
+                "msgType": allMessages.GatewayStats.msgType.value,
+                "msgValue": {
+                    "queues": queues,
+                    "subscribers": subscribers,
+                    "dropped": sum(queue["dropped"] for queue in queues.values())
+                    + sum(subscriber["dropped"] for subscriber in subscribers.values()),
+                },
+            }
+        )
 
     # ====================================================================================
 
@@ -140,7 +301,80 @@ class threadGateway(ThreadWithStop):
         """This function will take the messages in priority order form the queues.\n
         the prioirty is: Critical > Warning > General
         """
-        
+        if self.dispatchMode == "batch":
+            self.dispatch_batch()
+        else:
+            self.dispatch_single()
+
+    def dispatch_batch(self):
+        """Forwards up to batchSize messages per cycle, always taking the next message from the highest priority
+        queue that has one. Config messages are handled first so new subscribers see the messages of this batch.
+        When every queue is empty the thread blocks until one of them becomes readable (or idleTimeout passes).
+        """
+
+        self.handle_config()
+
+        if self.pending:
+            self.flush_pending()
+
+        forwarded = 0
+        while forwarded < self.batchSize:
+            message = self.get_next_message()
+            if message is None:
+                break
+            self.send(message)
+            forwarded += 1
+
+        self.publish_subscriber_counts()
+        self.publish_stats()
+        if forwarded == 0:
+            self.wait_for_messages()
+
+    def get_next_message(self):
+        """Returns the next message in priority order without blocking, or None if every queue is empty.
+        boundedQueue.get_nowait() waits out a producer evicting from a full queue (see boundedQueue.py), so a busy
+        high priority queue is not mistaken for an empty one."""
+
+        for name in _PRIORITY_QUEUES:
+            try:
+                return self.queuesList[name].get_nowait()
+            except queue.Empty:
+                continue
+        return None
+
+    def handle_config(self):
+        """Applies every pending subscribe/unsubscribe request."""
+
+        while True:
+            try:
+                message = self.queuesList["Config"].get_nowait()
+            except queue.Empty:
+                return
+            if str.lower(message["Subscribe/Unsubscribe"]) == "subscribe":
+                self.subscribe(message)
+            else:
+                self.unsubscribe(message)
+
+    def wait_for_messages(self):
+        """Blocks until one of the gateway queues has data or the idle timeout expires."""
+
+        readers = []
+        for name in _PRIORITY_QUEUES + ("Config",):
+            reader = getattr(self.queuesList[name], "_reader", None)
+            if reader is not None:
+                readers.append(reader)
+
+        # Pipes cannot be waited on for room: poll again soon while messages are pending
+        timeout = min(self.idleTimeout, 0.001) if self.pending else self.idleTimeout
+        if readers:
+            wait(readers, timeout=timeout)
+        else:
+            # Queues without an underlying pipe (e.g. queue.Queue) cannot be waited on.
+            self._blocker.wait(0.001)
+
+    def dispatch_single(self):
+        """Legacy dispatcher: forwards at most one message per cycle."""
+
         # while self._running:
         message = None
         # We are using "elif" because we are processing one message at a time.
@@ -151,8 +385,12 @@ class threadGateway(ThreadWithStop):
             message = self.queuesList["Warning"].get()
         elif not self.queuesList["General"].empty():
             message = self.queuesList["General"].get()
+        if self.pending:
+            self.flush_pending()
         if message is not None:
             self.send(message)
+        self.publish_subscriber_counts()
+        self.publish_stats()
         if not self.queuesList["Config"].empty():
             message2 = self.queuesList["Config"].get()
             if str.lower(message2["Subscribe/Unsubscribe"]) == "subscribe":
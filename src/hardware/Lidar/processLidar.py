@@ -5,10 +5,15 @@
 # THREADS:
 #   - threadReader:   Raw packet acquisition from LD19 over serial (230400 baud).
 #   - threadDetector: Analyses the point cloud to find frontal obstacles.
+#   - threadTracker:  Clusters the point cloud and tracks obstacles (velocity, time-to-collision).
 #
 # SHARED RESOURCES:
-#   - shared_container: {'last_scan': list | None}  zero-latency inter-thread data.
-#   - serial_port:      pyserial Serial object shared with threadReader.
+#   - shared_container: {'scans': scanBuffer}  zero-copy hand-off of every revolution
+#                       from threadReader to threadDetector and threadTracker.
+#   - serial_port:      pyserial Serial object shared with threadReader, wrapped
+#                       by recordingSerial when recording, or a replaySerial that
+#                       plays a recording back instead of the sensor
+#                       (see threads/ld19Recording.py).
 # ==============================================================================
 
 if __name__ == "__main__":
@@ -19,6 +24,9 @@ import serial
 from src.templates.workerprocess import WorkerProcess
 from src.hardware.Lidar.threads.threadReader import threadReader
 from src.hardware.Lidar.threads.threadDetector import threadDetector
+from src.hardware.Lidar.threads.threadTracker import threadTracker
+from src.hardware.Lidar.threads.ld19Recording import recordingSerial, replaySerial
+from src.hardware.Lidar.threads.scanBuffer import scanBuffer
 
 _LIDAR_PORT     = '/dev/ttyUSB0'
 _LIDAR_BAUDRATE = 230400
@@ -32,14 +40,25 @@ class processLidar(WorkerProcess):
         logging:           Logger object.
         ready_event:       Optional multiprocessing.Event signalled when ready.
         debugging  (bool): Verbose logging flag.
+        record_path (str): Optional file where the raw serial stream is recorded.
+        replay_path (str): Optional recording played back instead of opening the sensor.
+        replay_speed (float): Pace of the replay, 1.0 = real time, 0 = as fast as possible.
     """
 
-    def __init__(self, queueList, logging, ready_event=None, debugging=False):
+    def __init__(self, queueList, logging, ready_event=None, debugging=False,
+                 record_path=None, replay_path=None, replay_speed=1.0):
         self.queuesList  = queueList
         self.logging     = logging
         self.debugging   = debugging
 
-        self.shared_container = {'last_scan': None}
+        # One reader slot each for threadDetector and threadTracker
+        self.shared_container = {'scans': scanBuffer(readers=2)}
+
+        if replay_path is not None:
+            self.serial_port = replaySerial(replay_path, speed=replay_speed, loop=True)
+            self.logging.info(f"[Lidar Process] Replaying {replay_path} (speed {replay_speed}).")
+            super(processLidar, self).__init__(self.queuesList, ready_event)
+            return
 
         try:
             self.serial_port = serial.Serial(
@@ -49,6 +68,9 @@ class processLidar(WorkerProcess):
             )
             self.logging.info(
                 f"[Lidar Process] LD19 online on {_LIDAR_PORT} @ {_LIDAR_BAUDRATE} baud.")
+            if record_path is not None:
+                self.serial_port = recordingSerial(self.serial_port, record_path)
+                self.logging.info(f"[Lidar Process] Recording the LD19 stream to {record_path}.")
         except Exception as e:
             self.logging.error(f"[Lidar Process] Initialization failed: {e}")
             self.serial_port = None
@@ -62,7 +84,7 @@ class processLidar(WorkerProcess):
         pass
 
     def _init_threads(self):
-        """Create threadReader (acquisition) and threadDetector (analysis)."""
+        """Create threadReader (acquisition), threadDetector and threadTracker (analysis)."""
         ReaderTh = threadReader(
             self.serial_port,
             self.shared_container,
@@ -80,6 +102,14 @@ class processLidar(WorkerProcess):
         )
         self.threads.append(DetectorTh)
 
+        TrackerTh = threadTracker(
+            self.shared_container,
+            self.queuesList,
+            self.logging,
+            self.debugging,
+        )
+        self.threads.append(TrackerTh)
+
     def stop(self):
         """Graceful shutdown: stop threads first, then close the serial port."""
         super(processLidar, self).stop()
@@ -0,0 +1,170 @@
+# ==============================================================================
+# LD19 FRAMER
+#
+# Splits the raw LD19 byte stream into packets, a chunk at a time.
+#
+# Instead of reading the serial port byte by byte until a header shows up,
+# the framer reads everything available (at least one packet) into a reusable
+# buffer with readinto(), finds packet headers with bytearray.find() and
+# returns every complete packet of the chunk as one structured array (see
+# ld19Protocol.py). CRCs of the whole chunk are checked at once; after a bad
+# packet (desync, line noise) the search resumes one byte after its header,
+# so a false header inside the payload never hides the real one that follows.
+# Incomplete packets at the end of the chunk stay in the buffer for the next
+# read.
+#
+# The source only needs read() / readinto(): a pyserial Serial or a file
+# opened in binary mode (see iter_file() for offline replay of a capture).
+# ==============================================================================
+
+import numpy as np
+
+from src.hardware.Lidar.threads import ld19Protocol
+
+_SYNC = bytes([ld19Protocol.HEADER, ld19Protocol.VERLEN])
+_OFFSETS = np.arange(ld19Protocol.PACKET_SIZE)
+
+
+class ld19Framer:
+    """Stream framer for LD19 packets.\n
+    Args:
+        chunk_size (int, optional): Maximum number of bytes read at once. Defaults to 4096.
+    """
+
+    def __init__(self, chunk_size=4096):
+        self.chunk_size = max(ld19Protocol.PACKET_SIZE, chunk_size)
+        # Chunk plus the incomplete packet kept from the previous one
+        self._buffer = bytearray(self.chunk_size + ld19Protocol.PACKET_SIZE)
+        self._view = memoryview(self._buffer)
+        self._length = 0
+
+        # Statistics
+        self.reads = 0
+        self.packets = 0
+        self.bad_crc = 0
+        self.skipped_bytes = 0
+
+    def reset(self):
+        """Drops the buffered bytes (e.g. after reopening the port)."""
+        self._length = 0
+
+    def read(self, source):
+        """Reads the available bytes of a source and frames them.
+
+        With a serial port, waits for at least one packet's worth of bytes (or the port timeout).
+
+        Args:
+            source: Object with readinto() (pyserial Serial, binary file).
+
+        Returns:
+            np.ndarray | None: The CRC-valid packets (possibly none), or None when the source returned no bytes.
+        """
+        waiting = getattr(source, "in_waiting", None)
+        if waiting is None:
+            size = self.chunk_size
+        else:
+            size = min(self.chunk_size, max(ld19Protocol.PACKET_SIZE, waiting))
+        size = min(size, len(self._buffer) - self._length)
+
+        count = source.readinto(self._view[self._length:self._length + size])
+        self.reads += 1
+        if not count:
+            return None
+        self._length += count
+        return self._frame()
+
+    def feed(self, data):
+        """Frames bytes that were already read, e.g. from a capture. Returns the CRC-valid packets."""
+        blocks = []
+        data = memoryview(data)
+        while len(data):
+            size = min(len(data), len(self._buffer) - self._length)
+            self._buffer[self._length:self._length + size] = data[:size]
+            self._length += size
+            data = data[size:]
+            blocks.append(self._frame())
+        return np.concatenate(blocks) if len(blocks) > 1 else (blocks[0] if blocks else self._frame())
+
+    def _frame(self):
+        """Extracts the complete packets of the buffer and keeps the incomplete tail."""
+        buffer = self._buffer
+        end = self._length
+        blocks = []
+        position = 0
+
+        while True:
+            # Candidate packet offsets: follow contiguous packets, search for the header after a gap
+            offsets = []
+            start = buffer.find(_SYNC, position, end)
+            while start >= 0 and start + ld19Protocol.PACKET_SIZE <= end:
+                offsets.append(start)
+                following = start + ld19Protocol.PACKET_SIZE
+                if buffer[following:following + 2] == _SYNC:
+                    start = following
+                else:
+                    start = buffer.find(_SYNC, following, end)
+            if not offsets:
+                break
+
+            raw = np.frombuffer(buffer, dtype=np.uint8, count=end)
+            block = raw[np.asarray(offsets)[:, None] + _OFFSETS].view(ld19Protocol.PACKET_DTYPE).ravel()
+            valid = ld19Protocol.crc8(block) == block["crc"]
+            if valid.all():
+                blocks.append(block)
+                self.skipped_bytes += offsets[0] - position + self._gaps(offsets)
+                position = offsets[-1] + ld19Protocol.PACKET_SIZE
+                break
+
+            # Keep the packets before the first bad one, resume right after its header
+            bad = int(np.argmin(valid))
+            self.bad_crc += 1
+            blocks.append(block[:bad])
+            self.skipped_bytes += offsets[0] - position + self._gaps(offsets[:bad + 1]) + 1
+            position = offsets[bad] + 1
+
+        # Keep what can still become a packet: from the last header candidate (or the last byte)
+        start = buffer.find(_SYNC, position, end)
+        if start < 0:
+            start = max(position, end - 1)
+            if buffer[start:end] != _SYNC[:1]:
+                start = end
+        self.skipped_bytes += start - position
+        tail = end - start
+        buffer[:tail] = buffer[start:end]
+        self._length = tail
+
+        packets = np.concatenate(blocks) if len(blocks) > 1 else (
+            blocks[0] if blocks else np.empty(0, dtype=ld19Protocol.PACKET_DTYPE))
+        self.packets += packets.size
+        return packets
+
+    @staticmethod
+    def _gaps(offsets):
+        """Bytes skipped between consecutive candidate packets."""
+        return sum(b - a - ld19Protocol.PACKET_SIZE for a, b in zip(offsets, offsets[1:]))
+
+    def stats(self):
+        """Returns the framing statistics since the framer was created."""
+        return {
+            "reads": self.reads,
+            "packets": self.packets,
+            "bad_crc": self.bad_crc,
+            "skipped_bytes": self.skipped_bytes,
+        }
+
+
+def iter_file(path, chunk_size=4096):
+    """Replays a raw LD19 capture, yielding the CRC-valid packets of every chunk.
+
+    Args:
+        path (str): File holding the bytes read from the sensor.
+        chunk_size (int, optional): Bytes read at once. Defaults to 4096.
+    """
+    framer = ld19Framer(chunk_size)
+    with open(path, "rb") as capture:
+        while True:
+            packets = framer.read(capture)
+            if packets is None:
+                return
+            if packets.size:
+                yield packets
@@ -0,0 +1,170 @@
+# ==============================================================================
+# LD19 RECORDING
+#
+# Recording and replay of the raw LD19 serial stream, so the Lidar pipeline
+# can run (and be benchmarked) without the sensor.
+#
+# FILE FORMAT (append-only):
+#   Bytes 0-7 : magic b"LD19REC1"
+#   Records   : time   float64 LE  seconds since the recording started (never
+#                                  decreasing: a session appended to an
+#                                  existing file continues from its last time)
+#               length uint32  LE
+#               data   <length> raw bytes, exactly as read from the port
+#
+# recordingSerial wraps the real serial port and appends every chunk read by
+# threadReader. replaySerial reads a recording back through the same
+# read() / readinto() / in_waiting interface as serial.Serial, either at the
+# recorded pace (speed=1.0, or faster / slower) or as fast as possible
+# (speed=0). processLidar uses one or the other in place of the port.
+# ==============================================================================
+
+import struct
+import time
+
+MAGIC = b"LD19REC1"
+_RECORD = struct.Struct("<dI")
+
+
+def iter_records(path):
+    """Yields the (time, data) records of a recording."""
+    with open(path, "rb") as file:
+        if file.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path} is not an LD19 recording")
+        while True:
+            header = file.read(_RECORD.size)
+            if len(header) < _RECORD.size:
+                return
+            timestamp, length = _RECORD.unpack(header)
+            data = file.read(length)
+            if len(data) < length:
+                return   # recording interrupted in the middle of a record
+            yield timestamp, data
+
+
+class recordingSerial:
+    """Serial port wrapper that records everything read from it.\n
+    Args:
+        serial_port (serial.Serial): The real port.
+        path (str): Recording file, created or appended to.
+    """
+
+    def __init__(self, serial_port, path):
+        self.serial_port = serial_port
+        self.path = path
+        self._file = open(path, "ab")
+        offset = 0.0
+        if self._file.tell() == 0:
+            self._file.write(MAGIC)
+        else:
+            # Appended session: keep the times monotonic, so replay does not dump it in one burst
+            for timestamp, _ in iter_records(path):
+                offset = timestamp
+        self._start = time.perf_counter() - offset
+
+    @property
+    def in_waiting(self):
+        return self.serial_port.in_waiting
+
+    @property
+    def is_open(self):
+        return self.serial_port.is_open
+
+    def _record(self, data):
+        if data and not self._file.closed:
+            self._file.write(_RECORD.pack(time.perf_counter() - self._start, len(data)))
+            self._file.write(data)
+
+    def read(self, size=1):
+        data = self.serial_port.read(size)
+        self._record(data)
+        return data
+
+    def readinto(self, buffer):
+        count = self.serial_port.readinto(buffer)
+        if count:
+            self._record(bytes(buffer[:count]))
+        return count
+
+    def close(self):
+        """Closes the recording and the port."""
+        if not self._file.closed:
+            self._file.close()
+        self.serial_port.close()
+
+
+class replaySerial:
+    """Replays a recording as if it were the serial port.\n
+    Args:
+        path (str): Recording file.
+        speed (float, optional): Pace relative to the recording, 0 for as fast as possible. Defaults to 1.0.
+        loop (bool, optional): Starts over at the end of the recording. Defaults to False.
+        timeout (float, optional): Read timeout in seconds, like serial.Serial. Defaults to 1.0.
+    """
+
+    def __init__(self, path, speed=1.0, loop=False, timeout=1.0):
+        self.path = path
+        self.speed = speed
+        self.loop = loop
+        self.timeout = timeout
+        self.finished = False   # True once the whole recording was returned (never with loop)
+        self.is_open = True
+
+        self._pending = bytearray()
+        self._open()
+
+    def _open(self):
+        self._records = iter_records(self.path)
+        self._next = next(self._records, None)
+        self._origin = time.perf_counter()
+
+    def _release_due(self, size=1):
+        """Moves the records whose time has come to the pending bytes. As fast as possible (speed 0) every
+        record is due, so only enough of them to cover 'size' bytes are released: a looped recording is
+        never copied into the pending bytes faster than it is read."""
+        elapsed = (time.perf_counter() - self._origin) * self.speed if self.speed > 0 else float("inf")
+        while self._next is not None and self._next[0] <= elapsed:
+            if self.speed <= 0 and len(self._pending) >= size:
+                break
+            self._pending += self._next[1]
+            self._next = next(self._records, None)
+            if self._next is None and self.loop:
+                self._open()
+                elapsed = 0.0
+
+    @property
+    def in_waiting(self):
+        self._release_due()
+        return len(self._pending)
+
+    def readinto(self, buffer):
+        """Waits until len(buffer) bytes arrived (or the timeout expired) and copies them."""
+        size = len(buffer)
+        deadline = time.perf_counter() + self.timeout
+        while self.is_open:
+            self._release_due(size)
+            if len(self._pending) >= size:
+                break
+            if self._next is None:
+                self.finished = not self._pending
+                break
+            now = time.perf_counter()
+            if now >= deadline:
+                break
+            if self.speed <= 0:
+                continue   # as fast as possible: release the next pass of a looped recording
+            due = self._origin + self._next[0] / self.speed
+            time.sleep(max(0.0, min(due, deadline) - now))
+
+        count = min(size, len(self._pending))
+        buffer[:count] = self._pending[:count]
+        del self._pending[:count]
+        return count
+
+    def read(self, size=1):
+        buffer = bytearray(size)
+        count = self.readinto(buffer)
+        return bytes(buffer[:count])
+
+    def close(self):
+        self.is_open = False
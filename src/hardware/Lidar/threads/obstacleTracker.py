@@ -0,0 +1,243 @@
+# ==============================================================================
+# OBSTACLE TRACKER
+#
+# Turns one LD19 revolution into tracked obstacles.
+#
+# 1. Polar -> Cartesian, in the car frame (metres):
+#      x forward, y to the left. Forward is 270° on the sensor and sensor
+#      angles grow clockwise seen from above (see threadDetector.ZONES).
+# 2. Adaptive-breakpoint segmentation (Borges & Aldon): consecutive points
+#    (in angle order) belong to the same object unless they are further
+#    apart than
+#      D_max = r[i-1] * sin(dphi) / sin(LAMBDA - dphi) + 3 * SIGMA_R
+#    so the threshold grows with range, as the point spacing does.
+# 3. Per-cluster features with reduceat: bounding box, centroid, closest
+#    range, point count. Clusters with fewer than MIN_POINTS points are noise.
+# 4. Nearest-neighbour tracking: tracks are predicted with a constant
+#    velocity, associated greedily with the closest centroid inside GATE and
+#    corrected with an alpha-beta filter. A track is dropped after MAX_MISSED
+#    revolutions without a cluster.
+# 5. Time-to-collision of the tracks in the car's corridor:
+#      ttc = distance ahead / closing speed      (inf when not closing)
+#    Velocities are relative to the car, so a parked car ahead closes at the
+#    car's own speed.
+# ==============================================================================
+
+import math
+import numpy as np
+
+FORWARD_DEG = 270.0
+
+LAMBDA = math.radians(10.0)   # worst incidence angle still considered one surface
+SIGMA_R = 0.015               # LD19 range noise (m)
+MIN_POINTS = 3
+MAX_RANGE = 4.0               # points further away (m) are ignored
+
+GATE = 0.5                    # max distance (m) between a prediction and its cluster
+MAX_MISSED = 3
+ALPHA = 0.5
+BETA = 0.2
+CORRIDOR = 0.25               # half width (m) of the car's path, for the time-to-collision
+MIN_CLOSING = 0.05            # closing speeds (m/s) below this are "not closing"
+
+
+def to_cartesian(angle, distance):
+    """Converts scan points to the car frame.
+
+    Args:
+        angle (np.ndarray): Sensor angles (degrees).
+        distance (np.ndarray): Distances (mm).
+
+    Returns:
+        tuple(np.ndarray, np.ndarray, np.ndarray): x forward, y left and range, in metres (float32).
+    """
+    theta = np.radians(angle - FORWARD_DEG, dtype=np.float32)
+    r = distance.astype(np.float32) * np.float32(0.001)
+    return r * np.cos(theta), -r * np.sin(theta), r
+
+
+def segment(angle, distance):
+    """Splits a revolution into clusters.
+
+    Args:
+        angle (np.ndarray): Sensor angles (degrees), any order.
+        distance (np.ndarray): Distances (mm), zero-distance points already removed.
+
+    Returns:
+        dict: Per-cluster float32 arrays "x_min", "x_max", "y_min", "y_max", "x", "y" (centroid),
+        "range" (closest point) in metres and "points" (int). Empty arrays if there is no cluster.
+    """
+    keep = (distance > 0) & (distance <= MAX_RANGE * 1000.0)
+    angle = angle[keep]
+    distance = distance[keep]
+    order = np.argsort(angle, kind="stable")
+    angle = angle[order]
+    x, y, r = to_cartesian(angle, distance[order])
+
+    if r.size == 0:
+        return _clusters(x, y, r, np.empty(0, dtype=np.intp), np.empty(0, dtype=np.intp))
+
+    # Gap between each point and the previous one (the first one closes the circle)
+    dphi = np.radians(np.diff(angle, prepend=angle[-1] - 360.0))
+    gap = np.hypot(x - np.roll(x, 1), y - np.roll(y, 1))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        limit = np.roll(r, 1) * np.sin(dphi) / np.sin(LAMBDA - dphi) + 3.0 * SIGMA_R
+    breaks = (gap > limit) | (dphi >= LAMBDA)
+
+    starts = np.flatnonzero(breaks)
+    if starts.size == 0:
+        # One object all around the sensor
+        starts = np.zeros(1, dtype=np.intp)
+    elif starts[0] != 0:
+        # The first points continue the last cluster: rotate so that every cluster is contiguous
+        shift = starts[0]
+        x, y, r = np.roll(x, -shift), np.roll(y, -shift), np.roll(r, -shift)
+        starts = starts - shift
+    counts = np.diff(np.append(starts, r.size))
+    return _clusters(x, y, r, starts, counts)
+
+
+def _clusters(x, y, r, starts, counts):
+    valid = counts >= MIN_POINTS
+    if not valid.any():
+        empty = np.empty(0, dtype=np.float32)
+        return {"x_min": empty, "x_max": empty, "y_min": empty, "y_max": empty,
+                "x": empty, "y": empty, "range": empty, "points": np.empty(0, dtype=np.intp)}
+    starts = starts.astype(np.intp)
+    counts = counts[valid]
+    return {
+        "x_min":  np.minimum.reduceat(x, starts)[valid],
+        "x_max":  np.maximum.reduceat(x, starts)[valid],
+        "y_min":  np.minimum.reduceat(y, starts)[valid],
+        "y_max":  np.maximum.reduceat(y, starts)[valid],
+        "x":      np.add.reduceat(x, starts)[valid] / counts,
+        "y":      np.add.reduceat(y, starts)[valid] / counts,
+        "range":  np.minimum.reduceat(r, starts)[valid],
+        "points": counts,
+    }
+
+
+class _track:
+    __slots__ = ("id", "x", "y", "vx", "vy", "box", "hits", "missed")
+
+    def __init__(self, trackId, x, y, box):
+        self.id = trackId
+        self.x = x
+        self.y = y
+        self.vx = 0.0
+        self.vy = 0.0
+        self.box = box          # (x_min, x_max, y_min, y_max) relative to the centroid
+        self.hits = 1
+        self.missed = 0
+
+
+class obstacleTracker:
+    """Constant-velocity nearest-neighbour tracker of the lidar clusters.\n
+    Args:
+        max_tracks (int, optional): Maximum number of tracks reported, closest first. Defaults to 12.
+    """
+
+    def __init__(self, max_tracks=12):
+        self.max_tracks = max_tracks
+        self.tracks = []
+        self._nextId = 0
+        self._lastTime = None
+
+    def reset(self):
+        """Forgets every track (e.g. after the lidar stream was lost)."""
+        self.tracks = []
+        self._lastTime = None
+
+    def update(self, clusters, timestamp):
+        """Advances the tracks to a new revolution.
+
+        Args:
+            clusters (dict): Output of segment().
+            timestamp (float): Time of the revolution in seconds (the scan's "sensor_time").
+
+        Returns:
+            list: The confirmed tracks (seen in at least 2 revolutions), closest first, see track_info().
+        """
+        dt = 0.0 if self._lastTime is None else max(0.0, timestamp - self._lastTime)
+        self._lastTime = timestamp
+
+        # 1. Predict
+        for track in self.tracks:
+            track.x += track.vx * dt
+            track.y += track.vy * dt
+
+        # 2. Associate, closest pairs first
+        cx = clusters["x"]
+        cy = clusters["y"]
+        matched = np.zeros(cx.size, dtype=bool)
+        if self.tracks and cx.size:
+            px = np.array([track.x for track in self.tracks], dtype=np.float32)
+            py = np.array([track.y for track in self.tracks], dtype=np.float32)
+            cost = np.hypot(px[:, None] - cx[None, :], py[:, None] - cy[None, :])
+            assigned = np.zeros(len(self.tracks), dtype=bool)
+            for flat in np.argsort(cost, axis=None):
+                t, c = divmod(int(flat), cx.size)
+                if cost[t, c] > GATE:
+                    break
+                if assigned[t] or matched[c]:
+                    continue
+                assigned[t] = matched[c] = True
+                self._correct(self.tracks[t], clusters, c, dt)
+            for t in np.flatnonzero(~assigned):
+                self.tracks[t].missed += 1
+        else:
+            for track in self.tracks:
+                track.missed += 1
+
+        # 3. Drop lost tracks, start new ones
+        self.tracks = [track for track in self.tracks if track.missed <= MAX_MISSED]
+        for c in np.flatnonzero(~matched):
+            self.tracks.append(_track(self._nextId, float(cx[c]), float(cy[c]), self._box(clusters, c)))
+            self._nextId += 1
+
+        confirmed = [track for track in self.tracks if track.hits >= 2 and track.missed == 0]
+        confirmed.sort(key=lambda track: math.hypot(track.x, track.y))
+        return [self.track_info(track) for track in confirmed[:self.max_tracks]]
+
+    @staticmethod
+    def _box(clusters, c):
+        x = float(clusters["x"][c])
+        y = float(clusters["y"][c])
+        return (float(clusters["x_min"][c]) - x, float(clusters["x_max"][c]) - x,
+                float(clusters["y_min"][c]) - y, float(clusters["y_max"][c]) - y)
+
+    def _correct(self, track, clusters, c, dt):
+        rx = float(clusters["x"][c]) - track.x
+        ry = float(clusters["y"][c]) - track.y
+        track.x += ALPHA * rx
+        track.y += ALPHA * ry
+        if dt > 0:
+            track.vx += BETA * rx / dt
+            track.vy += BETA * ry / dt
+        track.box = self._box(clusters, c)
+        track.hits += 1
+        track.missed = 0
+
+    @staticmethod
+    def track_info(track):
+        """Describes a track for the LidarTracks message.
+
+        Returns:
+            dict: {"id", "x", "y", "vx", "vy", "width", "length", "ttc"}, metres, m/s and seconds.
+        """
+        x_min, x_max, y_min, y_max = track.box
+        ttc = math.inf
+        near = track.x + x_min
+        if (track.y + y_min < CORRIDOR and track.y + y_max > -CORRIDOR
+                and near > 0 and track.vx < -MIN_CLOSING):
+            ttc = near / -track.vx
+        return {
+            "id": track.id,
+            "x": round(track.x, 3),
+            "y": round(track.y, 3),
+            "vx": round(track.vx, 3),
+            "vy": round(track.vy, 3),
+            "width": round(y_max - y_min, 3),
+            "length": round(x_max - x_min, 3),
+            "ttc": ttc,
+        }
@@ -0,0 +1,89 @@
+# ==============================================================================
+# POLAR GRID
+#
+# Angular occupancy index of one LD19 revolution.
+#
+# The 360° around the sensor are split into fixed angular bins (720 bins of
+# 0.5° by default). Each bin keeps the minimum distance and the number of
+# valid points that fell into it. threadReader updates the grid with every
+# chunk of packets as it arrives and publishes it with the scan, so
+# threadDetector answers "closest obstacle in this arc" with a slice of the
+# bins instead of a pass over every point:
+#
+#   distance, points = grid.arc(255.0, 285.0)     # min distance (mm), count
+#
+# Arcs are given in sensor degrees and may wrap through 0° (e.g. 350 -> 10).
+# The end angle is exclusive, at bin resolution.
+# ==============================================================================
+
+import math
+import numpy as np
+
+
+class polarGrid:
+    """Per-bin minimum distance and point count of one revolution.\n
+    Args:
+        bins (int, optional): Number of angular bins over 360°. Defaults to 720.
+    """
+
+    def __init__(self, bins=720):
+        self.bins = bins
+        self._scale = bins / 360.0
+        self.distance = np.full(bins, np.inf, dtype=np.float32)
+        self.count = np.zeros(bins, dtype=np.uint16)
+
+    def reset(self):
+        """Empties every bin for a new revolution."""
+        self.distance.fill(np.inf)
+        self.count.fill(0)
+
+    def update(self, angle, distance):
+        """Adds points to the grid.
+
+        Args:
+            angle (np.ndarray): Angles in [0, 360) degrees.
+            distance (np.ndarray): Distances (mm) of the points, zero-distance points already removed.
+        """
+        if angle.size == 0:
+            return
+        index = (angle * self._scale).astype(np.intp) % self.bins
+        np.minimum.at(self.distance, index, distance)
+        np.add.at(self.count, index, 1)
+
+    def _slices(self, start, end):
+        first = int(math.floor((start % 360.0) * self._scale))
+        last = int(math.ceil((end % 360.0) * self._scale))
+        if last == 0:
+            last = self.bins
+        if first < last:
+            return (slice(first, last),)
+        return (slice(first, self.bins), slice(0, last))
+
+    def arc(self, start, end):
+        """Closest point of an arc.
+
+        Args:
+            start (float): First angle of the arc (degrees).
+            end (float): Last angle of the arc (degrees), clockwise from start.
+
+        Returns:
+            tuple(float, int): Minimum distance in mm (inf when empty) and number of points in the arc.
+        """
+        distance = math.inf
+        points = 0
+        for bins in self._slices(start, end):
+            if bins.stop > bins.start:
+                distance = min(distance, float(self.distance[bins].min()))
+                points += int(self.count[bins].sum())
+        return distance, points
+
+    def zones(self, arcs):
+        """Evaluates several arcs at once.
+
+        Args:
+            arcs (dict): {name: (start, end)} in degrees.
+
+        Returns:
+            dict: {name: (distance, points)}, see arc().
+        """
+        return {name: self.arc(start, end) for name, (start, end) in arcs.items()}
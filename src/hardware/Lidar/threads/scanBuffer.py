@@ -0,0 +1,128 @@
+# ==============================================================================
+# SCAN BUFFER
+#
+# Hand-off of complete LD19 revolutions from threadReader to the analysis
+# threads (threadDetector, threadTracker) without per-scan allocation.
+#
+# The buffer owns readers + 2 preallocated slots (point arrays + polarGrid).
+# threadReader fills the "writing" slot in place and publishes it with a
+# revolution sequence number; each analysis thread blocks on a Condition
+# until a revolution newer than the last one it processed is published:
+#
+#   scan = scans.acquire(last_seq, timeout)    # None on timeout
+#   ...  scan.points(), scan.grid, scan.seq, scan.timestamp ...
+#   scans.release(scan)
+#
+# A slot is never written while a reader holds it: with at most one slot
+# held per reader, one slot being the latest and one being written, a free
+# slot always exists. A reader that falls behind skips to the newest
+# revolution (scan.seq - last_seq - 1 revolutions missed).
+# ==============================================================================
+
+import threading
+import numpy as np
+
+from src.hardware.Lidar.threads.polarGrid import polarGrid
+
+
+class scanSlot:
+    """One revolution: preallocated point arrays and its polar grid.\n
+    Args:
+        capacity (int): Maximum number of points.
+        bins (int): Angular bins of the grid.
+    """
+
+    def __init__(self, capacity, bins):
+        self.capacity = capacity
+        self.angle = np.zeros(capacity, dtype=np.float32)
+        self.distance = np.zeros(capacity, dtype=np.float32)
+        self.intensity = np.zeros(capacity, dtype=np.float32)
+        self.grid = polarGrid(bins)
+        self.size = 0
+        self.dropped = 0            # points beyond the capacity (still counted in the grid)
+        self.seq = 0
+        self.timestamp = 0.0        # time.perf_counter() of the publication
+        self.sensor_time = 0.0      # LD19 packet clock (s), see threadReader
+        self._readers = 0
+
+    def clear(self):
+        self.size = 0
+        self.dropped = 0
+        self.grid.reset()
+
+    def append(self, angle, distance, intensity):
+        """Copies decoded points into the slot and adds them to its grid."""
+        count = min(angle.size, self.capacity - self.size)
+        end = self.size + count
+        self.angle[self.size:end] = angle[:count]
+        self.distance[self.size:end] = distance[:count]
+        self.intensity[self.size:end] = intensity[:count]
+        self.size = end
+        self.dropped += angle.size - count
+        self.grid.update(angle, distance)
+
+    def points(self):
+        """Returns views of the angle, distance and intensity of the revolution's points."""
+        return self.angle[:self.size], self.distance[:self.size], self.intensity[:self.size]
+
+
+class scanBuffer:
+    """Multi-slot buffer of LD19 revolutions, one writer and a fixed number of readers.\n
+    Args:
+        readers (int, optional): Number of threads reading the buffer. Defaults to 2.
+        capacity (int, optional): Maximum points per revolution. Defaults to 2048.
+        bins (int, optional): Angular bins of the grids. Defaults to 720.
+    """
+
+    def __init__(self, readers=2, capacity=2048, bins=720):
+        self._slots = [scanSlot(capacity, bins) for _ in range(readers + 2)]
+        self._condition = threading.Condition()
+        self._latest = None
+        self._seq = 0
+        self.writing = self._slots[0]
+
+    @property
+    def seq(self):
+        """Sequence number of the newest published revolution (0 before the first one)."""
+        return self._seq
+
+    def publish(self, timestamp, sensor_time):
+        """Publishes the writing slot as the newest revolution and switches to a free slot.
+
+        Returns:
+            int: The sequence number of the published revolution.
+        """
+        with self._condition:
+            slot = self.writing
+            self._seq += 1
+            slot.seq = self._seq
+            slot.timestamp = timestamp
+            slot.sensor_time = sensor_time
+            self._latest = slot
+            free = [other for other in self._slots if other is not slot and other._readers == 0]
+            if not free:
+                raise RuntimeError("scanBuffer: more readers than the buffer was created for")
+            self.writing = free[0]
+            self._condition.notify_all()
+        self.writing.clear()
+        return slot.seq
+
+    def acquire(self, last_seq=0, timeout=None):
+        """Waits for a revolution newer than last_seq and holds it until release().
+
+        Returns:
+            scanSlot | None: The newest revolution, or None if none was published within the timeout.
+        """
+        with self._condition:
+            ready = self._condition.wait_for(
+                lambda: self._latest is not None and self._latest.seq > last_seq, timeout)
+            if not ready:
+                return None
+            slot = self._latest
+            slot._readers += 1
+            return slot
+
+    def release(self, slot):
+        """Gives a slot returned by acquire() back to the writer."""
+        with self._condition:
+            slot._readers -= 1
@@ -3,26 +3,30 @@
 # THIS THREAD PROCESSES LIDAR DATA TO DETECT OBSTACLES IN FRONT OF THE VEHICLE
 # 
 # INPUT: 
-#   - Name: last_scan (Internal shared memory dictionary)
-#   - Format: {"data": [(quality, angle, distance), ...], "timestamp": float}
+#   - Name: scans (scanBuffer in the shared container)
+#   - Format: one slot per revolution (points, polarGrid, seq, timestamp)
 #   - Source: threadReader (Internal Process Memory)
 #
 # PROCESSING:
-#   - Freshness Guard: Validates that data is < 300ms old to detect sensor freezes.
-#   - Range Filtering: Extracts points only in the 30° front arc (255° to 285°).
-#   - Noise Reduction: Confirms obstacle only if at least 3 points are detected in ROI.
+#   - Wakes up once per new revolution, each revolution is processed once.
+#   - Freshness Guard: No new revolution within 300ms means a sensor freeze.
+#   - Zone Query: Reads the closest point of every zone in ZONES (front arc
+#     255° to 285°, its neighbours and the sides) from the scan's polar grid.
+#   - Noise Reduction: Confirms obstacle only if at least 3 points are detected in a zone.
 #   - Reliability Logic: Reports 0.0 reliability on hardware failure or stale data.
 #
 # OUTPUT:
 #   - Name: LidarObstacle
 #   - Format: Dictionary {"distance": float, "reliability": float}
 #   - Destination: threadLogic (The FSM) via Gateway
+#   - Name: LidarZones
+#   - Format: Dictionary {"front", "front_left", "front_right", "left", "right", "reliability"}
+#   - Destination: Any subscriber (lane change / overtaking decisions, dashboard)
 # ==============================================================================
 
-import time
 from src.templates.threadwithstop import ThreadWithStop
 from src.utils.messages.messageHandlerSender import messageHandlerSender
-from src.utils.messages.allMessages import LidarObstacle 
+from src.utils.messages.allMessages import LidarObstacle, LidarZones
 
 class threadDetector(ThreadWithStop):
     """
@@ -30,6 +34,17 @@ class threadDetector(ThreadWithStop):
     It filters the data to find valid obstacles within the vehicle's path.
     """
 
+    # LD19 mounting: cable connector faces 90° (rear), so forward = 270°.
+    # Angles grow clockwise seen from above: right of the car is above 270°.
+    ZONES = {
+        "front":       (255.0, 285.0),   # ±15° forward arc
+        "front_left":  (225.0, 255.0),
+        "front_right": (285.0, 315.0),
+        "left":        (180.0, 225.0),   # adjacent lane, beside the car
+        "right":       (315.0, 360.0),
+    }
+    MIN_POINTS = 3   # points needed in a zone to confirm an obstacle
+
     def __init__(self, shared_container, queueList, logging, debugging=False):
         """
         Args:
@@ -39,67 +54,72 @@ class threadDetector(ThreadWithStop):
             debugging (bool): Flag for enabling console debug prints.
         """
         self.shared_container = shared_container
+        self.scans = shared_container['scans']
         self.queuesList = queueList
         self.logging = logging
         self.debugging = debugging
 
         # FSM makes the final stop decision
         self.MAX_STALE_TIME = 0.3  # 300ms before we consider the Lidar "frozen"
+        self._last_seq = 0         # last revolution processed
+        self.missed_scans = 0      # revolutions published while the previous one was processed
         
         self.obstacleSender = messageHandlerSender(self.queuesList, LidarObstacle)
+        self.zonesSender = messageHandlerSender(self.queuesList, LidarZones)
         
-        # 20Hz (pause=0.05) we react faster than the 10Hz Lidar spin
-        super(threadDetector, self).__init__(pause=0.05)
+        # No pause: thread_work blocks until the next revolution (~10 Hz)
+        super(threadDetector, self).__init__(pause=0)
 
     def subscribe(self):
         """No external subscriptions needed; data is pulled from shared_container."""
         pass
 
+    def _send_failure(self):
+        """Reports a 0mm obstacle with zero reliability everywhere to force a stop."""
+        self.obstacleSender.send({"distance": 0.0, "reliability": 0.0})
+        zones = dict.fromkeys(self.ZONES, 0.0)
+        zones["reliability"] = 0.0
+        self.zonesSender.send(zones)
+
     def thread_work(self):
-        """Processes scan with freshness and failure logic."""
-        # 1. ACQUISITION
-        scan_packet = self.shared_container.get('last_scan')
-        
-        # 2. Lidar Disconnected
-        if scan_packet is None:
-            # If the reader signals None, we report a 0mm obstacle to force a stop
-            self.obstacleSender.send({"distance": 0.0, "reliability": 0.0})
+        """Processes every new revolution once, with freshness and failure logic."""
+        # 1. ACQUISITION: wait for a revolution newer than the last one processed
+        scan = self.scans.acquire(self._last_seq, timeout=self.MAX_STALE_TIME)
+
+        # 2. Lidar Disconnected / Frozen
+        if scan is None:
+            # No new revolution in time: report a 0mm obstacle to force a stop
+            self._send_failure()
             if self.debugging:
-                print("[LiDAR Detector] CRITICAL: Lidar stream lost!")
+                if self._last_seq == 0:
+                    print("[LiDAR Detector] CRITICAL: Lidar stream lost!")
+                else:
+                    print("[LiDAR Detector] WARNING: Stale data detected!")
             return
 
         try:
-            # 3. Lidar Frozen
-            scan_data = scan_packet.get("data", [])
-            timestamp = scan_packet.get("timestamp", 0)
-            
-            if (time.perf_counter() - timestamp) > self.MAX_STALE_TIME:
-                # Data is too old. Report danger and zero reliability.
-                self.obstacleSender.send({"distance": 0.0, "reliability": 0.0})
-                if self.debugging:
-                    print("[LiDAR Detector] WARNING: Stale data detected!")
-                return
+            self.missed_scans += scan.seq - self._last_seq - 1 if self._last_seq else 0
+            self._last_seq = scan.seq
+
+            # 3. ZONE QUERY: closest point of every zone, straight from the grid bins
+            zones = {}
+            for name, (distance, points) in scan.grid.zones(self.ZONES).items():
+                # 4. NOISE REDUCTION: fewer than MIN_POINTS points means a clear zone
+                zones[name] = distance if points >= self.MIN_POINTS else float('inf')
 
-            # 4. FRONT ARC FILTERING (255° to 285°)
-            # LD19 mounting: cable connector faces 90° (rear), so forward = 270°.
-            # ±15° gives a 30° forward arc: 255°–285°.
-            front_points = [
-                dist for (_, angle, dist) in scan_data
-                if (angle >= 255 and angle <= 285) and dist > 0
-            ]
+            # 5. DETERMINISTIC OUTPUT
+            # We send a message EVERY revolution so the FSM knows the path is CLEAR.
+            closest_dist = zones["front"]
+            self.obstacleSender.send({"distance": closest_dist, "reliability": 1.0})
+            zones["reliability"] = 1.0
+            self.zonesSender.send(zones)
+
+            if self.debugging and closest_dist < 1000.0:
+                print(f"[LiDAR Detector] Obstacle at: {closest_dist:.2f} mm")
 
-            # 5. NOISE REDUCTION & DETERMINISTIC OUTPUT
-            # We send a message EVERY cycle so the FSM knows the path is CLEAR.
-            if len(front_points) >= 3:
-                closest_dist = min(front_points)
-                self.obstacleSender.send({"distance": closest_dist, "reliability": 1.0})
-                
-                if self.debugging and closest_dist < 1000.0:
-                    print(f"[LiDAR Detector] Obstacle at: {closest_dist:.2f} mm")
-            else:
-                # No obstacle found. Send "infinity" to signal a clear path.
-                self.obstacleSender.send({"distance": float('inf'), "reliability": 1.0})
-            
         except Exception as e:
             self.logging.error(f"[LiDAR Detector] Error processing scan: {e}")
-            self.obstacleSender.send({"distance": 0.0, "reliability": 0.0})
\ No newline at end of file
+            self._send_failure()
+
+        finally:
+            self.scans.release(scan)
@@ -0,0 +1,92 @@
+# ==============================================================================
+# THREAD FLOW DESCRIPTION:
+# THIS THREAD EXTRACTS AND TRACKS THE OBSTACLES AROUND THE VEHICLE
+#
+# INPUT:
+#   - Name: scans (scanBuffer in the shared container, see threadReader)
+#   - Source: threadReader (Internal Process Memory)
+#
+# PROCESSING:
+#   - Once per new revolution (~10 Hz, woken by the scanBuffer): segmentation
+#     of the scan into clusters and nearest-neighbour tracking (see
+#     obstacleTracker.py).
+#   - No new revolution within 300ms resets the tracks.
+#
+# OUTPUT:
+#   - Name: LidarTracks
+#   - Format: {"timestamp": float, "min_ttc": float, "tracks": [{"id", "x", "y", "vx", "vy",
+#              "width", "length", "ttc"}, ...]}   (metres, m/s, seconds, closest first)
+#   - Destination: threadFSM
+# ==============================================================================
+
+import math
+import time
+from src.templates.threadwithstop import ThreadWithStop
+from src.utils.messages.messageHandlerSender import messageHandlerSender
+from src.utils.messages.allMessages import LidarTracks
+from src.hardware.Lidar.threads import obstacleTracker
+
+
+class threadTracker(ThreadWithStop):
+    """
+    Segments every new Lidar revolution into obstacles and tracks them,
+    publishing their velocity and time-to-collision.
+    """
+
+    def __init__(self, shared_container, queueList, logging, debugging=False):
+        """
+        Args:
+            shared_container (dict): Shared dictionary to access the latest Lidar scan.
+            queueList (dict): Dictionary of multiprocessing queues for message transmission.
+            logging (logging): Logging object for system reports.
+            debugging (bool): Flag for enabling console debug prints.
+        """
+        self.shared_container = shared_container
+        self.scans = shared_container['scans']
+        self.queuesList = queueList
+        self.logging = logging
+        self.debugging = debugging
+
+        self.MAX_STALE_TIME = 0.3  # same freshness guard as threadDetector
+        self.tracker = obstacleTracker.obstacleTracker()
+        self._last_seq = 0
+        self._tracking = False
+
+        self.tracksSender = messageHandlerSender(self.queuesList, LidarTracks)
+
+        # No pause: thread_work blocks until the next revolution
+        super(threadTracker, self).__init__(pause=0)
+
+    def subscribe(self):
+        """No external subscriptions needed; data is pulled from shared_container."""
+        pass
+
+    def thread_work(self):
+        """Tracks the obstacles of the next revolution."""
+        scan = self.scans.acquire(self._last_seq, timeout=self.MAX_STALE_TIME)
+        if scan is None:
+            if self._tracking:
+                # Lidar lost or frozen: the tracks cannot be trusted anymore
+                self.tracker.reset()
+                self._tracking = False
+                self.tracksSender.send({"timestamp": time.perf_counter(), "min_ttc": math.inf, "tracks": []})
+            return
+
+        try:
+            self._last_seq = scan.seq
+            self._tracking = True
+            angle, distance, _ = scan.points()
+            clusters = obstacleTracker.segment(angle, distance)
+            tracks = self.tracker.update(clusters, scan.sensor_time)
+            min_ttc = min((track["ttc"] for track in tracks), default=math.inf)
+            self.tracksSender.send({"timestamp": scan.timestamp, "min_ttc": min_ttc, "tracks": tracks})
+
+            if self.debugging and min_ttc < 3.0:
+                print(f"[LiDAR Tracker] {len(tracks)} tracks, time-to-collision {min_ttc:.2f} s")
+
+        except Exception as e:
+            self.logging.error(f"[LiDAR Tracker] Error tracking scan: {e}")
+            self.tracker.reset()
+
+        finally:
+            self.scans.release(scan)
@@ -29,16 +29,20 @@
 # ==============================================================================
 # PROCESS DESCRIPTION:
 # THIS PROCESS MANAGES THE CAMERA HARDWARE AND THE ENTIRE VISION PIPELINE.
-# IT INTEGRATES PERCEPTION (LANE) AND OBJECT DETECTION (SIGNS) TO MINIMIZE
-# LATENCY BY SHARING THE RAW CV2 MAT IMAGE VIA SHARED RAM.
+# IT INTEGRATES PERCEPTION (LANE) TO MINIMIZE LATENCY BY SHARING THE RAW
+# CV2 MAT IMAGE VIA SHARED RAM. OBJECT DETECTION (SIGNS) RUNS IN processSigns,
+# FED FROM THE SHARED MEMORY FRAME RING OF threadCamera.
 # 
 # THREADS:
-#   - threadCamera: Captures frames and stores them in shared_container['frame'].
+#   - threadCamera: Captures frames and publishes them in shared_container['frames'].
 #   - threadLane: Processes the shared frame for Stanley Control (e_y, theta_e).
-#   - threadSigns: Processes the shared frame with YOLO for Traffic Signs.
 #
 # SHARED RESOURCES:
-#   - shared_container: Dictionary {'frame': np_array} for zero-latency transfer.
+#   - shared_container: Dictionary {'frames': latestFrame, 'bev': bevRemap} for zero-latency transfer:
+#                       the newest frame with its sequence number, capture time and derived images
+#                       (framePyramid.py), and a condition the vision threads wait on, so each of them
+#                       processes each frame at most once. 'bev' is the BEV calibration used by
+#                       threadCamera to build the BEV ROI and reloaded by threadLane.
 # ==============================================================================
 
 if __name__ == "__main__":
@@ -48,7 +52,8 @@ if __name__ == "__main__":
 from src.templates.workerprocess import WorkerProcess
 from src.hardware.camera.threads.threadCamera import threadCamera
 from src.hardware.camera.threads.threadLane import threadLane
-from src.hardware.camera.threads.threadSigns import threadSigns
+from src.hardware.camera.threads.latestFrame import latestFrame
+from src.hardware.camera.threads.bevRemap import bevRemap
 from src.statemachine.stateMachine import StateMachine
 from src.statemachine.systemMode import SystemMode
 from src.utils.messages.messageHandlerSubscriber import messageHandlerSubscriber
@@ -61,15 +66,18 @@ class processCamera(WorkerProcess):
             queueList (dictionar of multiprocessing.queues.Queue): Dictionar of queues where the ID is the type of messages.
             logging (logging object): Made for debugging.
             debugging (bool, optional): A flag for debugging. Defaults to False.
+            source (frameSource, optional): Frame source of threadCamera (picamera2, replay or synthetic, see
+                frameSources.py). Opened in the camera process. Defaults to the picamera2 camera.
     """
 
     # ====================================== INIT ==========================================
-    def __init__(self, queueList, logging, ready_event=None, debugging=False):
+    def __init__(self, queueList, logging, ready_event=None, debugging=False, source=None):
         self.queuesList = queueList
         self.logging = logging
         self.debugging = debugging
+        self.source = source
         # Internal container to share the OpenCV frame between threads without Gateway overhead
-        self.shared_container = {'frame': None}
+        self.shared_container = {'frames': latestFrame(), 'bev': bevRemap()}
         self.stateChangeSubscriber = messageHandlerSubscriber(self.queuesList, StateChange, "lastOnly", True)
 
         super(processCamera, self).__init__(self.queuesList, ready_event)
@@ -89,7 +97,7 @@ class processCamera(WorkerProcess):
     def _init_threads(self):
         # 1. Hardware Thread: Captures the frame and puts it in self.shared_container
         camTh = threadCamera(
-            self.queuesList, self.logging, self.debugging, self.shared_container
+            self.queuesList, self.logging, self.debugging, self.shared_container, self.source
         )
         self.threads.append(camTh)
 
@@ -99,12 +107,6 @@ class processCamera(WorkerProcess):
         )
         self.threads.append(laneTh)
 
-        # 3. Object Detection Thread: Uses YOLO for signs and obstacles
-        signTh = threadSigns(
-            self.queuesList, self.logging, self.debugging, self.shared_container
-        )
-        self.threads.append(signTh)
-
 
 # =================================== EXAMPLE =========================================
 #             ++    THIS WILL RUN ONLY IF YOU RUN THE CODE FROM HERE  ++
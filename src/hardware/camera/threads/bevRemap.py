@@ -0,0 +1,114 @@
+# ==============================================================================
+# BEV REMAP
+#
+# Bird's Eye View of the lores camera frame for threadLane, with precomputed
+# remap tables instead of a cv2.warpPerspective per frame.
+#
+# The calibration is read from a JSON file (bevCalibration.json):
+#   {
+#       "input_size":    [w, h],        camera frame size in pixels
+#       "output_size":   [w, h],        BEV size in pixels
+#       "src":           [[x, y] * 4],  trapezoid in the camera frame, as fractions of
+#                                       input_size: top-left, top-right, bottom-left, bottom-right
+#       "roi_top":       float,         first BEV row used by the lane tracker, fraction of the height
+#       "track_width_m": float          width of the road covered by the BEV width
+#   }
+# The trapezoid is mapped onto the whole output. Previous (narrower, metric
+# BEV tuning attempt) trapezoid: [[0.35, 0.65], [0.65, 0.65], [0.05, 1.0], [0.95, 1.0]].
+#
+# Only the ROI rows (roi_top..height) of the BEV are ever used, so the maps
+# only cover them: for every ROI pixel, its source position through the
+# inverse homography, converted once to fixed-point maps (CV_16SC2 + CV_16UC1
+# interpolation table) for cv2.remap. warp() returns the ROI only, the
+# colour thresholding downstream never sees the discarded rows.
+#
+# reload() rebuilds the maps when the file was modified, so a new
+# calibration is picked up without restarting. The whole file is parsed and
+# the maps built before any attribute changes: a bad edit leaves the previous
+# calibration in place and is retried at the next reload() until fixed. Only
+# the maps are swapped atomically: warp() on a concurrent thread (threadCamera,
+# see framePyramid.py) uses either the old or the new tables, but reading the
+# geometry attributes next to it may momentarily mix both calibrations.
+# ==============================================================================
+
+import json
+import os
+
+import cv2
+import numpy as np
+
+DEFAULT_CONFIG = "src/hardware/camera/bevCalibration.json"
+
+
+class bevRemap:
+    """Perspective transform of the camera frame to the ROI of the Bird's Eye View.\n
+    Args:
+        config_path (string, optional): Path of the calibration file. Defaults to DEFAULT_CONFIG.
+    """
+
+    def __init__(self, config_path=DEFAULT_CONFIG):
+        self.config_path = config_path
+        self._mtime = None
+        self.load()
+
+    def load(self):
+        """Reads the calibration and builds the remap tables. Nothing changes if the file is invalid."""
+        mtime = os.path.getmtime(self.config_path)
+        with open(self.config_path, "r") as file:
+            config = json.load(file)
+
+        input_size = tuple(int(v) for v in config["input_size"])
+        width, height = (int(v) for v in config["output_size"])
+        roi_fraction = float(config.get("roi_top", 0.5))
+        roi_top = int(height * roi_fraction)
+        track_width_m = float(config.get("track_width_m", 0.35))
+        if len(input_size) != 2 or width <= 0 or height <= 0 or not 0 <= roi_top < height or track_width_m <= 0:
+            raise ValueError("invalid sizes, roi_top or track_width_m")
+
+        in_w, in_h = input_size
+        src = np.float32(config["src"]) * np.float32([in_w, in_h])
+        if src.shape != (4, 2):
+            raise ValueError("src must hold 4 [x, y] corners")
+        dst = np.float32([[0, 0], [width, 0], [0, height], [width, height]])
+        matrix = cv2.getPerspectiveTransform(src, dst)
+        maps = self._build_maps(np.linalg.inv(matrix), width, height, roi_top)
+
+        self.input_size = input_size
+        self.width, self.height = width, height
+        self.roi_fraction = roi_fraction
+        self.roi_top = roi_top
+        self.track_width_m = track_width_m
+        self.pixels_per_meter = width / track_width_m
+        self.matrix = matrix
+        self.maps = maps
+        self._mtime = mtime
+
+    @staticmethod
+    def _build_maps(inverse, width, height, roi_top):
+        """Source position of every ROI pixel, as fixed-point remap tables."""
+        xs, ys = np.meshgrid(np.arange(width, dtype=np.float64),
+                             np.arange(roi_top, height, dtype=np.float64))
+        points = np.stack((xs, ys, np.ones_like(xs)), axis=-1) @ inverse.T
+        map_x = (points[..., 0] / points[..., 2]).astype(np.float32)
+        map_y = (points[..., 1] / points[..., 2]).astype(np.float32)
+        return cv2.convertMaps(map_x, map_y, cv2.CV_16SC2)
+
+    def reload(self):
+        """Rebuilds the maps if the calibration file changed.
+
+        Returns:
+            bool: True if a new calibration was loaded.
+        """
+        try:
+            if os.path.getmtime(self.config_path) == self._mtime:
+                return False
+            self.load()
+            return True
+        except (OSError, ValueError, KeyError, TypeError, cv2.error) as e:
+            print("WARNING! Could not reload the BEV calibration.", self.config_path, e)
+            return False
+
+    def warp(self, frame):
+        """Returns the ROI (rows roi_top..height) of the Bird's Eye View of a camera frame."""
+        map1, map2 = self.maps
+        return cv2.remap(frame, map1, map2, cv2.INTER_LINEAR, borderMode=cv2.BORDER_CONSTANT)
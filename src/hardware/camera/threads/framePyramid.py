@@ -0,0 +1,63 @@
+# ==============================================================================
+# FRAME PYRAMID
+#
+# Images derived from the lores BGR frame, built once per frame by
+# threadCamera instead of by each consumer:
+#   - "bev_roi"   : ROI of the Bird's Eye View (bevRemap.warp), for threadLane
+#   - "detector"  : letterboxed square detector input (aspect ratio kept, padded
+#                   with grey 114 like ultralytics does), for processSigns
+#
+# bev_roi travels with the frame in latestFrame (cameraFrame.derived), the
+# detector input in its own sharedFrameRing ("ewolf_detectorInput"), both
+# under the frame's sequence number.
+#
+# The dashboard thumbnail (serialCamera preview) is not built here: the
+# previewEncoder resizes it in its worker, at the preview size set in
+# threadCamera, and only while a client is watching (see previewEncoder.py).
+#
+# Every call returns a new bev_roi array (threadLane keeps it without a copy);
+# the detector canvas is preallocated and reused, as it is only ever copied
+# into the ring.
+# ==============================================================================
+
+import cv2
+import numpy as np
+
+LETTERBOX_FILL = 114
+
+
+class framePyramid:
+    """Builds the derived images of the lores frames.\n
+    Args:
+        bev (bevRemap): BEV calibration shared with threadLane.
+        detector_size (int, optional): Side of the square detector input. Defaults to 640.
+    """
+
+    def __init__(self, bev, detector_size=640):
+        self.bev = bev
+        self.detector_size = detector_size
+        self._canvas = np.full((detector_size, detector_size, 3), LETTERBOX_FILL, dtype=np.uint8)
+        self._letterbox = None     # (input shape, scale, (width, height), (pad_x, pad_y))
+
+    def letterbox_geometry(self, width, height):
+        """Returns the scale and the (pad_x, pad_y) of the letterboxed image of a width x height frame."""
+        scale = min(self.detector_size / width, self.detector_size / height)
+        size = (int(round(width * scale)), int(round(height * scale)))
+        pad = ((self.detector_size - size[0]) // 2, (self.detector_size - size[1]) // 2)
+        return scale, size, pad
+
+    def letterbox(self, frame):
+        """Scales the frame into the preallocated square canvas, keeping its aspect ratio."""
+        height, width = frame.shape[:2]
+        if self._letterbox is None or self._letterbox[0] != (width, height):
+            self._canvas[:] = LETTERBOX_FILL
+            self._letterbox = ((width, height),) + self.letterbox_geometry(width, height)
+        _, _, size, (pad_x, pad_y) = self._letterbox
+        self._canvas[pad_y:pad_y + size[1], pad_x:pad_x + size[0]] = cv2.resize(frame, size, interpolation=cv2.INTER_LINEAR)
+        return self._canvas
+
+    def build(self, frame):
+        """Returns the images that travel with the frame: {"bev_roi"}."""
+        return {
+            "bev_roi": self.bev.warp(frame),
+        }
@@ -0,0 +1,272 @@
+# ==============================================================================
+# FRAME SOURCES
+#
+# Where threadCamera gets its frames from. Every source delivers, per
+# capture, the main frame (RGB888, dashboard / recording) and the lores
+# frame already converted to BGR (threadLane, processSigns):
+#
+#   source.start()                       # in the camera process
+#   frames = source.capture()            # (main, lores) or None
+#   source.set_controls({...})           # picamera2 controls, ignored elsewhere
+#   source.stop()
+#
+#   - picameraSource  : the Raspberry Pi camera (picamera2, imported only here)
+#   - replaySource    : a video or a directory of images, paced at the recorded
+#                       timestamps (scaled by 'speed') or as fast as possible
+#                       (speed 0), optionally looping
+#   - syntheticSource : a generated drive (lane boundaries drawn in the Bird's
+#                       Eye View and warped into the camera view), for load
+#                       tests without any recording
+#
+# capture() blocks until the next frame is due, like capture_array() does on
+# the car, so processCamera runs at the source's frame rate. It returns None
+# when no frame is available (a replay that ended without looping).
+# ==============================================================================
+
+import os
+import time
+
+import cv2
+import numpy as np
+
+_IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".bmp")
+
+
+class frameSource:
+    """Interface of the frame sources.\n
+    Args:
+        main_size (tuple): (width, height) of the main frame.
+        lores_size (tuple): (width, height) of the lores frame.
+    """
+
+    def __init__(self, main_size, lores_size):
+        self.main_size = tuple(main_size)
+        self.lores_size = tuple(lores_size)
+        self.finished = False
+
+    def start(self):
+        """Opens the source. Returns False if it is not available."""
+        return True
+
+    def capture(self):
+        """Returns the next (main RGB, lores BGR) frames, or None if there is none."""
+        raise NotImplementedError
+
+    def set_controls(self, controls):
+        """Applies camera controls (brightness, contrast...), if the source has any."""
+        pass
+
+    def stop(self):
+        """Closes the source."""
+        pass
+
+
+class picameraSource(frameSource):
+    """The Raspberry Pi camera, through picamera2."""
+
+    def __init__(self, main_size=(2048, 1080), lores_size=(512, 270)):
+        super(picameraSource, self).__init__(main_size, lores_size)
+        self.camera = None
+
+    def start(self):
+        import picamera2
+
+        # check if camera is available
+        if len(picamera2.Picamera2.global_camera_info()) == 0:
+            print(f"\033[1;97m[ Camera Thread ] :\033[0m \033[1;91mERROR\033[0m - No camera detected. Camera functionality will be disabled.")
+            return False
+
+        self.camera = picamera2.Picamera2()
+        config = self.camera.create_preview_configuration(
+            buffer_count=1,
+            queue=False,
+            main={"format": "RGB888", "size": self.main_size},
+            lores={"size": self.lores_size},
+            encode="lores",
+        )
+        self.camera.configure(config) # type: ignore
+        self.camera.start()
+        return True
+
+    def capture(self):
+        main = self.camera.capture_array("main")
+        lores = self.camera.capture_array("lores")  # Will capture an array that can be used by OpenCV library
+        # Convert to BGR for OpenCV compatibility
+        return main, cv2.cvtColor(lores, cv2.COLOR_YUV2BGR_I420) # type: ignore
+
+    def set_controls(self, controls):
+        self.camera.set_controls(controls)
+
+    def stop(self):
+        if self.camera is not None:
+            self.camera.stop()
+
+
+class pacedSource(frameSource):
+    """Base of the sources that pace their frames themselves.\n
+    Args:
+        speed (float): 1.0 = recorded pace, 0 = as fast as possible.
+    """
+
+    def __init__(self, main_size, lores_size, speed):
+        super(pacedSource, self).__init__(main_size, lores_size)
+        self.speed = speed
+        self._origin = None
+
+    def _wait_until(self, timestamp):
+        """Sleeps until the frame recorded at 'timestamp' (s since the first one) is due."""
+        if self.speed <= 0:
+            return
+        now = time.perf_counter()
+        if self._origin is None or timestamp == 0.0:
+            self._origin = now - timestamp / self.speed
+        delay = self._origin + timestamp / self.speed - now
+        if delay > 0:
+            time.sleep(delay)
+
+    def _frames(self, frame):
+        """Derives the (main RGB, lores BGR) frames from one BGR frame."""
+        lores = frame
+        if (frame.shape[1], frame.shape[0]) != self.lores_size:
+            lores = cv2.resize(frame, self.lores_size, interpolation=cv2.INTER_AREA)
+        main = frame
+        if (frame.shape[1], frame.shape[0]) != self.main_size:
+            main = cv2.resize(frame, self.main_size, interpolation=cv2.INTER_LINEAR)
+        # picamera2 "RGB888" is BGR in memory, as OpenCV expects
+        return main, lores
+
+
+class replaySource(pacedSource):
+    """A recorded video or a directory of images (sorted by name).\n
+    Args:
+        path (string): Video file or directory. A directory may hold a timestamps.txt with the capture time
+            (s) of each image, one per line; otherwise the images are paced at 'fps'.
+        speed (float, optional): 1.0 = recorded pace, 0 = as fast as possible. Defaults to 1.0.
+        loop (bool, optional): Start over at the end. Defaults to False.
+        fps (float, optional): Pace of an image directory without timestamps. Defaults to 30.0.
+        main_size (tuple, optional): Main frame size, None to keep the recorded size. Defaults to None.
+        lores_size (tuple, optional): Lores frame size. Defaults to (512, 270).
+    """
+
+    def __init__(self, path, speed=1.0, loop=False, fps=30.0, main_size=None, lores_size=(512, 270)):
+        super(replaySource, self).__init__(main_size or (0, 0), lores_size, speed)
+        self.path = path
+        self.loop = loop
+        self.fps = fps
+        self._keep_main_size = main_size is None
+        self._capture = None
+        self._images = None
+        self._timestamps = None
+        self._index = 0
+
+    def start(self):
+        if os.path.isdir(self.path):
+            self._images = sorted(
+                os.path.join(self.path, name) for name in os.listdir(self.path) if name.lower().endswith(_IMAGE_EXTENSIONS)
+            )
+            stamps = os.path.join(self.path, "timestamps.txt")
+            if os.path.exists(stamps):
+                with open(stamps) as file:
+                    self._timestamps = [float(line) for line in file if line.strip()]
+            if not self._images:
+                print(f"\033[1;97m[ Camera Thread ] :\033[0m \033[1;91mERROR\033[0m - No images in {self.path}")
+                return False
+        else:
+            self._capture = cv2.VideoCapture(self.path)
+            if not self._capture.isOpened():
+                print(f"\033[1;97m[ Camera Thread ] :\033[0m \033[1;91mERROR\033[0m - Cannot open {self.path}")
+                return False
+        return True
+
+    def _read(self):
+        """Returns the next recorded BGR frame and its timestamp, or None at the end."""
+        if self._images is not None:
+            if self._index >= len(self._images):
+                return None
+            frame = cv2.imread(self._images[self._index], cv2.IMREAD_COLOR)
+            if self._timestamps is not None and self._index < len(self._timestamps):
+                timestamp = self._timestamps[self._index] - self._timestamps[0]
+            else:
+                timestamp = self._index / self.fps
+            self._index += 1
+            return frame, timestamp
+        ok, frame = self._capture.read()
+        if not ok:
+            return None
+        return frame, self._capture.get(cv2.CAP_PROP_POS_MSEC) / 1000.0
+
+    def capture(self):
+        if self.finished:
+            return None
+        result = self._read()
+        if result is None and self.loop:
+            self._index = 0
+            if self._capture is not None:
+                self._capture.set(cv2.CAP_PROP_POS_FRAMES, 0)
+            result = self._read()
+        if result is None or result[0] is None:
+            self.finished = True
+            return None
+        frame, timestamp = result
+        if self._keep_main_size:
+            self.main_size = (frame.shape[1], frame.shape[0])
+        self._wait_until(timestamp)
+        return self._frames(frame)
+
+    def stop(self):
+        if self._capture is not None:
+            self._capture.release()
+
+
+def synthetic_frames(bev, count=None, seed=0):
+    """Yields the BGR camera frames of a synthetic drive: lane boundaries drawn in the BEV with a drifting
+    offset and curvature, warped into the camera view with the calibration of 'bev' (a bevRemap)."""
+    rng = np.random.default_rng(seed)
+    width, height = bev.width, bev.height
+    in_w, in_h = bev.input_size
+    rows = np.arange(height, dtype=np.float64)
+    index = 0
+    while count is None or index < count:
+        phase = index / 40.0
+        offset = 30.0 * np.sin(phase)                   # px, lateral drift of the car
+        bend = 0.0015 * np.sin(phase * 0.7)             # px^-1, curvature of the lane
+        top = height - rows
+        image = np.full((height, width, 3), 60, dtype=np.uint8)
+        for base in (48.0, width - 48.0):
+            xs = base + offset + bend * top * top
+            points = np.stack((xs, rows), axis=1).astype(np.int32)
+            cv2.polylines(image, [points], False, (235, 235, 235), 10)
+        frame = cv2.warpPerspective(image, bev.matrix, (in_w, in_h), flags=cv2.WARP_INVERSE_MAP | cv2.INTER_LINEAR)
+        noise = rng.normal(0.0, 4.0, frame.shape)
+        yield np.clip(frame + noise, 0, 255).astype(np.uint8)
+        index += 1
+
+
+class syntheticSource(pacedSource):
+    """A generated drive (see synthetic_frames), for load tests without camera or recording.\n
+    Args:
+        fps (float, optional): Frame rate, 0 = as fast as possible. Defaults to 30.0.
+        main_size (tuple, optional): Main frame size, None for the lores size. Defaults to None.
+        lores_size (tuple, optional): Lores frame size. Defaults to (512, 270).
+        seed (int, optional): Seed of the image noise. Defaults to 0.
+    """
+
+    def __init__(self, fps=30.0, main_size=None, lores_size=(512, 270), seed=0):
+        super(syntheticSource, self).__init__(main_size or lores_size, lores_size, 1.0 if fps > 0 else 0.0)
+        self.fps = fps
+        self.seed = seed
+        self._frames_iter = None
+        self._index = 0
+
+    def start(self):
+        # Imported here: the calibration file is only needed by this source
+        from src.hardware.camera.threads.bevRemap import bevRemap
+        self._frames_iter = synthetic_frames(bevRemap(), seed=self.seed)
+        return True
+
+    def capture(self):
+        frame = next(self._frames_iter)
+        if self.fps > 0:
+            self._wait_until(self._index / self.fps)
+        self._index += 1
+        return self._frames(frame)
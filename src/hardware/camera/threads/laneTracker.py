@@ -0,0 +1,189 @@
+# ==============================================================================
+# LANE TRACKER
+#
+# Sliding-window lane boundary tracking on the Bird's Eye View frame.
+#
+# 1. White mask (HSV inRange) of the ROI only: the lower part of the BEV,
+#    rows roi_top..height (bevRemap.warp() produces only these rows).
+# 2. SEARCH (first frame, or after a boundary was lost): the column
+#    histogram of the lower half of the mask gives the base of the left
+#    boundary (peak in the left half) and of the right one (right half).
+#    Windows are stacked from the bottom up, each one re-centred on the mean
+#    column of the lane pixels it contains.
+# 3. TRACKING (next frames): each window is centred on the previous
+#    polynomial of its boundary, so only narrow bands around the expected
+#    line are examined.
+# 4. FIT: x = a*y^2 + b*y + c per boundary, least squares (np.polyfit) on
+#    the pixels of its windows. A boundary without enough pixels is lost and
+#    searched again on the next frame.
+#
+# From the fits, at the bottom row of the BEV (the car's position):
+#   - lane center: midpoint of the boundaries, or one boundary offset by half
+#     the last measured lane width when only one is visible;
+#   - heading: angle of the center line, 0 = aligned, positive when the lane
+#     turns to the right of the image;
+#   - curvature (1/px): positive when the lane bends to the right.
+# ==============================================================================
+
+import cv2
+import numpy as np
+
+
+class laneFit:
+    """Second-order polynomial x(y) of one lane boundary, in BEV pixels."""
+
+    __slots__ = ("coefficients", "pixels")
+
+    def __init__(self, coefficients, pixels):
+        self.coefficients = coefficients
+        self.pixels = pixels
+
+    def x(self, y):
+        a, b, c = self.coefficients
+        return (a * y + b) * y + c
+
+    def slope(self, y):
+        """dx/dy at row y."""
+        a, b, _ = self.coefficients
+        return 2.0 * a * y + b
+
+
+class laneTracker:
+    """Finds and follows the two lane boundaries in the ROI of a BEV frame.\n
+    Args:
+        width (int): BEV width in pixels.
+        height (int): BEV height in pixels.
+        lower_white (np.ndarray): Lower HSV bound of the lane markings.
+        upper_white (np.ndarray): Upper HSV bound of the lane markings.
+        roi_top (float, optional): First row examined, as a fraction of the height. Defaults to 0.5.
+        windows (int, optional): Number of stacked windows per boundary. Defaults to 9.
+        margin (int, optional): Half width of a window in pixels. Defaults to 40.
+        min_pixels (int, optional): Lane pixels needed to re-centre a window. Defaults to 20.
+        min_fit_pixels (int, optional): Lane pixels needed to fit a boundary. Defaults to 60.
+    """
+
+    def __init__(self, width, height, lower_white, upper_white, roi_top=0.5, windows=9,
+                 margin=40, min_pixels=20, min_fit_pixels=60):
+        self.width = width
+        self.height = height
+        self.lower_white = lower_white
+        self.upper_white = upper_white
+        self.roi_top = int(height * roi_top)
+        self.windows = windows
+        self.margin = margin
+        self.min_pixels = min_pixels
+        self.min_fit_pixels = min_fit_pixels
+
+        self.window_height = max(1, (height - self.roi_top) // windows)
+        self.lane_width = width / 2.0     # px, updated whenever both boundaries are seen
+        self.left = None                  # laneFit of the previous frame, None when lost
+        self.right = None
+
+    def reset(self):
+        """Forgets both boundaries: the next frame starts with a histogram search."""
+        self.left = None
+        self.right = None
+
+    def mask(self, roi_frame):
+        """White mask of the ROI (rows roi_top..height of the BEV)."""
+        hsv = cv2.cvtColor(roi_frame, cv2.COLOR_BGR2HSV)
+        return cv2.inRange(hsv, self.lower_white, self.upper_white)
+
+    def _bases(self, mask):
+        """Histogram search of the boundary bases, None for a side without lane pixels."""
+        histogram = np.count_nonzero(mask[mask.shape[0] // 2:], axis=0)
+        middle = self.width // 2
+        bases = []
+        for start, end in ((0, middle), (middle, self.width)):
+            peak = start + int(np.argmax(histogram[start:end]))
+            bases.append(peak if histogram[peak] > 0 else None)
+        return bases
+
+    def _follow(self, mask, base, previous):
+        """Collects the lane pixels of one boundary window by window, bottom to top.
+
+        Returns:
+            tuple(np.ndarray, np.ndarray): Rows (BEV coordinates) and columns of the pixels.
+        """
+        rows, cols = [], []
+        x = base
+        for index in range(self.windows):
+            bottom = mask.shape[0] - index * self.window_height
+            top = max(0, bottom - self.window_height)
+            if previous is not None:
+                # Tracking: centre on the previous fit at the middle of the window
+                x = previous.x(self.roi_top + (top + bottom) / 2.0)
+            left = int(max(0, x - self.margin))
+            right = int(min(self.width, x + self.margin))
+            if right <= left:
+                continue
+            ys, xs = np.nonzero(mask[top:bottom, left:right])
+            if ys.size == 0:
+                continue
+            rows.append(ys + (top + self.roi_top))
+            cols.append(xs + left)
+            if previous is None and ys.size >= self.min_pixels:
+                x = left + xs.mean()
+        if not rows:
+            return np.empty(0), np.empty(0)
+        return np.concatenate(rows), np.concatenate(cols)
+
+    def _fit(self, rows, cols):
+        # A curve needs pixels spread over at least two windows
+        if rows.size < self.min_fit_pixels or np.ptp(rows) < self.window_height:
+            return None
+        return laneFit(np.polyfit(rows.astype(np.float64), cols.astype(np.float64), 2), rows.size)
+
+    def update(self, roi_frame):
+        """Detects the lane boundaries in the ROI (rows roi_top..height) of a new BEV frame.
+
+        Returns:
+            tuple | None: (lane_center_px, heading_rad, curvature_per_px) at the bottom row, or None
+            if no boundary was found.
+        """
+        return self.track(self.mask(roi_frame))
+
+    def track(self, mask):
+        """Detects the lane boundaries in the white mask of the ROI, see update()."""
+        bases = (None, None)
+        if self.left is None or self.right is None:
+            bases = self._bases(mask)
+
+        fits = []
+        for previous, base in ((self.left, bases[0]), (self.right, bases[1])):
+            if previous is None and base is None:
+                fits.append(None)
+                continue
+            rows, cols = self._follow(mask, base, previous)
+            fits.append(self._fit(rows, cols))
+        self.left, self.right = fits
+
+        y = self.height - 1
+        if self.left is not None and self.right is not None:
+            left_x, right_x = self.left.x(y), self.right.x(y)
+            if right_x - left_x < self.width / 8:
+                # Both fits locked on the same marking: keep the better supported one
+                if self.left.pixels >= self.right.pixels:
+                    self.right = None
+                else:
+                    self.left = None
+            else:
+                self.lane_width = right_x - left_x
+
+        if self.left is not None and self.right is not None:
+            center = (self.left.x(y) + self.right.x(y)) / 2.0
+            slope = (self.left.slope(y) + self.right.slope(y)) / 2.0
+            second = self.left.coefficients[0] + self.right.coefficients[0]   # (2a_l + 2a_r) / 2
+        elif self.left is not None or self.right is not None:
+            fit = self.left if self.left is not None else self.right
+            offset = self.lane_width / 2.0 if fit is self.left else -self.lane_width / 2.0
+            center = min(max(fit.x(y) + offset, 0.0), float(self.width))
+            slope = fit.slope(y)
+            second = 2.0 * fit.coefficients[0]
+        else:
+            return None
+
+        # Rows grow downwards: the lane going "up" the image is -y
+        heading = float(np.arctan(-slope))
+        curvature = float(second / (1.0 + slope * slope) ** 1.5)
+        return float(center), heading, curvature
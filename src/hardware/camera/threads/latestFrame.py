@@ -0,0 +1,71 @@
+# ==============================================================================
+# LATEST FRAME
+#
+# Hand-off of the lores BGR frame from threadCamera to the vision thread
+# (threadLane) of processCamera. The sign detector runs in its own process
+# (processSigns) and reads the letterboxed detector input from the
+# "ewolf_detectorInput" sharedFrameRing instead.
+#
+# threadCamera publishes every frame with its sequence number (the same one
+# as in the sharedFrameRing slots) and capture time. Consumers block on
+# a Condition until a frame newer than the last one they processed exists:
+#
+#   frame = frames.wait_next(last_seq, timeout)    # None on timeout
+#   ... frame.image, frame.seq, frame.timestamp ...
+#
+# so every frame is processed at most once per consumer, and a consumer that
+# is slower than the camera skips straight to the newest frame
+# (frame.seq - last_seq - 1 frames skipped). frame.derived holds the images
+# threadCamera built from it (see framePyramid.py), e.g. derived["bev_roi"].
+# Published images are never modified afterwards (each capture is a new
+# array), so they are shared without copies.
+# ==============================================================================
+
+import threading
+
+
+class cameraFrame:
+    """One published frame."""
+
+    __slots__ = ("image", "seq", "timestamp", "derived")
+
+    def __init__(self, image, seq, timestamp, derived=None):
+        self.image = image
+        self.seq = seq
+        self.timestamp = timestamp      # time.perf_counter() of the capture
+        self.derived = derived if derived is not None else {}
+
+
+class latestFrame:
+    """Newest camera frame, with new-frame signalling."""
+
+    def __init__(self):
+        self._condition = threading.Condition()
+        self._frame = None
+
+    @property
+    def seq(self):
+        """Sequence number of the newest frame (0 before the first one)."""
+        frame = self._frame
+        return 0 if frame is None else frame.seq
+
+    def publish(self, image, timestamp, seq, derived=None):
+        """Replaces the newest frame (with its derived images) and wakes up the waiting consumers."""
+        with self._condition:
+            self._frame = cameraFrame(image, seq, timestamp, derived)
+            self._condition.notify_all()
+
+    def latest(self):
+        """Returns the newest frame (or None) without waiting."""
+        return self._frame
+
+    def wait_next(self, last_seq=0, timeout=None):
+        """Waits for a frame newer than last_seq.
+
+        Returns:
+            cameraFrame | None: The newest frame, or None if none arrived within the timeout.
+        """
+        with self._condition:
+            if self._condition.wait_for(lambda: self._frame is not None and self._frame.seq > last_seq, timeout):
+                return self._frame
+            return None
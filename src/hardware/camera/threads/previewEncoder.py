@@ -0,0 +1,117 @@
+# ==============================================================================
+# PREVIEW ENCODER
+#
+# JPEG + base64 encoding of the dashboard camera previews (mainCamera,
+# serialCamera) off the capture thread.
+#
+# threadCamera hands every captured frame to submit() and goes back to
+# capturing; a small worker pool does the resize, cv2.imencode and base64
+# (both release the GIL for most of their work) and sends the result. A
+# stream is encoded only when:
+#   - the dashboard has at least one viewer (DashboardViewers mailbox, read
+#     from its current value, so clients connected before the camera process
+#     started are seen),
+#   - the stream's message has a subscriber at the gateway (e.g. the dashboard
+#     never subscribes mainCamera, see subscriberCounts.py),
+#   - its preview period (1 / rate) has elapsed since its previous frame,
+#   - its previous frame is done: at most one encode per stream is in flight,
+#     newer frames are skipped rather than queued behind a slow encode.
+# The last condition also makes the per-stream resize buffer (preallocated
+# at the preview resolution) safe to reuse without copies.
+#
+# Frames passed to submit() must not be modified afterwards (the capture
+# returns a new array for every frame).
+# ==============================================================================
+
+import base64
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import cv2
+import numpy as np
+
+
+class previewStream:
+    """Encoding settings and state of one preview stream.\n
+    Args:
+        sender (messageHandlerSender): Sender of the encoded preview.
+        size (tuple, optional): Preview (width, height), None to keep the frame size. Defaults to None.
+        rate (float, optional): Highest preview rate in Hz. Defaults to 5.0.
+        quality (int, optional): JPEG quality. Defaults to 80.
+    """
+
+    def __init__(self, sender, size=None, rate=5.0, quality=80):
+        self.sender = sender
+        self.size = size
+        self.period = 1.0 / rate
+        self.params = [cv2.IMWRITE_JPEG_QUALITY, int(quality)]
+        self.buffer = None if size is None else np.empty((size[1], size[0], 3), dtype=np.uint8)
+        self.next_time = 0.0
+        self.pending = None       # Future of the encode in flight
+        self.encoded = 0
+        self.skipped = 0
+
+
+class previewEncoder:
+    """Worker pool encoding the preview streams of threadCamera.\n
+    Args:
+        streams (dict): {name: previewStream}.
+        viewers (messageHandlerSubscriber): Subscriber of DashboardViewers.
+        workers (int, optional): Encoding threads. Defaults to 2.
+    """
+
+    def __init__(self, streams, viewers, workers=2):
+        self.streams = streams
+        self._viewersSubscriber = viewers
+        self.viewers = 0
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="previewEncoder")
+
+    def active(self):
+        """Checks whether a dashboard client is watching."""
+        viewers = self._viewersSubscriber.receive()
+        if viewers is not None:
+            self.viewers = viewers
+        return self.viewers > 0
+
+    def submit(self, frames, timestamp=None):
+        """Schedules the encoding of the frames that are due.
+
+        Args:
+            frames (dict): {name: frame} of the streams.
+            timestamp (float, optional): Capture time (time.perf_counter()). Defaults to now.
+        """
+        if not self.active():
+            return
+        if timestamp is None:
+            timestamp = time.perf_counter()
+        for name, frame in frames.items():
+            stream = self.streams[name]
+            if timestamp < stream.next_time or not stream.sender.has_subscribers():
+                continue
+            if stream.pending is not None and not stream.pending.done():
+                stream.skipped += 1
+                continue
+            stream.next_time += stream.period
+            if stream.next_time <= timestamp:
+                stream.next_time = timestamp + stream.period
+            stream.pending = self._pool.submit(self._encode, stream, frame)
+
+    def _encode(self, stream, frame):
+        try:
+            if stream.buffer is not None:
+                frame = cv2.resize(frame, stream.size, dst=stream.buffer, interpolation=cv2.INTER_AREA)
+            ok, encoded = cv2.imencode(".jpg", frame, stream.params)
+            if not ok:
+                return
+            stream.sender.send(base64.b64encode(encoded).decode("utf-8"))
+            stream.encoded += 1
+        except Exception as e:
+            print(f"\033[1;97m[ Camera ] :\033[0m \033[1;91mERROR\033[0m - Preview encoding failed ({e})")
+
+    def stats(self):
+        """Returns {name: {"encoded", "skipped"}} of every stream."""
+        return {name: {"encoded": s.encoded, "skipped": s.skipped} for name, s in self.streams.items()}
+
+    def close(self):
+        """Stops the workers, encodes still queued are dropped."""
+        self._pool.shutdown(wait=False, cancel_futures=True)
@@ -28,20 +28,26 @@
 
 import cv2
 import threading
-import base64
-import picamera2
 import time
 
 from src.utils.messages.allMessages import (
     mainCamera,
     serialCamera,
+    mainCameraFrame,
+    serialCameraFrame,
     Recording,
     Record,
     Brightness,
     Contrast,
+    DashboardViewers,
 )
 from src.utils.messages.messageHandlerSender import messageHandlerSender
 from src.utils.messages.messageHandlerSubscriber import messageHandlerSubscriber
+from src.utils.messages.sharedFrameRing import sharedFrameRing
+from src.utils.messages import subscriberCounts
+from src.hardware.camera.threads.previewEncoder import previewEncoder, previewStream
+from src.hardware.camera.threads.frameSources import picameraSource
+from src.hardware.camera.threads.framePyramid import framePyramid
 from src.templates.threadwithstop import ThreadWithStop
 from src.utils.messages.allMessages import StateChange
 from src.utils.messages.messageHandlerSubscriber import messageHandlerSubscriber
@@ -53,15 +59,18 @@ class threadCamera(ThreadWithStop):
         queuesList (dictionar of multiprocessing.queues.Queue): Dictionar of queues where the ID is the type of messages.
         logger (logging object): Made for debugging.
         debugger (bool): A flag for debugging.
+        shared_container (dict): Process RAM container shared with threadLane.
+        source (frameSource, optional): Where the frames come from (see frameSources.py). Defaults to the picamera2 camera.
     """
 
     # ================================ INIT ===============================================
-    def __init__(self, queuesList, logger, debugger, shared_container): # Added shared_container
+    def __init__(self, queuesList, logger, debugger, shared_container, source=None): # Added shared_container
         super(threadCamera, self).__init__(pause=0.001)
         self.queuesList = queuesList
         self.logger = logger
         self.debugger = debugger
         self.shared_container = shared_container # Reference to the process RAM container
+        self.source = source if source is not None else picameraSource()
         self.frame_rate = 5
         self.recording = False
 
@@ -70,8 +79,33 @@ class threadCamera(ThreadWithStop):
         self.recordingSender = messageHandlerSender(self.queuesList, Recording)
         self.mainCameraSender = messageHandlerSender(self.queuesList, mainCamera)
         self.serialCameraSender = messageHandlerSender(self.queuesList, serialCamera)
+        self.mainFrameSender = messageHandlerSender(self.queuesList, mainCameraFrame)
+        self.serialFrameSender = messageHandlerSender(self.queuesList, serialCameraFrame)
+
+        # Raw frames for other processes go through shared memory; only descriptors travel through the gateway.
+        # The rings (about 20 MB for the main stream) are created when a process first subscribes to them.
+        self.frameRings = {}
+        self.frame_seq = 0
+
+        # Images derived once per frame for the consumers (BEV ROI, detector input)
+        self.DETECTOR_SIZE = 640
+        self.pyramid = framePyramid(shared_container['bev'], self.DETECTOR_SIZE)
+        self.detectorFrameRing = sharedFrameRing("ewolf_detectorInput", (self.DETECTOR_SIZE, self.DETECTOR_SIZE, 3), slots=4)
+
+        # Dashboard previews: encoded by a worker pool, only while a dashboard client is connected
+        self.PREVIEW_RATE = 5.0                 # Hz, per stream
+        self.MAIN_PREVIEW_SIZE = (1024, 540)    # half of the main stream
+        self.SERIAL_PREVIEW_SIZE = None         # lores stream at its own size, e.g. (256, 135) for a thumbnail
+        self.PREVIEW_QUALITY = 80
 
         self.subscribe()
+        self.previewEncoder = previewEncoder(
+            {
+                "main": previewStream(self.mainCameraSender, self.MAIN_PREVIEW_SIZE, self.PREVIEW_RATE, self.PREVIEW_QUALITY),
+                "serial": previewStream(self.serialCameraSender, self.SERIAL_PREVIEW_SIZE, self.PREVIEW_RATE, self.PREVIEW_QUALITY),
+            },
+            self.viewersSubscriber,
+        )
         self._init_camera()
         self.queue_sending()
         self.configs()
@@ -83,6 +117,8 @@ class threadCamera(ThreadWithStop):
         self.brightnessSubscriber = messageHandlerSubscriber(self.queuesList, Brightness, "lastOnly", True)
         self.contrastSubscriber = messageHandlerSubscriber(self.queuesList, Contrast, "lastOnly", True)
         self.stateChangeSubscriber = messageHandlerSubscriber(self.queuesList, StateChange, "lastOnly", True)
+        # A state, not an event: viewers connected before the camera started count too
+        self.viewersSubscriber = messageHandlerSubscriber(self.queuesList, DashboardViewers, "lastOnly", True, current=True)
 
     def queue_sending(self):
         """Callback function for recording flag."""
@@ -117,39 +153,58 @@ class threadCamera(ThreadWithStop):
                         "output_video" + str(time.time()) + ".avi",
                         fourcc,
                         self.frame_rate,
-                        (2048, 1080),
+                        self.camera.main_size,
                     )
 
         except Exception as e:
             print(f"\033[1;97m[ Camera ] :\033[0m \033[1;91mERROR\033[0m - {e}")
 
         try:
-            mainRequest = self.camera.capture_array("main")
-            serialRequest = self.camera.capture_array("lores")  # Will capture an array that can be used by OpenCV library
+            # Main frame and lores frame, already converted to BGR for OpenCV compatibility
+            frames = self.camera.capture()
+            if frames is None:
+                # End of a replay
+                time.sleep(0.1)
+                return
+            mainRequest, serialRequest = frames
 
             if self.recording == True:
                 self.video_writer.write(mainRequest) # type: ignore
 
-            # Convert to BGR for OpenCV compatibility
-            serialRequest = cv2.cvtColor(serialRequest, cv2.COLOR_YUV2BGR_I420) # type: ignore
-
-            # Store raw BGR frame in shared RAM for threadLane and threadSigns
-            self.shared_container['frame'] = serialRequest
+            # One sequence number and capture time per capture, shared by every copy published below
+            self.frame_seq += 1
+            capture_time = time.perf_counter()
 
-            _, mainEncodedImg = cv2.imencode(".jpg", mainRequest) # type: ignore
-            _, serialEncodedImg = cv2.imencode(".jpg", serialRequest) # type: ignore
-
-            mainEncodedImageData = base64.b64encode(mainEncodedImg).decode("utf-8") # type: ignore
-            serialEncodedImageData = base64.b64encode(serialEncodedImg).decode("utf-8") # type: ignore
+            # Store raw BGR frame and its derived images in shared RAM for threadLane, and wake it up
+            derived = self.pyramid.build(serialRequest)
+            self.shared_container['frames'].publish(serialRequest, capture_time, self.frame_seq, derived)
+            self.detectorFrameRing.write(self.pyramid.letterbox(serialRequest), capture_time, self.frame_seq)
+            # Raw frames for other processes: written to their rings only while the gateway has a subscriber
+            # for their descriptors (none in the tree today: the rings are never even created)
+            if subscriberCounts.subscriber_count(mainCameraFrame):
+                # 6.6 MB copy per frame
+                ring = self.frame_ring("ewolf_mainCamera", (1080, 2048, 3), slots=3)
+                self.mainFrameSender.send(ring.write(mainRequest, capture_time, self.frame_seq))
+            if subscriberCounts.subscriber_count(serialCameraFrame):
+                ring = self.frame_ring("ewolf_serialCamera", (270, 512, 3), slots=4)
+                self.serialFrameSender.send(ring.write(serialRequest, capture_time, self.frame_seq))
 
             if self._blocker.is_set():
                 return
 
-            self.mainCameraSender.send(mainEncodedImageData)
-            self.serialCameraSender.send(serialEncodedImageData)
+            # Dashboard previews are encoded off the capture thread
+            self.previewEncoder.submit({"main": mainRequest, "serial": serialRequest}, capture_time)
         except Exception as e:
             print(f"\033[1;97m[ Camera ] :\033[0m \033[1;91mERROR\033[0m - {e}")
 
+    def frame_ring(self, name, shape, slots):
+        """Returns the shared memory ring of a raw stream, created on first use."""
+        ring = self.frameRings.get(name)
+        if ring is None:
+            ring = sharedFrameRing(name, shape, slots=slots)
+            self.frameRings[name] = ring
+        return ring
+
     # ================================ STATE CHANGE HANDLER ========================================
     def state_change_handler(self):
         message = self.stateChangeSubscriber.receive()
@@ -161,26 +216,15 @@ class threadCamera(ThreadWithStop):
 
     # ================================ INIT CAMERA ========================================
     def _init_camera(self):
-        """This function will initialize the camera object. It will make this camera object have two chanels "lore" and "main"."""
+        """This function will start the frame source. It will make this camera object have two chanels "lore" and "main"."""
 
         try:
-            # check if camera is available
-            if len(picamera2.Picamera2.global_camera_info()) == 0:
-                print(f"\033[1;97m[ Camera Thread ] :\033[0m \033[1;91mERROR\033[0m - No camera detected. Camera functionality will be disabled.")
+            if not self.source.start():
                 self.camera = None
                 return
-            
-            self.camera = picamera2.Picamera2()
-            config = self.camera.create_preview_configuration(
-                buffer_count=1,
-                queue=False,
-                main={"format": "RGB888", "size": (2048, 1080)},
-                lores={"size": (512, 270)},
-                encode="lores",
-            )
-            self.camera.configure(config) # type: ignore
-            self.camera.start()
-            print(f"\033[1;97m[ Camera Thread ] :\033[0m \033[1;92mINFO\033[0m - Camera initialized successfully")
+
+            self.camera = self.source
+            print(f"\033[1;97m[ Camera Thread ] :\033[0m \033[1;92mINFO\033[0m - Camera initialized successfully ({type(self.source).__name__})")
         except Exception as e:
             print(f"\033[1;97m[ Camera Thread ] :\033[0m \033[1;91mERROR\033[0m - Failed to initialize camera: {e}")
             self.camera = None
@@ -192,6 +236,10 @@ class threadCamera(ThreadWithStop):
         if self.camera is not None:
             self.camera.stop()
         super(threadCamera, self).stop()
+        self.previewEncoder.close()
+        for ring in self.frameRings.values():
+            ring.close()
+        self.detectorFrameRing.close()
 
     # =============================== CONFIG ==============================================
     def configs(self):
@@ -3,29 +3,37 @@
 # THIS THREAD CALCULATES LATERAL AND HEADING ERRORS FOR THE CONTROLLER.
 # 
 # INPUT: 
-#   - Name: shared_container['frame']
-#   - Format: Raw OpenCV BGR Mat (Zero-copy from RAM)
+#   - Name: shared_container['frames']
+#   - Format: latestFrame, raw OpenCV BGR Mat with seq / capture time (Zero-copy from RAM)
 #   - Source: threadCamera (Internal Process Memory)
 #
 # PROCESSING:
-#   - Bird's Eye View: Perspective transform focused on the 35cm track width.
-#   - Temporal Filtering: Moving average (size 5) to eliminate steering jitter.
-#   - Geometry: Calculates e_y (lateral) and theta_e (heading) relative to center.
+#   - New Frames Only: Waits for the next frame, each frame is processed once;
+#     frames published while the previous one was processed are counted as skipped.
+#   - Bird's Eye View: Precomputed remap of the ROI (lower half of the BEV) only,
+#     calibration from bevCalibration.json, reloaded when the file changes (see bevRemap.py).
+#     Built by threadCamera with the frame (derived["bev_roi"], see framePyramid.py); warped
+#     here only for frames published without it.
+#   - Lane Tracking: Sliding-window search / tracking of both boundaries with a
+#     second-order fit each (see laneTracker.py).
+#   - Temporal Filtering: Moving average (size 3) to eliminate steering jitter.
+#   - Geometry: Calculates e_y (lateral), theta_e (heading) and the curvature of the lane center.
 #   - Reliability: Provides a score (0.0 to 1.0) based on detection stability.
 #
 # OUTPUT:
 #   - Name: LaneData
-#   - Format: Dictionary {"e_y": float, "theta_e": float, "reliability": float}
+#   - Format: Dictionary {"e_y": float, "theta_e": float, "curvature": float, "reliability": float}
 #   - Destination: threadLogic (via Gateway) 
 # ==============================================================================
 
-import cv2
 import numpy as np
 import time
 from collections import deque
 from src.templates.threadwithstop import ThreadWithStop
 from src.utils.messages.messageHandlerSender import messageHandlerSender
 from src.utils.messages.allMessages import LaneData 
+from src.hardware.camera.threads.laneTracker import laneTracker
+from src.hardware.camera.threads.bevRemap import bevRemap
 
 class threadLane(ThreadWithStop):
     """
@@ -44,6 +52,7 @@ class threadLane(ThreadWithStop):
         self.buffer_size = 3
         self.e_y_buffer = deque(maxlen=self.buffer_size)
         self.theta_e_buffer = deque(maxlen=self.buffer_size)
+        self.curvature_buffer = deque(maxlen=self.buffer_size)
 
         # --- BEV CALIBRATION OFFSET ---
         # Procedure: park at TRUE lane center, read steady-state e_y from log, negate it here.
@@ -57,40 +66,48 @@ class threadLane(ThreadWithStop):
         # self.upper_white = np.array([180, 50, 255]) # Previous: wider saturation band
         
         # --- ENFORCED GEOMETRY ---
-        self.EXPECTED_W, self.EXPECTED_H = 512, 270
-        # Calibration: BEV dst width (512 px) covers the 35 cm track width.
-        # Adjust TRACK_WIDTH_M if the camera FOV or track dimensions differ.
-        TRACK_WIDTH_M = 0.35
-        self.BEV_PIXELS_PER_METER = self.EXPECTED_W / TRACK_WIDTH_M  # ≈ 1462.9 px/m
-        
-        # LaneBefore baseline: wider trapezoid tuned for this camera's FOV
-        src = np.float32([
-            [self.EXPECTED_W*0.20, self.EXPECTED_H*0.70],
-            [self.EXPECTED_W*0.80, self.EXPECTED_H*0.70],
-            [self.EXPECTED_W*0.00, self.EXPECTED_H],
-            [self.EXPECTED_W*1.00, self.EXPECTED_H]
-        ])
-        # Previous: narrower trapezoid (metric BEV tuning attempt)
-        # src = np.float32([
-        #     [self.EXPECTED_W*0.35, self.EXPECTED_H*0.65],
-        #     [self.EXPECTED_W*0.65, self.EXPECTED_H*0.65],
-        #     [self.EXPECTED_W*0.05, self.EXPECTED_H],
-        #     [self.EXPECTED_W*0.95, self.EXPECTED_H]
-        # ])
-        dst = np.float32([
-            [0, 0], [self.EXPECTED_W, 0], 
-            [0, self.EXPECTED_H], [self.EXPECTED_W, self.EXPECTED_H]
-        ])
-        
-        self.perspective_matrix = cv2.getPerspectiveTransform(src, dst)
+        # LaneBefore baseline: wider trapezoid tuned for this camera's FOV, BEV width (512 px)
+        # covers the 35 cm track width, ROI ignores the top 50%. Edit bevCalibration.json
+        # if the camera FOV or track dimensions differ.
+        self.bev = shared_container['bev'] if 'bev' in shared_container else bevRemap()
+        self.CONFIG_CHECK_INTERVAL = 1.0   # s between two checks of the calibration file
+        self._next_config_check = time.perf_counter() + self.CONFIG_CHECK_INTERVAL
+        self.apply_calibration()
+        self.frames = shared_container['frames']
+        self._last_seq = 0
+        self.skipped_frames = 0
+        self.FRAME_TIMEOUT = 0.1   # s, longest wait for the camera before checking stop / pause again
         self.controlSender = messageHandlerSender(self.queuesList, LaneData)
         
-        super(threadLane, self).__init__(pause=0.001)
+        # No pause: thread_work waits for the next frame
+        super(threadLane, self).__init__(pause=0)
+
+    def apply_calibration(self):
+        """Takes the geometry of the current BEV calibration; the lane is searched again from scratch and
+        the filters start empty, so values measured with the old and the new calibration are never averaged."""
+        self.EXPECTED_W, self.EXPECTED_H = self.bev.input_size
+        self.BEV_PIXELS_PER_METER = self.bev.pixels_per_meter  # ≈ 1462.9 px/m
+        self.tracker = laneTracker(self.bev.width, self.bev.height, self.lower_white, self.upper_white,
+                                   roi_top=self.bev.roi_fraction)
+        self.e_y_buffer.clear()
+        self.theta_e_buffer.clear()
+        self.curvature_buffer.clear()
 
     def thread_work(self):
         """Main perception loop with explicit failure safety."""
+        new_frame = self.frames.wait_next(self._last_seq, timeout=self.FRAME_TIMEOUT)
+        if new_frame is None:
+            return   # no new frame from threadCamera yet
         start_time = time.perf_counter()
-        frame = self.shared_container.get('frame')
+        if start_time >= self._next_config_check:
+            self._next_config_check = start_time + self.CONFIG_CHECK_INTERVAL
+            if self.bev.reload():
+                self.logging.info("[Lane] BEV calibration reloaded")
+                self.apply_calibration()
+        if self._last_seq:
+            self.skipped_frames += new_frame.seq - self._last_seq - 1
+        self._last_seq = new_frame.seq
+        frame = new_frame.image
         
         if frame is not None:
             try:
@@ -98,95 +115,60 @@ class threadLane(ThreadWithStop):
                 h, w = frame.shape[:2]
                 if w != self.EXPECTED_W or h != self.EXPECTED_H:
                     self.logging.error(f"[Lane] CRITICAL: Resolution mismatch ({w}x{h})")
-                    self.controlSender.send({"e_y": 0.0, "theta_e": 0.0, "reliability": 0.0})
+                    self.controlSender.send({"e_y": 0.0, "theta_e": 0.0, "curvature": 0.0, "reliability": 0.0})
                     return
 
-                # 2. TRANSFORM: Warp to Bird's Eye View
-                bev_frame = cv2.warpPerspective(frame, self.perspective_matrix, (w, h))
+                # 2. TRANSFORM: ROI of the Bird's Eye View, built by threadCamera when available
+                roi_frame = new_frame.derived.get("bev_roi")
+                if roi_frame is None or roi_frame.shape[:2] != (self.bev.height - self.bev.roi_top, self.bev.width):
+                    roi_frame = self.bev.warp(frame)
                 
                 # 3. PERCEPTION: Extract filtered data and reliability
-                lat_err, head_err, reliability = self.calculate_filtered_data(bev_frame)
+                lat_err, head_err, curvature, reliability = self.calculate_filtered_data(roi_frame)
                 
                 # 4. OUTPUT: Send data to FSM
                 self.controlSender.send({
                     "e_y": lat_err,
                     "theta_e": head_err,
+                    "curvature": curvature,
                     "reliability": reliability
                 })
                 
                 # 5. DATA LOGGING: Real-time performance monitoring
                 loop_time_ms = (time.perf_counter() - start_time) * 1000
                 if self.debugging:
-                    print(f"[Lane] Loop: {loop_time_ms:.2f}ms | Reliability: {reliability:.2f} | e_y: {lat_err:.4f} | theta_e: {head_err:.4f}")
+                    print(f"[Lane] Frame {new_frame.seq} (skipped {self.skipped_frames}) | Loop: {loop_time_ms:.2f}ms | Reliability: {reliability:.2f} | e_y: {lat_err:.4f} | theta_e: {head_err:.4f} | curvature: {curvature:.3f}")
                 
             except Exception as e:
                 self.logging.error(f"[threadLane] Processing error: {e}")
-                self.controlSender.send({"e_y": 0.0, "theta_e": 0.0, "reliability": 0.0})
-
-    def calculate_filtered_data(self, bev_frame):
-        """Detects lane markings with optimized ROI height."""
-        h, w = bev_frame.shape[:2]
-        hsv = cv2.cvtColor(bev_frame, cv2.COLOR_BGR2HSV)
-        
-        mask = cv2.inRange(hsv, self.lower_white, self.upper_white)
-        edges = cv2.Canny(mask, 50, 150)
-        
-        # --- ROI OPTIMIZATION: Ignore top 50% (LaneBefore baseline)
-        roi_edges = edges[int(h*0.5):, :]
-        # roi_edges = edges[int(h*0.6):, :]  # Previous: ignore top 60%
-        lines = cv2.HoughLinesP(roi_edges, 1, np.pi/180, 30, minLineLength=15, maxLineGap=120)
-        # lines = cv2.HoughLinesP(roi_edges, 1, np.pi/180, 35, minLineLength=20, maxLineGap=100)  # Previous
-        
-        if lines is not None:
-            left_centers, right_centers, angles = [], [], []
-            for line in lines:
-                x1, y1, x2, y2 = line[0]
-                cx = (x1 + x2) / 2
-                if cx < w / 2:
-                    left_centers.append(cx)   # Left boundary (center divider side)
-                else:
-                    right_centers.append(cx)  # Right boundary (outer edge side)
+                self.tracker.reset()
+                self.controlSender.send({"e_y": 0.0, "theta_e": 0.0, "curvature": 0.0, "reliability": 0.0})
 
-                # theta_e: normalize to remove HoughLinesP endpoint-flip ambiguity.
-                # a % pi maps any angle to [0, pi); subtracting pi/2 centers it so
-                # vertical lines → 0, left-tilt → negative, right-tilt → positive.
-                a = np.arctan2(y2 - y1, x2 - x1) % np.pi - np.pi / 2
-                if abs(a) < np.pi / 4:  # discard near-horizontal noise
-                    angles.append(a)
+    def calculate_filtered_data(self, roi_frame):
+        """Tracks the lane boundaries in the BEV ROI and filters the errors of the lane center."""
+        w = roi_frame.shape[1]
+        lane = self.tracker.update(roi_frame)
 
-            # Compute lane center as the midpoint between the two boundary groups.
-            # Falls back to a single-side estimate if only one boundary is visible.
-            # This prevents the "mean of all lines" bias that causes positive feedback
-            # when one boundary dominates detection.
-            if left_centers and right_centers:
-                lane_center_px = (np.mean(left_centers) + np.mean(right_centers)) / 2
-            elif left_centers:
-                # Only center divider visible — estimate lane center as 1 quarter-lane to the right
-                # w/4 instead of w/2: smaller step avoids large e_y jumps when boundary crosses X=256
-                lane_center_px = np.mean(left_centers) + (w / 4)
-                lane_center_px = min(lane_center_px, w)   # clamp to image width
-            else:
-                # Only outer edge visible — estimate lane center as 1 quarter-lane to the left
-                lane_center_px = np.mean(right_centers) - (w / 4)
-                lane_center_px = max(lane_center_px, 0)   # clamp to image width
+        if lane is not None:
+            lane_center_px, heading, curvature_px = lane
 
             # e_y: positive = car is RIGHT of lane center → needs LEFT steer
             # (lane_center_px > w/2 means detected center is right of image center → car is left)
             e_y_pixels = lane_center_px - (w / 2)
             self.e_y_buffer.append(e_y_pixels / self.BEV_PIXELS_PER_METER + self.e_y_calibration_offset)
-            # [PREV-NO-SPLIT] self.e_y_buffer.append(-e_y_pixels / self.BEV_PIXELS_PER_METER + ...)
-            # This was wrong: mean of all lines biases toward dominant boundary → positive feedback
+            self.theta_e_buffer.append(heading)
+            # BEV pixels assumed square: 1/px → 1/m
+            self.curvature_buffer.append(curvature_px * self.BEV_PIXELS_PER_METER)
 
-            self.theta_e_buffer.append(np.mean(angles) if angles else 0.0)
-        
         elif len(self.e_y_buffer) > 0:
             # Drain buffer to alert FSM of lane loss
             self.e_y_buffer.popleft()
             self.theta_e_buffer.popleft()
+            self.curvature_buffer.popleft()
         
         reliability = len(self.e_y_buffer) / self.buffer_size
 
         if not self.e_y_buffer:
-            return 0.0, 0.0, 0.0
+            return 0.0, 0.0, 0.0, 0.0
             
-        return np.mean(self.e_y_buffer), np.mean(self.theta_e_buffer), reliability
\ No newline at end of file
+        return np.mean(self.e_y_buffer), np.mean(self.theta_e_buffer), np.mean(self.curvature_buffer), reliability
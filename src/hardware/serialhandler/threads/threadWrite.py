@@ -62,9 +62,13 @@ class threadWrite(ThreadWithStop):
         example (bool, optional): Flag for exmaple activation. Defaults to False.
     """
 
+    # Period of the speed / steer dispatch to the NUCLEO (20Hz)
+    MOTOR_PERIOD = 0.05
+
     # ===================================== INIT =========================================
     def __init__(self, process, logFile, queues, logger, debugger = True, example=False):
-        super(threadWrite, self).__init__(pause=0.001)
+        # Wakes on new messages (see _update_wait_sources) and on fixed 50ms deadlines for the motor commands
+        super(threadWrite, self).__init__(pause=self.MOTOR_PERIOD, fixed_rate=True)
         self.process = process
         self.queuesList = queues
         self.logFile = logFile
@@ -83,9 +87,15 @@ class threadWrite(ThreadWithStop):
         self.last_error_time = None
         self.error_cooldown = timedelta(seconds=3)
 
+        # time-based schedules (the loop is event-driven, so cycle counts are not a clock)
+        self._next_alive = 0.0
+        self._next_diag = 0.0
+        self._next_motor = None
+
         self.load_config("init")
         self._init_subscribers()
         self._init_senders()
+        self._update_wait_sources()
 
         if example:
             self.i = 0.0
@@ -108,6 +118,17 @@ class threadWrite(ThreadWithStop):
         self.isAliveSubscriber = messageHandlerSubscriber(self.queuesList, IsAlive, "lastOnly", True)
         self.requestSteerLimitsSubscriber = messageHandlerSubscriber(self.queuesList, RequestSteerLimits, "lastOnly", True)
         
+    def _update_wait_sources(self):
+        """Wakes the thread on the messages thread_work consumes in the current KL state.\n
+        Only subscribers that are read on every cycle can wake it, otherwise unread data would wake it in a loop.
+        Speed and steer are read on the 50ms deadlines only."""
+        sources = [self.klSubscriber, self.isAliveSubscriber, self.requestSteerLimitsSubscriber]
+        if self.running:
+            sources += [self.instantSubscriber, self.batterySubscriber, self.resourceMonitorSubscriber, self.imuSubscriber]
+            if self.engineEnabled:
+                sources += [self.brakeSubscriber, self.controlSubscriber, self.controlCalibSubscriber]
+        self.wait_on(*sources)
+
     def _init_senders(self):
         self.serialConnectionStateSender = messageHandlerSender(self.queuesList, SerialConnectionState)
 
@@ -156,16 +177,18 @@ class threadWrite(ThreadWithStop):
     def thread_work(self):
         """In this function we check if we got the enable engine signal. After we got it we will start getting messages from raspberry PI. It will transform them into NUCLEO commands and send them."""
         try:
-            # DIAG: log KL state every ~5s (thread runs at 1ms → 5000 iterations)
-            self._diag_tick = getattr(self, '_diag_tick', 0) + 1
-            if self._diag_tick % 5000 == 1:
+            now = time.perf_counter()
+
+            # DIAG: log KL state every ~5s
+            if now >= self._next_diag:
+                self._next_diag = now + 5.0
                 #self.logger.warning(f"[SerialHandler] State: running={self.running}, engineEnabled={self.engineEnabled}")
                 pass
 
             # NUCLEO alive watchdog: send #alive:0;; every 500ms to prevent the NUCLEO
             # from locking the servo at the first commanded position.
-            self._alive_tick = getattr(self, '_alive_tick', 0) + 1
-            if self._alive_tick % 500 == 1:
+            if now >= self._next_alive:
+                self._next_alive = now + 0.5
                 self.send_to_serial({"action": "alive", "activate": 0})
 
             klRecv = self.klSubscriber.receive()
@@ -189,6 +212,7 @@ class threadWrite(ThreadWithStop):
                     self.engineEnabled = False
                     command = {"action": "kl", "mode": 0}
                     self.send_to_serial(command)
+                self._update_wait_sources()
 
             isAliveRecv = self.isAliveSubscriber.receive()
             if isAliveRecv is not None:
@@ -213,10 +237,15 @@ class threadWrite(ThreadWithStop):
                         command = {"action": "brake", "steerAngle": int(brakeRecv)}
                         self.send_to_serial(command)
 
-                    # Rate-limit speed+steer to 20Hz (every 50 cycles at 1ms loop)
+                    # Rate-limit speed+steer to 20Hz (one dispatch per MOTOR_PERIOD, on the loop deadlines)
                     # to avoid overwhelming the NUCLEO's servo update rate.
-                    self._motor_tick = getattr(self, '_motor_tick', 0) + 1
-                    if self._motor_tick % 50 == 0:
+                    if self._next_motor is None:
+                        self._next_motor = now
+                    if now >= self._next_motor:
+                        self._next_motor += self.MOTOR_PERIOD
+                        if self._next_motor <= now:
+                            # fell behind (e.g. a slow serial write): resynchronise instead of bursting
+                            self._next_motor = now + self.MOTOR_PERIOD
                         speedRecv = self.speedMotorSubscriber.receive()
                         if speedRecv is not None:
                             if self.debugger:
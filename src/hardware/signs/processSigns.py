@@ -0,0 +1,88 @@
+# ==============================================================================
+# PROCESS DESCRIPTION:
+# THIS PROCESS RUNS THE TRAFFIC SIGN DETECTOR (YOLO) AS AN INFERENCE WORKER.
+#
+# It is kept out of processCamera so that an inference (tens to hundreds of
+# milliseconds on the Raspberry Pi 5) never holds the GIL of the process
+# that captures the frames and runs the lane keeping, and it runs with a
+# lower CPU priority (nice) so the scheduler favours the camera and control
+# processes when the detector spikes.
+#
+# THREADS:
+#   - threadSigns: Reads the newest letterboxed detector inputs from the
+#                  "ewolf_detectorInput" shared memory ring of threadCamera
+#                  (see framePyramid.py) at a configurable rate, with a
+#                  frame-skip policy and optional batching, and publishes
+#                  SignDetection stamped with the frame sequence number and
+#                  capture time.
+#
+# Follows the camera: paused and resumed with processCamera (SystemMode "camera").
+# ==============================================================================
+
+if __name__ == "__main__":
+    import sys
+    sys.path.insert(0, "../../..")
+
+import os
+
+from src.templates.workerprocess import WorkerProcess
+from src.hardware.signs.threads.threadSigns import threadSigns
+from src.statemachine.systemMode import SystemMode
+from src.utils.messages.messageHandlerSubscriber import messageHandlerSubscriber
+from src.utils.messages.allMessages import StateChange
+
+
+class processSigns(WorkerProcess):
+    """This process handles the sign detection.\n
+    Args:
+        queueList (dictionary of multiprocessing.queues.Queue): Dictionary of queues where the ID is the type of messages.
+        logging (logging object): Made for debugging.
+        ready_event (multiprocessing.Event, optional): Signalled when the threads are started.
+        debugging (bool, optional): A flag for debugging. Defaults to False.
+        rate (float, optional): Highest inference rate in Hz. Defaults to 10.0.
+        skip_policy (string, optional): "latest" or "oldest", see threadSigns. Defaults to "latest".
+        batch_size (int, optional): Frames per inference. Defaults to 1.
+        niceness (int, optional): Added to the nice value of the process. Defaults to 10.
+    """
+
+    # ====================================== INIT ==========================================
+    def __init__(self, queueList, logging, ready_event=None, debugging=False, rate=10.0,
+                 skip_policy="latest", batch_size=1, niceness=10):
+        self.queuesList = queueList
+        self.logging = logging
+        self.debugging = debugging
+        self.rate = rate
+        self.skip_policy = skip_policy
+        self.batch_size = batch_size
+        self.niceness = niceness
+        self.stateChangeSubscriber = messageHandlerSubscriber(self.queuesList, StateChange, "lastOnly", True)
+
+        super(processSigns, self).__init__(self.queuesList, ready_event)
+
+    def run(self):
+        """Lowers the priority of the worker before starting its threads."""
+        if self.niceness:
+            try:
+                os.nice(self.niceness)
+            except OSError as e:
+                self.logging.warning(f"[Signs Process] Could not lower the priority: {e}")
+        super(processSigns, self).run()
+
+    # ================================ STATE CHANGE HANDLER ========================================
+    def state_change_handler(self):
+        message = self.stateChangeSubscriber.receive()
+        if message is not None:
+            modeDict = SystemMode[message].value["camera"]["process"]
+
+            if modeDict["enabled"] == True:
+                self.resume_threads()
+            elif modeDict["enabled"] == False:
+                self.pause_threads()
+
+    # ===================================== INIT TH ======================================
+    def _init_threads(self):
+        signTh = threadSigns(
+            self.queuesList, self.logging, self.debugging,
+            rate=self.rate, skip_policy=self.skip_policy, batch_size=self.batch_size,
+        )
+        self.threads.append(signTh)
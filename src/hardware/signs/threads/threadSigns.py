@@ -0,0 +1,215 @@
+# ==============================================================================
+# THREAD FLOW DESCRIPTION:
+# THIS THREAD DETECTS AND CLASSIFIES ROAD SIGNS USING COMPUTER VISION.
+# 
+# INPUT: 
+#   - Name: "ewolf_detectorInput" sharedFrameRing
+#   - Format: 640x640 letterboxed BGR Mat of the lores frame, with seq / capture time
+#     (shared memory, see sharedFrameRing.py and framePyramid.py)
+#   - Source: threadCamera (processCamera), same sequence numbers as the lane frames
+#
+# SCHEDULING:
+#   - Runs in its own process (processSigns) so the inference never competes
+#     with threadCamera / threadLane for the GIL of the camera process.
+#   - Inference rate: one cycle every 1/rate seconds (fixed rate), only when
+#     the ring holds frames not processed yet.
+#   - Frame-skip policy:
+#       "latest" : the newest frames; everything older is skipped
+#       "oldest" : the oldest frames still in the ring (skips only what the camera overwrote)
+#   - Batching: up to batch_size frames per inference (at most slots - 1 of the ring).
+#   - Skipped frames are counted in skipped_frames.
+#
+# PROCESSING:
+#   - Detection: YOLO (ONNX) model to locate signs in the frame.
+#   - Classification: Mapping detections to BFMC SignType IDs.
+#   - Distance: Estimating distance (mm) based on bounding box width. The letterbox
+#     scales the 512 px lores width to 640 px like the former square resize did, so
+#     the focal length calibration is unchanged.
+#
+# OUTPUT:
+#   - Name: SignDetection
+#   - Format: Dictionary {"type": int, "distance": float, "frame_seq": int, "timestamp": float}
+#     (timestamp = capture time of the frame, time.perf_counter())
+#   - Destination: threadFSM (The Brain)
+# ==============================================================================
+
+import cv2
+from ultralytics import YOLO  # Import the AI
+from src.templates.threadwithstop import ThreadWithStop
+from src.utils.messages.messageHandlerSender import messageHandlerSender
+from src.utils.messages.sharedFrameRing import sharedFrameReader
+from src.utils.messages.allMessages import SignDetection 
+from src.control.Control.threads.allStates import SignType
+
+SKIP_POLICIES = ("latest", "oldest")
+
+
+class threadSigns(ThreadWithStop):
+    """
+    Sign perception thread for E-Wolf. 
+    It provides the 'Sense' data for traffic signs to the FSM.\n
+    Args:
+        queueList (dictionary of multiprocessing.queues.Queue): Dictionary of queues where the ID is the type of messages.
+        logging (logging object): Made for debugging.
+        debugging (bool): A flag for debugging.
+        rate (float, optional): Highest inference rate in Hz. Defaults to 10.0.
+        skip_policy (string, optional): "latest" or "oldest". Defaults to "latest".
+        batch_size (int, optional): Frames per inference. Defaults to 1.
+        ring_name (string, optional): Frame ring written by threadCamera. Defaults to "ewolf_detectorInput".
+    """
+
+    def __init__(self, queueList, logging, debugging, rate=10.0, skip_policy="latest", batch_size=1,
+                 ring_name="ewolf_detectorInput"):
+        self.queuesList = queueList
+        self.logging = logging
+        self.debugging = debugging
+
+        self.skip_policy = str.lower(skip_policy)
+        if self.skip_policy not in SKIP_POLICIES:
+            print("WARNING! Wrong frame-skip policy supplied.", skip_policy)
+            print("WARNING! Switching to latest")
+            self.skip_policy = "latest"
+        self.batch_size = max(1, int(batch_size))
+        self.frames = sharedFrameReader(ring_name)
+        self._last_seq = 0
+        self.skipped_frames = 0
+        
+        # --- VISION MODEL CONFIGURATION ---
+        # Load the optimized model for the Raspberry Pi 5
+        self.model = YOLO('models/best.onnx', task='detect')
+        # INCREASED to 640 because we retrained the model to see at +80cm
+        # (frames arrive letterboxed at this size, other sizes are resized)
+        self.input_res = 640
+        
+        # --- DISTANCE CALIBRATION ---
+        self.focal_length = 984.0
+        self.real_width_dict = {
+            "traffic_light": 200.0, "stop": 200.0, "parking": 200.0, 
+            "crosswalk": 200.0, "priority_road": 200.0, "highway": 200.0, 
+            "highway_exit": 200.0, "one_way": 200.0, "roundabout": 200.0, 
+            "no_entry": 200.0
+        }
+        
+        # --- MAPPING YOLO TO FSM ENUMS ---
+        # Translates the AI text into the language understood by the FSM brain
+        self.str_to_enum = {
+            "traffic_light": SignType.TRAFFIC_LIGHT, 
+            "stop": SignType.STOP,
+            "parking": SignType.PARKING,
+            "crosswalk": SignType.CROSSWALK,
+            "priority_road": SignType.PRIORITY,
+            "highway": SignType.HIGHWAY_ENTRY,
+            "highway_exit": SignType.HIGHWAY_EXIT,
+            "one_way": SignType.ONE_WAY,
+            "roundabout": SignType.ROUNDABOUT,
+            "no_entry": SignType.NO_ENTRY
+        }
+        
+        # Sender to communicate detections to threadFSM
+        self.signSender = messageHandlerSender(self.queuesList, SignDetection)
+        self.subscribe()
+
+        super(threadSigns, self).__init__(pause=1.0 / rate, fixed_rate=True)
+
+    def subscribe(self):
+        """No subscribers needed; frames are pulled from shared memory."""
+        pass
+
+    def select_frames(self):
+        """Sequence numbers of the frames to process in this cycle, according to the skip policy."""
+        latest = self.frames.latest_seq()
+        if latest <= self._last_seq:
+            return []
+        # A frame older than slots - 1 may be overwritten while it is read
+        batch = min(self.batch_size, max(1, self.frames.slots - 1))
+        if self.skip_policy == "oldest":
+            first = max(self._last_seq + 1, latest - self.frames.slots + 2)
+        else:
+            first = max(self._last_seq + 1, latest - batch + 1)
+        seqs = list(range(first, min(latest, first + batch - 1) + 1))
+        if self._last_seq:
+            self.skipped_frames += first - self._last_seq - 1
+        self._last_seq = seqs[-1]
+        return seqs
+
+    def thread_work(self):
+        """Main perception loop: Acquisition -> Vision AI -> Transmission."""
+        # 1. ACQUISITION: Copy the selected frames out of the ring
+        batch = []
+        for seq in self.select_frames():
+            result = self.frames.read(seq)
+            if result is None:
+                self.skipped_frames += 1   # overwritten by the camera before it could be read
+                continue
+            batch.append((seq, result[1], result[0]))
+        if not batch:
+            return
+
+        try:
+            # 2. PROCESSING: One inference for the whole batch
+            inputs = [
+                frame if frame.shape[:2] == (self.input_res, self.input_res) else cv2.resize(frame, (self.input_res, self.input_res))
+                for _, _, frame in batch
+            ]
+            detections = self.detect_signs(inputs)
+
+            for (seq, timestamp, _), frame_detections in zip(batch, detections):
+                for det in frame_detections:
+                    # 3. OUTPUT: Send the packet to the FSM, stamped with the frame it belongs to
+                    det["frame_seq"] = seq
+                    det["timestamp"] = timestamp
+                    self.signSender.send(det)
+                    self._dign_diag = getattr(self, '_dign_diag', 0) + 1
+                    if self._dign_diag % 50 == 1:
+                        self.logging.warning(f"[Signs] Detected: {det['type'].name} at {det['distance']:.1f}mm")
+                        #pass
+                    
+                    if self.debugging:
+                        # Print in terminal only the Enum (e.g., SignType.STOP) and the distance
+                        print(f"[Signs] Detected: {det['type'].name} at {det['distance']:.1f}mm (frame {seq}, skipped {self.skipped_frames})")
+                        
+        except Exception as e:
+            self.logging.error(f"[threadSigns] Vision processing error: {e}")
+
+    # ==========================================================================
+    # IMPLEMENTATION SPACE
+    # ==========================================================================
+
+    def detect_signs(self, frames):
+        """
+        1. Run YOLO inference on a batch of frames.
+        2. Filter by confidence.
+        3. Calculate distance.
+        4. Return, per frame, the list of dictionaries expected by the FSM.
+        """
+        # Require a minimum confidence of 75%
+        results = self.model(frames, conf=0.75, verbose=False)
+        detections = []
+        
+        for result in results:
+            detections_list = []
+            for box in result.boxes:
+                cls_id = int(box.cls[0])
+                class_name = self.model.names[cls_id]
+                
+                # Translate from String to Enum
+                sign_enum = self.str_to_enum.get(class_name, None)
+                
+                if sign_enum is not None:
+                    # Distance calculation
+                    w_px = float(box.xywh[0][2])
+                    w_real = self.real_width_dict.get(class_name, 200.0)
+                    distance_mm = (w_real * self.focal_length) / w_px
+                    
+                    # Package in the exact format requested by the FSM
+                    payload = {
+                        "type": sign_enum, 
+                        "distance": float(distance_mm)
+                    }
+                    detections_list.append(payload)
+            detections.append(detections_list)
+                    
+        return detections
+
+    def state_change_handler(self):
+        pass
@@ -28,10 +28,17 @@
 
 from threading import Thread, Event
 from functools import partial
+from multiprocessing import Pipe
+from multiprocessing.connection import wait
+from collections import deque
+import time
+
+# Number of recent cycles kept for the percentiles of loop_stats()
+_STATS_WINDOW = 1000
 
 
 class ThreadWithStop(Thread):
-    def __init__(self, pause=0.001, *args, **kwargs):
+    def __init__(self, pause=0.001, *args, fixed_rate=False, **kwargs):
         """An extended version of the thread superclass, it contains a new attribute (_event) and a new method (stop).
         The '_event' flag can be used to control the state of the 'run' method and the 'stop' method can stop the running by changing its value.
 
@@ -39,6 +46,12 @@ class ThreadWithStop(Thread):
         ----------
         pause : float, optional
             The pause duration in seconds between thread work cycles (default is 0.01)
+            With wait sources (see wait_on) it is the longest time the thread waits for data.
+        fixed_rate : bool, optional
+            Run thread_work on absolute deadlines every 'pause' seconds instead of sleeping 'pause' after
+            each cycle, so the work time does not make the loop drift (default is False).
+            Deadlines missed entirely are skipped, not caught up in a burst.
+            Work time, start jitter, overruns and missed deadlines are recorded, see loop_stats().
 
         Raises
         ------
@@ -71,6 +84,19 @@ class ThreadWithStop(Thread):
             th1.stop()
             th1.join()
 
+
+        An event-driven thread, woken as soon as one of its subscribers has data and at least every 100ms:
+
+            class BThread(ThreadWithStop):
+                def __init__(self, queuesList):
+                    super(BThread, self).__init__(pause=0.1, fixed_rate=True)
+                    self.subscriber = messageHandlerSubscriber(queuesList, SomeMessage, "fifo", True)
+                    self.wait_on(self.subscriber)
+
+                def thread_work(self):
+                    while self.subscriber.is_data_in_pipe():
+                        ...
+
         """
 
         # Check the target parameter definition. If it isn't a bounded method, then we have to give like the first parameter the new object. Thus the run method can access the object's field, (like self._running).
@@ -85,6 +111,12 @@ class ThreadWithStop(Thread):
         self._pause_event = Event()
         self._pause_event.set()  # start in running state
         self._pause = pause 
+        self._fixed_rate = fixed_rate
+        self._next_deadline = None
+        self._wait_sources = []
+        self._wake_recv, self._wake_send = Pipe(duplex=False)
+        self._scheduled = None
+        self._reset_loop_stats()
 
     def run(self):
         while not self._blocker.is_set():
@@ -99,11 +131,126 @@ class ThreadWithStop(Thread):
             self.state_change_handler()
             
             # do the actual work
-            self.thread_work()
+            if self._fixed_rate:
+                self._timed_work()
+            else:
+                self.thread_work()
             
             # respect the pause duration if not paused
             if self._pause_event.is_set():
-                self._blocker.wait(self._pause)
+                self._wait_next_cycle()
+
+    def _timed_work(self):
+        """Runs thread_work and records its timing against the deadline it serves."""
+        start = time.perf_counter()
+        self.thread_work()
+        end = time.perf_counter()
+
+        self._work_times.append(end - start)
+        self._cycles += 1
+        if self._scheduled is not None:
+            # Cycle started by a deadline (not by data on a wait source): measure how late it started
+            self._deadline_cycles += 1
+            self._jitters.append(start - self._scheduled)
+            if self._first_deadline is None:
+                self._first_deadline = self._scheduled
+            self._last_deadline = self._scheduled
+            self._scheduled = None
+        if self._next_deadline is not None and end > self._next_deadline:
+            self._overruns += 1
+
+    def _reset_loop_stats(self):
+        self._cycles = 0
+        self._deadline_cycles = 0
+        self._overruns = 0
+        self._missed = 0
+        self._first_deadline = None
+        self._last_deadline = None
+        self._work_times = deque(maxlen=_STATS_WINDOW)
+        self._jitters = deque(maxlen=_STATS_WINDOW)
+
+    def loop_stats(self, reset=False):
+        """Returns the timing of a fixed_rate loop since the start (or the previous reset).
+
+        Returns:
+            dict: {
+                "thread": str, "period_ms": float, "rate_hz": float (measured deadline rate),
+                "cycles": int (including cycles woken by wait sources), "overruns": int (work ended after the next
+                deadline), "missed_deadlines": int (deadlines skipped entirely),
+                "work_ms": {"mean", "p99", "max"}, "jitter_ms": {"mean", "p99", "max"} (start delay after the deadline),
+            }
+            Percentiles cover the last 1000 cycles.
+        """
+        def summary(values):
+            if not values:
+                return {"mean": None, "p99": None, "max": None}
+            ordered = sorted(values)
+            return {
+                "mean": sum(ordered) / len(ordered) * 1000,
+                "p99": ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))] * 1000,
+                "max": ordered[-1] * 1000,
+            }
+
+        rate = None
+        if self._deadline_cycles > 1 and self._last_deadline > self._first_deadline:
+            # Deadlines served per second, counting the skipped ones as not served
+            rate = (self._deadline_cycles - 1) / (self._last_deadline - self._first_deadline)
+
+        stats = {
+            "thread": self.__class__.__name__,
+            "period_ms": self._pause * 1000,
+            "rate_hz": rate,
+            "cycles": self._cycles,
+            "overruns": self._overruns,
+            "missed_deadlines": self._missed,
+            "work_ms": summary(list(self._work_times)),
+            "jitter_ms": summary(list(self._jitters)),
+        }
+        if reset:
+            self._reset_loop_stats()
+        return stats
+
+    def wait_on(self, *sources):
+        """Makes the thread wake up as soon as one of the sources has data, instead of sleeping the whole pause.
+
+        The sources are anything multiprocessing.connection.wait() accepts: Connections, sockets, serial ports or
+        objects with a fileno() method such as messageHandlerSubscriber. Sources without a file descriptor (mailbox
+        subscribers) cannot wake the thread and are skipped; they are read on the next cycle.
+        thread_work must consume the data of every source, otherwise the thread wakes up again immediately.
+        Calling wait_on again replaces the sources; without sources the thread sleeps 'pause' as before.
+        """
+        self._wait_sources = [
+            source for source in sources
+            if isinstance(source, int) or (source is not None and source.fileno() is not None)
+        ]
+
+    def _wait_next_cycle(self):
+        """Waits until the next cycle: new data on a wait source, the pause / deadline elapsing, or stop()."""
+        if not self._fixed_rate:
+            self._wait(self._pause)
+            return
+
+        now = time.perf_counter()
+        if self._next_deadline is None:
+            self._next_deadline = now + self._pause
+        if now < self._next_deadline:
+            self._wait(self._next_deadline - now)
+            now = time.perf_counter()
+        if now >= self._next_deadline:
+            # Schedule the next deadline from the previous one, not from now, so the rate does not drift
+            missed = int((now - self._next_deadline) / self._pause) if self._pause > 0 else 0
+            self._missed += missed
+            self._scheduled = self._next_deadline + missed * self._pause
+            self._next_deadline += (missed + 1) * self._pause
+
+    def _wait(self, timeout):
+        if not self._wait_sources:
+            self._blocker.wait(timeout)
+            return
+        ready = wait(self._wait_sources + [self._wake_recv], timeout)
+        if self._wake_recv in ready:
+            while self._wake_recv.poll():
+                self._wake_recv.recv_bytes()
 
     def thread_work(self):
         """This method is called to do the actual work of the thread. It will be overridden by the child thread."""
@@ -131,3 +278,8 @@ class ThreadWithStop(Thread):
         if self.is_paused():
             self.resume()
         self._blocker.set()
+        # wake the thread if it is blocked on its wait sources
+        try:
+            self._wake_send.send_bytes(b"\0")
+        except OSError:
+            pass
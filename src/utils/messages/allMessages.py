@@ -27,6 +27,21 @@
 # OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE
 
 from enum import Enum
+# Imported as a module so only message classes are members of this one (the dashboard iterates over them)
+from src.control.Control.threads import allStates
+
+# Optional per-message fields:
+#   Channel = "mailbox"  -> the newest value is kept in one shared memory slot
+#                           (src/utils/messages/mailboxChannel.py) instead of
+#                           being queued through the gateway. Only for messages
+#                           with a single producer and LastOnly consumers.
+#   Schema = ...         -> fixed binary layout packed with struct instead of
+#                           pickle (src/utils/messages/messageSchema.py). Only
+#                           for small numeric payloads with a fixed shape.
+#   DropPolicy = ...     -> what the gateway discards when a subscriber pipe is
+#                           full and its outbox overflows: "dropOldest"
+#                           (default), "dropNewest" or "coalesceLatest"
+#                           (src/gateway/threads/subscriberOutbox.py).
 
 ####################################### processCamera #######################################
 class mainCamera(Enum):
@@ -34,12 +49,14 @@ class mainCamera(Enum):
     Owner = "threadCamera"
     msgID = 1
     msgType = "str"
+    DropPolicy = "coalesceLatest"
 
 class serialCamera(Enum):
     Queue = "General"
     Owner = "threadCamera"
     msgID = 2
     msgType = "str"
+    DropPolicy = "coalesceLatest"
 
 class Recording(Enum):
     Queue = "General"
@@ -59,6 +76,20 @@ class LaneKeeping(Enum):
     msgID = 5
     msgType = "int"
 
+class mainCameraFrame(Enum):   # Descriptor of a raw frame in the "ewolf_mainCamera" shared memory ring
+    Queue = "General"
+    Owner = "threadCamera"
+    msgID = 6
+    msgType = "dict"           # {"name": str, "slot": int, "seq": int, "shape": tuple, "dtype": str, "timestamp": float}
+    DropPolicy = "coalesceLatest"
+
+class serialCameraFrame(Enum): # Descriptor of a raw BGR frame in the "ewolf_serialCamera" shared memory ring
+    Queue = "General"
+    Owner = "threadCamera"
+    msgID = 7
+    msgType = "dict"           # same format as mainCameraFrame
+    DropPolicy = "coalesceLatest"
+
 ################################# processCarsAndSemaphores ##################################
 class Cars(Enum):
     Queue = "General"
@@ -77,13 +108,15 @@ class SpeedMotor(Enum):
     Queue = "General"
     Owner = "Dashboard"
     msgID = 1
-    msgType = "str"
+    msgType = "int"             # mm/s
+    Schema = "i"
 
 class SteerMotor(Enum):
     Queue = "General"
     Owner = "Dashboard"
     msgID = 2
-    msgType = "str"
+    msgType = "int"             # deci-degrees
+    Schema = "i"
 
 class Control(Enum):
     Queue = "General"
@@ -193,6 +226,20 @@ class RequestSteerLimits(Enum):
     msgID = 20
     msgType = "bool"
 
+class RequestLoopStats(Enum):   # Asks the control loops for their LoopStats (True also restarts the measurement)
+    Queue = "General"
+    Owner = "Dashboard"
+    msgID = 21
+    msgType = "bool"
+
+class DashboardViewers(Enum):   # Number of connected dashboard clients (threadCamera encodes previews only when > 0)
+    Queue = "General"
+    Owner = "Dashboard"
+    msgID = 22
+    msgType = "int"
+    Channel = "mailbox"
+    Schema = "i"
+
 
 ################################# From Nucleo ##################################
 class BatteryLvl(Enum):
@@ -224,12 +271,14 @@ class CurrentSpeed(Enum):
     Owner = "threadRead"
     msgID = 5
     msgType = "float"
+    Schema = "d"
 
 class CurrentSteer(Enum):
     Queue = "General"
     Owner = "threadRead"
     msgID = 6
     msgType = "float"
+    Schema = "d"
 
 class ImuAck(Enum):
     Queue = "General"
@@ -304,38 +353,69 @@ class StateChange(Enum):
 ### It will have this format: {"WarningName":"name1", "WarningID": 1}
 
 ################################# From Perception ##################################
+# Control-path messages use the "Warning" queue so the gateway forwards them
+# ahead of the high-volume camera frames that share the "General" queue.
 class LaneData(Enum):          # Lane errors 
-    Queue = "General" 
+    Queue = "Warning" 
     Owner = "threadLane"
     msgID = 1
-    msgType = "dict"           # {"e_y": float, "theta_e": float, "reliability": float}
+    msgType = "dict"           # {"e_y": float, "theta_e": float, "curvature": float (1/m, positive = bends right), "reliability": float}
+    Channel = "mailbox"        # latest-value shared memory slot instead of the gateway
+    Schema = (("e_y", "d"), ("theta_e", "d"), ("curvature", "d"), ("reliability", "d"))
 
 class SignDetection(Enum):          # Detected sign type and dsitance to the car 
     Queue = "General"
     Owner = "threadSigns"
     msgID = 1
-    msgType = "dict"           # Format: {"type": int, "distance": float}
+    msgType = "dict"           # Format: {"type": int, "distance": float, "frame_seq": int, "timestamp": float (capture, perf_counter)}
 
 ################################# From Lidar ##################################
 class LidarObstacle(Enum):     # Distance to the closest frontal obstacle
-    Queue = "General" 
+    Queue = "Warning" 
     Owner = "threadDetector"
     msgID = 1
     msgType = "dict"    #{"distance": float, "reliability": float}
+    Channel = "mailbox"
+    Schema = (("distance", "d"), ("reliability", "d"))
+
+class LidarZones(Enum):        # Closest point (mm, inf when clear) of each zone around the car (see threadDetector.ZONES)
+    Queue = "General"
+    Owner = "threadDetector"
+    msgID = 2
+    msgType = "dict"    #{"front", "front_left", "front_right", "left", "right", "reliability": float}
+    Channel = "mailbox"
+    Schema = (("front", "d"), ("front_left", "d"), ("front_right", "d"), ("left", "d"), ("right", "d"), ("reliability", "d"))
+
+class LidarTracks(Enum):       # Tracked obstacles of the last revolution (see obstacleTracker.py)
+    Queue = "Warning"
+    Owner = "threadTracker"
+    msgID = 1
+    msgType = "dict"    #{"timestamp": float, "min_ttc": float, "tracks": [{"id", "x", "y", "vx", "vy", "width", "length", "ttc"}]}
+    Channel = "mailbox"
 
 ################################# From FSM ##################################
 class ControlAction(Enum):     #to control the car
-    Queue = "General"
+    Queue = "Warning"
     Owner = "threadFSM"
     msgID = 1
     msgType = "dict"
+    Channel = "mailbox"
+    Schema = (
+        ("behavior", "B", allStates.BehaviorState),
+        ("e_y", "d"),
+        ("theta_e", "d"),
+        ("speed", "d"),
+        ("timestamp", "d"),
+        ("override_steer", "d", "optional"),
+    )
 
 #   Dictionary {
 #         "behavior": BehaviorState,   # Decided by threadFSM
 #         "e_y": float,                # Cross-track error (meters)
 #         "theta_e": float,            # Heading error (radians)
 #         "speed": float,              # Target speed (m/s)
-#         "timestamp": float           # Safety watchdog timestamp
+#         "timestamp": float,          # Safety watchdog timestamp
+#         "override_steer": float      # Optional fixed steering (degrees)
 #   }
 
 class FsmStatus(Enum):          # FSM telemetry for dashboard display
@@ -343,3 +423,38 @@ class FsmStatus(Enum):          # FSM telemetry for dashboard display
     Owner = "threadFSM"
     msgID = 2
     msgType = "dict"            # {"state": str, "sign": str, "obstacle_zone": str}
+
+class FsmLoopStats(Enum):       # Timing of the threadFSM loop, answer to RequestLoopStats (same format as LoopStats)
+    Queue = "General"
+    Owner = "threadFSM"
+    msgID = 3
+    msgType = "dict"
+
+################################# From processControl ##################################
+class LoopStats(Enum):          # Timing of the threadControl loop, answer to RequestLoopStats (threadFSM: FsmLoopStats)
+    Queue = "General"
+    Owner = "processControl"
+    msgID = 1
+    msgType = "dict"            # ThreadWithStop.loop_stats(): {"thread", "period_ms", "rate_hz", "cycles", "overruns", "missed_deadlines", "work_ms", "jitter_ms"}
+
+################################# From messageTracer ##################################
+class BusLatencyStats(Enum):    # Per-process bus latency histograms (see messageTracer.py)
+    Queue = "General"
+    Owner = "messageTracer"
+    msgID = 1
+    msgType = "dict"            # {"process": str, "pid": int, "interval": float, "types": {"<Owner>/<msgID>": {...}}}
+
+################################# From Gateway ##################################
+class GatewayStats(Enum):       # Queue backlog and dropped message counts of threadGateway
+    Queue = "General"
+    Owner = "threadGateway"
+    msgID = 1
+    msgType = "dict"            # {"queues": {name: {"backlog", "dropped"}}, "subscribers": {"<Owner>/<msgID>/<receiver>": {"dropped", "pending"}}, "dropped": int}
+    DropPolicy = "coalesceLatest"
+
+class SubscriberCount(Enum):    # Subscribers per routed message type, rewritten on every change (see subscriberCounts.py)
+    Queue = "General"
+    Owner = "threadGateway"
+    msgID = 2
+    msgType = "dict"            # {"<Owner>/<msgID>": int}, only message types with subscribers
+    Channel = "mailbox"
@@ -0,0 +1,112 @@
+# ==============================================================================
+# BOUNDED QUEUE
+#
+# multiprocessing Queue for the gateway queues in main.py that never blocks
+# its producers.
+#
+# With a capacity, put() does not wait for room: when the queue is full the
+# oldest queued message is discarded to make room for the new one. Queued
+# messages can still be in a producer's feeder thread, so the eviction waits
+# at most _EVICT_TIMEOUT for one to reach the pipe; if none does, the new
+# message is the one discarded. Every discarded message is counted in a shared counter,
+# reported by threadGateway in GatewayStats.
+#
+# Evicting means reading, so the producer holds the queue's reader lock for
+# up to _EVICT_TIMEOUT. Queue.get_nowait() reports a locked queue as empty,
+# which would make the gateway skip a full queue (and serve lower priorities
+# first) exactly when it is overloaded. boundedQueue.get_nowait() waits for
+# the lock instead (at most _LOCK_TIMEOUT) and only then checks for a message;
+# Empty still means "nothing to read right now".
+#
+# A capacity of 0 keeps the queue unbounded (used for Critical and Config,
+# which must never lose a message): put() is the plain blocking Queue.put().
+#
+# QUEUE_CAPACITY holds the capacities of the gateway queues, shared by
+# main.py and benchmarks/gatewayBenchmark.py.
+# ==============================================================================
+
+import queue
+from multiprocessing import get_context
+from multiprocessing.queues import Queue
+from multiprocessing.reduction import ForkingPickler
+
+_EVICT_TIMEOUT = 0.001
+# Longest wait of get_nowait() for a producer's eviction to release the reader lock
+_LOCK_TIMEOUT = 4 * _EVICT_TIMEOUT
+
+# Capacity of each gateway queue in messages (0 = unbounded). When a bounded queue is full the oldest
+# message is dropped instead of blocking the producer; the counts are reported in GatewayStats.
+QUEUE_CAPACITY = {
+    "Critical": 0,
+    "Warning": 256,
+    "General": 512,
+    "Config": 0,
+    "Log": 1024,
+}
+
+
+class boundedQueue(Queue):
+    """Multiprocessing queue that drops the oldest message instead of blocking when full.\n
+    Args:
+        maxsize (int, optional): Capacity in messages, 0 for unbounded. Defaults to 0.
+    """
+
+    def __init__(self, maxsize=0):
+        ctx = get_context()
+        super(boundedQueue, self).__init__(maxsize, ctx=ctx)
+        # Queue stores SEM_VALUE_MAX instead of 0, so the capacity asked for is kept separately
+        self._capacity = maxsize
+        self._dropped = ctx.Value("Q", 0)
+
+    def __getstate__(self):
+        return super(boundedQueue, self).__getstate__() + (self._capacity, self._dropped)
+
+    def __setstate__(self, state):
+        super(boundedQueue, self).__setstate__(state[:-2])
+        self._capacity, self._dropped = state[-2:]
+
+    def put(self, obj, block=True, timeout=None):
+        """Puts a message into the queue, discarding the oldest one if the queue is full."""
+        if self._capacity <= 0:
+            return super(boundedQueue, self).put(obj, block, timeout)
+        try:
+            return super(boundedQueue, self).put(obj, False)
+        except queue.Full:
+            pass
+        try:
+            super(boundedQueue, self).get(True, _EVICT_TIMEOUT)
+            evicted = True
+        except queue.Empty:
+            evicted = False
+        try:
+            super(boundedQueue, self).put(obj, False)
+            stored = True
+        except queue.Full:
+            stored = False
+        lost = int(evicted) + int(not stored)
+        if lost:
+            with self._dropped.get_lock():
+                self._dropped.value += lost
+
+    def get_nowait(self):
+        """Removes and returns a message without waiting for one, but waits out a producer's eviction.
+
+        Raises:
+            queue.Empty: No message is available (or the reader lock stayed busy for _LOCK_TIMEOUT).
+        """
+        if self._closed:
+            raise ValueError(f"Queue {self!r} is closed")
+        if not self._rlock.acquire(True, _LOCK_TIMEOUT):
+            raise queue.Empty
+        try:
+            if not self._poll():
+                raise queue.Empty
+            data = self._recv_bytes()
+            self._sem.release()
+        finally:
+            self._rlock.release()
+        return ForkingPickler.loads(data)
+
+    def dropped(self):
+        """Returns how many messages were discarded since the queue was created."""
+        return self._dropped.value
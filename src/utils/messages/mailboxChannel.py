@@ -0,0 +1,192 @@
+# ==============================================================================
+# MAILBOX CHANNEL
+#
+# Latest-value transport for messages whose consumers only care about the
+# newest value (deliveryMode="lastOnly").
+#
+# Instead of going through the gateway queue and one Pipe per subscriber,
+# the producer overwrites a single slot in shared memory. Readers compare a
+# version counter with the last one they consumed and copy the payload only
+# when it changed, so:
+#   - reading is O(1), no matter how many values were published in between;
+#   - the producer never blocks on a full pipe;
+#   - values nobody read are never copied or unpickled by the consumers.
+#
+# A message opts in from allMessages.py:
+#
+#   class LaneData(Enum):
+#       ...
+#       Channel = "mailbox"
+#
+# MEMORY LAYOUT (one segment per message, "ewolf_mb_<Owner>_<msgID>"):
+#   Bytes 0-7   : version   uint64  (seqlock: odd while the slot is written)
+#   Bytes 8-11  : length    uint32  payload size
+#   Bytes 12-15 : crc32     uint32  payload checksum (guards against torn reads
+#                                   on weakly ordered CPUs such as the Pi's ARM)
+#   Bytes 16-23 : timestamp float64 time.perf_counter() of the write
+#   Bytes 24-   : payload   (pickle)
+#
+# Each mailbox has a single writer. Any number of processes may read it.
+# ==============================================================================
+
+import pickle
+import struct
+import time
+import zlib
+from enum import Enum
+
+from src.utils.sharedMemory import (
+    create_shared_memory,
+    attach_shared_memory,
+    release_shared_memory,
+)
+from multiprocessing.shared_memory import SharedMemory
+
+_HEADER = struct.Struct("<QIId")
+_VERSION = struct.Struct("<Q")
+_DEFAULT_CAPACITY = 4096
+_READ_RETRIES = 3
+
+# Segments created by this process through create_all()
+_owned = []
+
+
+def is_mailbox(message):
+    """Checks whether a message from allMessages.py is declared with Channel = "mailbox"."""
+    channel = getattr(message, "Channel", None)
+    return channel is not None and str.lower(channel.value) == "mailbox"
+
+
+def mailbox_name(message):
+    """Returns the shared memory name used for a message."""
+    return f"ewolf_mb_{message.Owner.value}_{message.msgID.value}"
+
+
+class mailboxChannel:
+    """One latest-value slot in shared memory, shared by every process that uses the same message.\n
+    Args:
+        message (enum): A specific message from allMessages.py.
+        capacity (int, optional): Maximum payload size in bytes. Defaults to 4096.
+    """
+
+    def __init__(self, message, capacity=_DEFAULT_CAPACITY):
+        self._message = message
+        self._name = mailbox_name(message)
+        self._capacity = capacity
+        self._shm = None
+        self._version = 0
+
+    # ===================================== SETUP ========================================
+
+    @staticmethod
+    def create_all(messagesModule, capacity=_DEFAULT_CAPACITY):
+        """Creates (or resets) the mailbox of every message declared with Channel = "mailbox".
+        Called once from main.py before the processes start, so the segments outlive process restarts.
+
+        Args:
+            messagesModule (module): The allMessages module.
+        """
+        for value in vars(messagesModule).values():
+            if isinstance(value, type) and issubclass(value, Enum) and value is not Enum and is_mailbox(value):
+                _owned.append(create_shared_memory(mailbox_name(value), _HEADER.size + capacity))
+
+    @staticmethod
+    def release_all():
+        """Removes every mailbox created with create_all()."""
+        while _owned:
+            release_shared_memory(_owned.pop(), unlink=True)
+
+    def _attach(self):
+        if self._shm is not None:
+            return True
+        shm = attach_shared_memory(self._name)
+        if shm is None:
+            # Not created by main.py (e.g. a standalone process example): the first user creates it.
+            try:
+                shm = SharedMemory(name=self._name, create=True, size=_HEADER.size + self._capacity)
+                _owned.append(shm)
+            except FileExistsError:
+                shm = attach_shared_memory(self._name)
+            if shm is None:
+                return False
+        self._shm = shm
+        self._capacity = shm.size - _HEADER.size
+        self._version = _VERSION.unpack_from(shm.buf, 0)[0] & ~1
+        return True
+
+    # ===================================== WRITE ========================================
+
+    def write(self, value):
+        """Publishes a value, replacing the previous one.
+
+        Args:
+            value (any type): The value. It is pickled once, for all readers.
+        """
+        if not self._attach():
+            return
+        payload = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        self.write_bytes(payload)
+
+    def write_bytes(self, payload):
+        """Publishes an already serialized payload."""
+        if not self._attach():
+            return
+        size = len(payload)
+        if size > self._capacity:
+            print("WARNING! Value too large for mailbox.", self._message, size, "bytes instead of at most", self._capacity)
+            return
+
+        buf = self._shm.buf
+        version = self._version
+        _VERSION.pack_into(buf, 0, version + 1)          # odd: write in progress
+        buf[_HEADER.size:_HEADER.size + size] = payload
+        _HEADER.pack_into(buf, 0, version + 1, size, zlib.crc32(payload), time.perf_counter())
+        _VERSION.pack_into(buf, 0, version + 2)          # even: value complete
+        self._version = version + 2
+
+    # ===================================== READ =========================================
+
+    def version(self):
+        """Returns the version of the newest complete value (0 if nothing was published yet)."""
+        if not self._attach():
+            return 0
+        return _VERSION.unpack_from(self._shm.buf, 0)[0] & ~1
+
+    def read_bytes(self, lastVersion):
+        """Reads the payload if it is newer than lastVersion.
+
+        Returns:
+            tuple(int, bytes, float) | None: The version, the payload and the write timestamp, or None if there is
+            nothing new (or the slot is being rewritten right now).
+        """
+        if not self._attach():
+            return None
+        buf = self._shm.buf
+        for _ in range(_READ_RETRIES):
+            version, size, crc, timestamp = _HEADER.unpack_from(buf, 0)
+            if version == lastVersion or version == 0:
+                return None
+            if version & 1 or size > self._capacity:
+                continue
+            payload = bytes(buf[_HEADER.size:_HEADER.size + size])
+            if _VERSION.unpack_from(buf, 0)[0] != version or zlib.crc32(payload) != crc:
+                continue
+            return version, payload, timestamp
+        return None
+
+    def read(self, lastVersion):
+        """Reads the value if it is newer than lastVersion.
+
+        Returns:
+            tuple(int, any) | None: The version and the value, or None if there is nothing new.
+        """
+        result = self.read_bytes(lastVersion)
+        if result is None:
+            return None
+        return result[0], pickle.loads(result[1])
+
+    def close(self):
+        """Detaches from the mailbox."""
+        if self._shm is not None and self._shm not in _owned:
+            release_shared_memory(self._shm)
+        self._shm = None
@@ -26,6 +26,11 @@
 # OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
 # OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE
 
+from src.utils.messages.mailboxChannel import mailboxChannel, is_mailbox
+from src.utils.messages.messageSchema import get_schema
+from src.utils.messages import messageTracer
+from src.utils.messages import subscriberCounts
+
 class messageHandlerSender:
     """Class which will handle sender functionalities.\n
     Args:
@@ -36,19 +41,48 @@ class messageHandlerSender:
     def __init__(self, queuesList, message):
         self.queuesList = queuesList
         self.message = message
+        # Messages declared with Channel = "mailbox" bypass the gateway
+        self._mailbox = mailboxChannel(message) if is_mailbox(message) else None
+        # Messages declared with a Schema are packed with struct instead of pickle
+        self._schema = get_schema(message)
+
+    def has_subscribers(self):
+        """
+        Checks whether anyone currently consumes the message, so expensive producers can skip work.
+        True for mailbox messages and before the gateway published its subscriber table (see subscriberCounts.py).
+        """
+        if self._mailbox is not None:
+            return True
+        return subscriberCounts.has_subscribers(self.message)
 
     def send(self, value):
         """
-        Puts a value into the queuesList
+        Puts a value into the queuesList (or overwrites the mailbox of the message)
 
         Args:
             value (any type): The value to be put into the queue. This can be of any type
         """
-        self.queuesList[self.message.Queue.value].put(
-            {
-                "Owner": self.message.Owner.value,
-                "msgID": self.message.msgID.value,
-                "msgType": self.message.msgType.value,
-                "msgValue": value
-            }
-        )
\ No newline at end of file
+        if self._schema is not None:
+            value = self._schema.pack(value)
+            if value is None:
+                return
+
+        if self._mailbox is not None:
+            if self._schema is not None:
+                self._mailbox.write_bytes(value)
+            else:
+                self._mailbox.write(value)
+            return
+
+        message = {
+            "Owner": self.message.Owner.value,
+            "msgID": self.message.msgID.value,
+            "msgType": self.message.msgType.value,
+            "msgValue": value
+        }
+        if self._schema is not None:
+            # The gateway forwards the packed bytes as they are
+            message["Packed"] = True
+        if messageTracer.is_enabled():
+            message["t0"] = messageTracer.now()
+        self.queuesList[self.message.Queue.value].put(message)
\ No newline at end of file
@@ -27,7 +27,12 @@
 # OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE
 
 import inspect
+import pickle
+import time
 from multiprocessing import Pipe
+from src.utils.messages.mailboxChannel import mailboxChannel, is_mailbox
+from src.utils.messages.messageSchema import get_schema, TRACE_SUFFIX
+from src.utils.messages import messageTracer
 
 class messageHandlerSubscriber: 
     """Class which will handle subscriber functionalities.\n
@@ -36,18 +41,40 @@ class messageHandlerSubscriber:
         message (enum): A specific message
         deliveryMode (string): Determines how messages are delivered from the queue. ("FIFO" or "LastOnly").
         subscribe (bool): A flag to automatically subscribe the message.
+        receiver (string, optional): Name to register with the gateway. Defaults to the class (or module) name of the caller.
+        current (bool, optional): Mailbox messages only. Also delivers the value published before the subscriber was
+            created, for messages that describe a state rather than an event. Defaults to False.
     """
         
-    def __init__(self, queuesList, message, deliveryMode="fifo", subscribe=False):
+    def __init__(self, queuesList, message, deliveryMode="fifo", subscribe=False, receiver=None, current=False):
         self._queuesList = queuesList
         self._message = message
         self._deliveryMode = str.lower(deliveryMode)
+        self._mailbox = None
+        # Messages declared with a Schema arrive as packed bytes instead of pickled envelopes
+        self._schema = get_schema(message)
+        self._traceKey = f"{message.Owner.value}/{message.msgID.value}"
         self._pipeRecv, self._pipeSend = Pipe(duplex=False)
-        frame = inspect.currentframe().f_back # type: ignore
-        if 'self' in frame.f_locals: # type: ignore
-            self._receiver = frame.f_locals['self'].__class__.__name__ # type: ignore
+        if receiver is not None:
+            self._receiver = receiver
         else:
-            self._receiver = frame.f_globals.get('__name__', None) # type: ignore
+            frame = inspect.currentframe().f_back # type: ignore
+            if 'self' in frame.f_locals: # type: ignore
+                self._receiver = frame.f_locals['self'].__class__.__name__ # type: ignore
+            else:
+                self._receiver = frame.f_globals.get('__name__', None) # type: ignore
+
+
+        if is_mailbox(self._message):
+            # Latest-value channel: read straight from shared memory, the gateway is not involved.
+            if self._deliveryMode != "lastonly":
+                print("WARNING! Mailbox messages only support LastOnly delivery.", self._message, self._receiver)
+                print("WARNING! Switching to LastOnly")
+                self._deliveryMode = "lastonly"
+            self._mailbox = mailboxChannel(self._message)
+            # Like a freshly subscribed pipe, only values published from now on are delivered,
+            # unless the current value is wanted too (version 0 is never a published value).
+            self._lastVersion = 0 if current else self._mailbox.version()
         
         if subscribe == True:
             self.subscribe()
@@ -63,6 +90,8 @@ class messageHandlerSubscriber:
 
         Returns None if there no data in the Pipe
         """
+        if self._mailbox is not None:
+            return self._receive_mailbox()
         if not self._pipeRecv.poll():
             return None
         else:
@@ -75,13 +104,24 @@ class messageHandlerSubscriber:
         Returns:
             message's data type: The received message.
         """
-        
+        if self._mailbox is not None:
+            value = self._receive_mailbox()
+            while value is None:
+                time.sleep(0.001)
+                value = self._receive_mailbox()
+            return value
+
+        if self._schema is not None:
+            return self._receive_packed()
+
         message = self._pipeRecv.recv()
         messageType = type(message["value"]).__name__
         
         if self._deliveryMode == "fifo":
             if messageType != self._message.msgType.value:
                 print("WARNING! Message type and value type are not matching.", self._message, "received:", messageType, "expected:", self._message.msgType.value)
+            if "t0" in message:
+                self._trace(message["t0"], message["t1"])
             return message["value"]
         
         elif self._deliveryMode == "lastonly":
@@ -90,19 +130,59 @@ class messageHandlerSubscriber:
 
             if messageType != self._message.msgType.value:
                 print("WARNING! Message type and value type are not matching.", self._message, "received:", messageType, "expected:", self._message.msgType.value)
+            if "t0" in message:
+                # Only the value handed to the consumer is traced: its age is what the consumer acts on.
+                self._trace(message["t0"], message["t1"])
             return message["value"]
+
+    def _trace(self, t0, t1):
+        """Records the latency of a received message (see messageTracer.py)."""
+        messageTracer.record(self._queuesList, self._traceKey, t0, t1)
+
+    def _receive_packed(self):
+        """Receives a message packed with its schema (see messageSchema.py)."""
+        data = self._pipeRecv.recv_bytes()
+        if self._deliveryMode == "lastonly":
+            while self._pipeRecv.poll():
+                data = self._pipeRecv.recv_bytes()
+        if len(data) > self._schema.size:
+            t0, t1 = TRACE_SUFFIX.unpack_from(data, self._schema.size)
+            self._trace(t0, t1)
+        return self._schema.unpack(data)
+
+    def _receive_mailbox(self):
+        """Returns the newest mailbox value if it changed since the last call, None otherwise."""
+        result = self._mailbox.read_bytes(self._lastVersion)
+        if result is None:
+            return None
+        self._lastVersion, payload, timestamp = result
+        if messageTracer.is_enabled():
+            # No gateway in between: written and dispatched at the same time
+            self._trace(timestamp, timestamp)
+        if self._schema is not None:
+            return self._schema.unpack(payload)
+        value = pickle.loads(payload)
+        messageType = type(value).__name__
+        if messageType != self._message.msgType.value:
+            print("WARNING! Message type and value type are not matching.", self._message, "received:", messageType, "expected:", self._message.msgType.value)
+        return value
         
     def empty(self):
         """
         Empties the receiving pipe of any existing data.
         """
+        if self._mailbox is not None:
+            self._lastVersion = self._mailbox.version()
+            return
         while self._pipeRecv.poll():
-            self._pipeRecv.recv()
+            self._pipeRecv.recv_bytes()
 
     def subscribe(self):
         """
         Subscribes to messages.
         """
+        if self._mailbox is not None:
+            return
         self._queuesList["Config"].put(
             {
                 "Subscribe/Unsubscribe": "subscribe",
@@ -116,6 +196,8 @@ class messageHandlerSubscriber:
         """
         Unsubscribes from messages.
         """
+        if self._mailbox is not None:
+            return
         self._queuesList["Config"].put(
             {
                 "Subscribe/Unsubscribe": "unsubscribe",
@@ -132,12 +214,26 @@ class messageHandlerSubscriber:
         Returns:
             bool: True if data is available, False otherwise.
         """
+        if self._mailbox is not None:
+            return self._mailbox.version() != self._lastVersion
         return self._pipeRecv.poll()
 
+    def fileno(self):
+        """
+        Returns the file descriptor of the receiving pipe, so the subscriber can be passed to
+        multiprocessing.connection.wait(). Mailbox subscribers have no pipe and return None.
+        """
+        if self._mailbox is not None:
+            return None
+        return self._pipeRecv.fileno()
+
     def set_delivery_mode_to_fifo(self):
         """
         Sets delivery mode to FIFO.
         """
+        if self._mailbox is not None:
+            print("WARNING! Mailbox messages only support LastOnly delivery.", self._message, self._receiver)
+            return
         self._deliveryMode = "fifo"
 
     def set_delivery_mode_to_last_only(self):
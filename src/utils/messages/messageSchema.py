@@ -0,0 +1,145 @@
+# ==============================================================================
+# MESSAGE SCHEMA
+#
+# Fixed binary layouts for small numeric messages.
+#
+# A message opts in from allMessages.py with a "Schema" field:
+#
+#   class CurrentSpeed(Enum):
+#       ...
+#       msgType = "float"
+#       Schema = "d"                                  # a single value
+#
+#   class LaneData(Enum):
+#       ...
+#       msgType = "dict"
+#       Schema = (("e_y", "d"), ("theta_e", "d"), ("reliability", "d"))
+#
+# Each field is (key, struct format code[, option]). The option is either an
+# Enum class (the member's value is packed, the member is returned) or
+# "optional" (float fields only: a missing key is packed as NaN and left out
+# of the decoded dict again).
+#
+# messageHandlerSender packs the value with a precompiled struct.Struct and
+# messageHandlerSubscriber unpacks it into the same dict / scalar the
+# consumers already use, so these messages never go through pickle. Integer
+# fields accept numeric strings (e.g. from the dashboard) and round them
+# towards zero, like int(float(value)).
+# ==============================================================================
+
+import math
+import struct
+from enum import Enum
+
+OPTIONAL = "optional"
+
+# Enqueue and dispatch times the gateway appends to traced packed messages (see messageTracer.py)
+TRACE_SUFFIX = struct.Struct("<dd")
+
+_INTEGER_CODES = "bBhHiIlLqQ"
+_FLOAT_CODES = "efd"
+
+# Compiled schemas, per message class
+_compiled = {}
+
+
+def _to_int(value):
+    return int(float(value)) if isinstance(value, str) else int(value)
+
+
+def _to_enum_value(value):
+    return value.value if isinstance(value, Enum) else _to_int(value)
+
+
+class messageSchema:
+    """Precompiled binary layout of one message.\n
+    Args:
+        message (enum): A specific message from allMessages.py, declared with a Schema field.
+    """
+
+    def __init__(self, message):
+        self._message = message
+        spec = message.Schema.value
+        self._scalar = isinstance(spec, str)
+        if self._scalar:
+            spec = (("value", spec),)
+
+        self._keys = []
+        self._encoders = []
+        self._decoders = []
+        self._optional = []
+        for field in spec:
+            key, code = field[0], field[1]
+            option = field[2] if len(field) > 2 else None
+            self._keys.append(key)
+            self._optional.append(option == OPTIONAL)
+            if isinstance(option, type) and issubclass(option, Enum):
+                self._encoders.append(_to_enum_value)
+                self._decoders.append(option)
+            elif code in _INTEGER_CODES:
+                self._encoders.append(_to_int)
+                self._decoders.append(None)
+            elif code in _FLOAT_CODES:
+                self._encoders.append(float)
+                self._decoders.append(None)
+            elif code == "?":
+                self._encoders.append(bool)
+                self._decoders.append(None)
+            else:
+                raise ValueError(f"Unsupported schema code {code!r} in {message}")
+
+        self._struct = struct.Struct("<" + "".join(field[1] for field in spec))
+        self.size = self._struct.size
+        self._hasOptional = any(self._optional)
+        self._hasDecoders = any(decoder is not None for decoder in self._decoders)
+
+    def pack(self, value):
+        """Encodes a value of the message.
+
+        Returns:
+            bytes | None: The packed value, or None if it does not match the schema.
+        """
+        try:
+            if self._scalar:
+                return self._struct.pack(self._encoders[0](value))
+            values = []
+            for key, encoder, optional in zip(self._keys, self._encoders, self._optional):
+                item = value.get(key)
+                if item is None and optional:
+                    values.append(math.nan)
+                else:
+                    values.append(encoder(item))
+            return self._struct.pack(*values)
+        except (struct.error, TypeError, ValueError, AttributeError) as e:
+            print("WARNING! Value does not match the message schema.", self._message, value, e)
+            return None
+
+    def unpack(self, data):
+        """Decodes the first self.size bytes of data into the dict (or scalar) the consumers expect."""
+        values = self._struct.unpack_from(data)
+        if self._scalar:
+            return values[0]
+        if self._hasDecoders:
+            values = [value if decoder is None else decoder(value) for value, decoder in zip(values, self._decoders)]
+        result = dict(zip(self._keys, values))
+        if self._hasOptional:
+            for key, optional in zip(self._keys, self._optional):
+                if optional and math.isnan(result[key]):
+                    del result[key]
+        return result
+
+
+def has_schema(message):
+    """Checks whether a message from allMessages.py declares a Schema field."""
+    return getattr(message, "Schema", None) is not None
+
+
+def get_schema(message):
+    """Returns the compiled schema of a message, or None if it has none."""
+    if not has_schema(message):
+        return None
+    schema = _compiled.get(message)
+    if schema is None:
+        schema = messageSchema(message)
+        _compiled[message] = schema
+    return schema
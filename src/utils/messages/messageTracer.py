@@ -0,0 +1,206 @@
+# ==============================================================================
+# MESSAGE TRACER
+#
+# Optional end-to-end latency tracing of the message bus.
+#
+# When enabled (main.py -> TRACE_BUS_LATENCY), every message carries three
+# time.perf_counter() stamps:
+#   t0 - enqueue   : messageHandlerSender.send() put it on a gateway queue
+#                    (for mailbox messages: the mailbox write)
+#   t1 - dispatch  : threadGateway forwarded it to the subscriber pipes
+#                    (equal to t0 for mailbox messages, there is no gateway)
+#   t2 - receive   : messageHandlerSubscriber returned it to the consumer
+#
+# perf_counter() is a system-wide monotonic clock on Linux, so stamps taken in
+# different processes can be subtracted.
+#
+# Latencies are counted in log2 histograms (1 us .. ~35 min) per message type
+# and per stage ("queue" = t1-t0, "delivery" = t2-t1, "total" = t2-t0).
+# Each thread owns its histograms and only ever increments them, so recording
+# takes no lock; the publisher reads the cumulative counts of every thread and
+# reports the difference with its previous snapshot.
+#
+# Every process that receives traced messages publishes a BusLatencyStats
+# message at most once per interval:
+#   {
+#       "process": str, "pid": int, "interval": float,
+#       "types": {
+#           "<Owner>/<msgID>": {
+#               "count": int,
+#               "queue":    {"p50_ms", "p99_ms", "max_ms"},
+#               "delivery": {"p50_ms", "p99_ms", "max_ms"},
+#               "total":    {"p50_ms", "p99_ms", "max_ms"},
+#           }, ...
+#       }
+#   }
+# Percentiles are the upper edge of the histogram bucket (at most 2x high),
+# capped by the maximum of the interval.
+# ==============================================================================
+
+import os
+import threading
+import time
+from multiprocessing import current_process
+
+from src.utils.messages.allMessages import BusLatencyStats
+
+STAGES = ("queue", "delivery", "total")
+_BUCKETS = 32
+
+_enabled = False
+_interval = 1.0
+
+# Every histogram table ever created in this process, one per thread
+_tables = []
+_local = threading.local()
+_lastPublish = 0.0
+_published = {}
+
+
+def _reset():
+    """Forked processes start with empty histograms instead of the parent's."""
+    global _local, _lastPublish
+    _tables.clear()
+    _published.clear()
+    _local = threading.local()
+    _lastPublish = 0.0
+
+
+os.register_at_fork(after_in_child=_reset)
+
+
+def enable(interval=1.0):
+    """Turns tracing on. Must be called before the processes are started so they inherit it.
+
+    Args:
+        interval (float, optional): Seconds between two BusLatencyStats messages of a process. Defaults to 1.0.
+    """
+    global _enabled, _interval
+    _enabled = True
+    _interval = interval
+
+
+def is_enabled():
+    """Returns True if tracing is enabled in this process."""
+    return _enabled
+
+
+def now():
+    """Timestamp used by every stage."""
+    return time.perf_counter()
+
+
+def _bucket(seconds):
+    return min(_BUCKETS - 1, max(0, int(seconds * 1e6)).bit_length())
+
+
+def _table():
+    table = getattr(_local, "table", None)
+    if table is None:
+        table = {}
+        _local.table = table
+        _tables.append(table)
+    return table
+
+
+def record(queuesList, key, t0, t1, t2=None):
+    """Counts one received message.
+
+    Args:
+        queuesList (dictionary of multiprocessing.queues.Queue): Used to publish the statistics.
+        key (str): "<Owner>/<msgID>" of the message.
+        t0 (float): Enqueue time.
+        t1 (float): Gateway dispatch time.
+        t2 (float, optional): Receive time. Defaults to now.
+    """
+    if t2 is None:
+        t2 = now()
+    table = _table()
+    entry = table.get(key)
+    if entry is None:
+        # [counts per stage..., max per stage...]
+        entry = [[0] * _BUCKETS for _ in STAGES] + [[0.0] * len(STAGES)]
+        table[key] = entry
+
+    maxima = entry[3]
+    for index, latency in enumerate((t1 - t0, t2 - t1, t2 - t0)):
+        entry[index][_bucket(latency)] += 1
+        if latency > maxima[index]:
+            maxima[index] = latency
+
+    if t2 - _lastPublish >= _interval:
+        publish(queuesList, t2)
+
+
+def _percentile(counts, total, fraction):
+    target = fraction * total
+    seen = 0
+    for index, count in enumerate(counts):
+        seen += count
+        if seen >= target:
+            return (1 << index) / 1000.0   # upper edge of the bucket, in ms
+    return (1 << (_BUCKETS - 1)) / 1000.0
+
+
+def snapshot():
+    """Returns the statistics gathered since the previous snapshot, per message type."""
+    merged = {}
+    for table in list(_tables):
+        for key, entry in list(table.items()):
+            counts, maxima = merged.get(key, (None, None))
+            if counts is None:
+                counts = [[0] * _BUCKETS for _ in STAGES]
+                maxima = [0.0] * len(STAGES)
+                merged[key] = (counts, maxima)
+            for stage in range(len(STAGES)):
+                stageCounts = counts[stage]
+                for index, count in enumerate(entry[stage]):
+                    stageCounts[index] += count
+                maxima[stage] = max(maxima[stage], entry[3][stage])
+                entry[3][stage] = 0.0   # maxima are per interval
+
+    stats = {}
+    for key, (counts, maxima) in merged.items():
+        previous = _published.get(key)
+        _published[key] = counts
+        if previous is not None:
+            counts = [[c - p for c, p in zip(stage, prev)] for stage, prev in zip(counts, previous)]
+        total = sum(counts[0])
+        if total == 0:
+            continue
+        stats[key] = {"count": total}
+        for stage, name in enumerate(STAGES):
+            maximum = maxima[stage] * 1000.0
+            stats[key][name] = {
+                "p50_ms": min(maximum, _percentile(counts[stage], total, 0.50)),
+                "p99_ms": min(maximum, _percentile(counts[stage], total, 0.99)),
+                "max_ms": maximum,
+            }
+    return stats
+
+
+def publish(queuesList, timestamp=None):
+    """Sends a BusLatencyStats message with the statistics of this process."""
+    global _lastPublish
+    if timestamp is None:
+        timestamp = now()
+    interval = timestamp - _lastPublish if _lastPublish else _interval
+    _lastPublish = timestamp
+
+    stats = snapshot()
+    if not stats:
+        return
+    # Sent straight to the queue: messageHandlerSender would stamp (and trace) the statistics themselves.
+    queuesList[BusLatencyStats.Queue.value].put(
+        {
+            "Owner": BusLatencyStats.Owner.value,
+            "msgID": BusLatencyStats.msgID.value,
+            "msgType": BusLatencyStats.msgType.value,
+            "msgValue": {
+                "process": current_process().name,
+                "pid": os.getpid(),
+                "interval": interval,
+                "types": stats,
+            },
+        }
+    )
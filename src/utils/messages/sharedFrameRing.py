@@ -0,0 +1,293 @@
+# ==============================================================================
+# SHARED FRAME RING
+#
+# Zero-copy transport for raw camera frames between processes.
+#
+# The producer (threadCamera) writes each frame into the next slot of a ring
+# that lives in multiprocessing.shared_memory and sends only a small
+# descriptor through the gateway:
+#
+#   {"name": str, "slot": int, "seq": int, "shape": tuple, "dtype": str, "timestamp": float}
+#
+# Consumers attach to the ring by name and read the frame straight from shared
+# memory, so the pixels are never JPEG-encoded, base64-encoded or pickled.
+#
+# MEMORY LAYOUT:
+#   [ header | slot meta x N | slot data x N ]
+#   Each slot is protected by a seqlock: the writer makes 'version' odd while
+#   copying, and even again once the frame and its metadata are complete.
+#   A reader accepts a slot only if it saw the same even version before and
+#   after reading it, and the slot still holds the requested sequence number.
+# ==============================================================================
+
+import inspect
+import time
+import numpy as np
+
+from src.utils.messages.messageHandlerSubscriber import messageHandlerSubscriber
+from src.utils.sharedMemory import (
+    create_shared_memory,
+    attach_shared_memory,
+    release_shared_memory,
+)
+
+_RING_MAGIC = 0x46524D31  # "FRM1"
+
+_HEADER_DTYPE = np.dtype([
+    ("magic", "<u4"),
+    ("slots", "<u4"),
+    ("slotBytes", "<u8"),
+    ("latest", "<u8"),      # sequence number of the newest complete frame (0 = none)
+])
+
+_SLOT_DTYPE = np.dtype([
+    ("version", "<u8"),
+    ("seq", "<u8"),
+    ("timestamp", "<f8"),
+    ("shape", "<u4", (3,)),
+    ("ndim", "<u4"),
+    ("dtype", "S8"),
+    ("nbytes", "<u8"),
+])
+
+_DATA_ALIGN = 64
+
+
+def _data_offset(slots):
+    offset = _HEADER_DTYPE.itemsize + slots * _SLOT_DTYPE.itemsize
+    return (offset + _DATA_ALIGN - 1) // _DATA_ALIGN * _DATA_ALIGN
+
+
+class sharedFrameRing:
+    """Producer side of a shared memory frame ring.\n
+    Args:
+        name (str): System-wide name of the ring (e.g. "ewolf_serialCamera").
+        frameShape (tuple): Largest frame shape that will be written, e.g. (270, 512, 3).
+        dtype (numpy dtype, optional): Pixel type. Defaults to uint8.
+        slots (int, optional): Number of frames kept in the ring. Defaults to 4.
+    """
+
+    def __init__(self, name, frameShape, dtype=np.uint8, slots=4):
+        self.name = name
+        self.slots = slots
+        self.slotBytes = int(np.prod(frameShape)) * np.dtype(dtype).itemsize
+        self._dataOffset = _data_offset(slots)
+        self._shm = create_shared_memory(name, self._dataOffset + slots * self.slotBytes)
+
+        self._header = np.ndarray((1,), dtype=_HEADER_DTYPE, buffer=self._shm.buf)
+        self._meta = np.ndarray((slots,), dtype=_SLOT_DTYPE, buffer=self._shm.buf, offset=_HEADER_DTYPE.itemsize)
+        self._data = np.ndarray((slots, self.slotBytes), dtype=np.uint8, buffer=self._shm.buf, offset=self._dataOffset)
+
+        self._header["slots"] = slots
+        self._header["slotBytes"] = self.slotBytes
+        self._header["latest"] = 0
+        self._header["magic"] = _RING_MAGIC
+        self._seq = 0
+
+    def write(self, frame, timestamp=None, seq=None):
+        """Copies a frame into the next slot of the ring.
+
+        Args:
+            frame (numpy.ndarray): The frame. Must fit into one slot.
+            timestamp (float, optional): Capture time (time.perf_counter()). Defaults to now.
+            seq (int, optional): Sequence number to publish the frame under. Defaults to an internal counter.
+
+        Returns:
+            dict: The descriptor to send through the gateway.
+        """
+        if frame.nbytes > self.slotBytes:
+            raise ValueError(f"Frame of {frame.nbytes} bytes does not fit into a {self.slotBytes} bytes slot")
+        if frame.ndim > 3:
+            raise ValueError("Frames with more than 3 dimensions are not supported")
+
+        self._seq = self._seq + 1 if seq is None else int(seq)
+        if timestamp is None:
+            timestamp = time.perf_counter()
+
+        slot = self._seq % self.slots
+        meta = self._meta[slot:slot + 1]
+        version = int(meta["version"][0])
+
+        meta["version"] = version + 1                      # odd: slot is being written
+        self._data[slot, :frame.nbytes] = np.ascontiguousarray(frame).reshape(-1).view(np.uint8)
+        shape = tuple(frame.shape) + (1,) * (3 - frame.ndim)
+        meta["seq"] = self._seq
+        meta["timestamp"] = timestamp
+        meta["shape"] = shape
+        meta["ndim"] = frame.ndim
+        meta["dtype"] = frame.dtype.str.encode()
+        meta["nbytes"] = frame.nbytes
+        meta["version"] = version + 2                      # even: slot is complete
+        self._header["latest"] = self._seq
+
+        return {
+            "name": self.name,
+            "slot": slot,
+            "seq": self._seq,
+            "shape": tuple(frame.shape),
+            "dtype": frame.dtype.str,
+            "timestamp": timestamp,
+        }
+
+    def close(self):
+        """Releases the ring and removes it from the system."""
+        self._header = self._meta = self._data = None
+        release_shared_memory(self._shm, unlink=True)
+        self._shm = None
+
+
+class sharedFrameReader:
+    """Consumer side of a shared memory frame ring. Attaches lazily, so it can be created before the producer.\n
+    Args:
+        name (str): System-wide name of the ring.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self._shm = None
+
+    def _attach(self):
+        if self._shm is not None:
+            return True
+        shm = attach_shared_memory(self.name)
+        if shm is None:
+            return False
+        header = np.ndarray((1,), dtype=_HEADER_DTYPE, buffer=shm.buf)
+        if header["magic"][0] != _RING_MAGIC:
+            # The producer created the segment but has not finished initialising it.
+            del header
+            release_shared_memory(shm)
+            return False
+        self.slots = int(header["slots"][0])
+        self.slotBytes = int(header["slotBytes"][0])
+        self._header = header
+        self._meta = np.ndarray((self.slots,), dtype=_SLOT_DTYPE, buffer=shm.buf, offset=_HEADER_DTYPE.itemsize)
+        self._data = np.ndarray((self.slots, self.slotBytes), dtype=np.uint8, buffer=shm.buf, offset=_data_offset(self.slots))
+        self._shm = shm
+        return True
+
+    def latest_seq(self):
+        """Returns the sequence number of the newest complete frame, 0 if there is none."""
+        if not self._attach():
+            return 0
+        return int(self._header["latest"][0])
+
+    def read(self, seq, copy=True):
+        """Reads the frame published under a sequence number.
+
+        Args:
+            seq (int): Sequence number from a descriptor (or latest_seq()).
+            copy (bool, optional): If False the returned array is a view into shared memory. It stays valid until
+                the producer laps the ring (slots - 1 newer frames); use is_valid(seq) to check. Defaults to True.
+
+        Returns:
+            tuple(numpy.ndarray, float) | None: The frame and its capture timestamp, or None if the frame has already
+            been overwritten.
+        """
+        if seq <= 0 or not self._attach():
+            return None
+
+        slot = seq % self.slots
+        meta = self._meta[slot:slot + 1]
+        version = int(meta["version"][0])
+        if version & 1 or int(meta["seq"][0]) != seq:
+            return None
+
+        ndim = int(meta["ndim"][0])
+        shape = tuple(int(v) for v in meta["shape"][0][:ndim])
+        dtype = np.dtype(meta["dtype"][0].decode())
+        timestamp = float(meta["timestamp"][0])
+        frame = self._data[slot, :int(meta["nbytes"][0])].view(dtype).reshape(shape)
+        if copy:
+            frame = frame.copy()
+
+        if int(meta["version"][0]) != version:
+            return None
+        return frame, timestamp
+
+    def read_latest(self, copy=True):
+        """Reads the newest complete frame.
+
+        Returns:
+            tuple(numpy.ndarray, int, float) | None: The frame, its sequence number and its capture timestamp.
+        """
+        seq = self.latest_seq()
+        result = self.read(seq, copy)
+        if result is None:
+            return None
+        return result[0], seq, result[1]
+
+    def is_valid(self, seq):
+        """Checks that the slot holding 'seq' has not been overwritten (useful after processing a zero-copy view)."""
+        if not self._attach():
+            return False
+        slot = seq % self.slots
+        meta = self._meta[slot:slot + 1]
+        return int(meta["seq"][0]) == seq and not int(meta["version"][0]) & 1
+
+    def close(self):
+        """Detaches from the ring."""
+        self._header = self._meta = self._data = None
+        release_shared_memory(self._shm)
+        self._shm = None
+
+
+class sharedFrameSubscriber:
+    """messageHandlerSubscriber-like reader for frames published through a sharedFrameRing.
+    It subscribes to the descriptor message and resolves each descriptor to the frame in shared memory.\n
+    Args:
+        queuesList (dictionary of multiprocessing.queues.Queue): Dictionary of queues where the ID is the type of messages.
+        message (enum): The descriptor message (e.g. serialCameraFrame).
+        deliveryMode (string): "FIFO" or "LastOnly", as for messageHandlerSubscriber. Defaults to "lastOnly".
+        subscribe (bool): A flag to automatically subscribe the message.
+    """
+
+    def __init__(self, queuesList, message, deliveryMode="lastOnly", subscribe=False):
+        # Register under the caller's name, like a plain messageHandlerSubscriber would.
+        frame = inspect.currentframe().f_back # type: ignore
+        if 'self' in frame.f_locals: # type: ignore
+            receiver = frame.f_locals['self'].__class__.__name__ # type: ignore
+        else:
+            receiver = frame.f_globals.get('__name__', None) # type: ignore
+        self._subscriber = messageHandlerSubscriber(queuesList, message, deliveryMode, subscribe, receiver=receiver)
+        self._readers = {}
+
+    def _reader(self, name):
+        if name not in self._readers:
+            self._readers[name] = sharedFrameReader(name)
+        return self._readers[name]
+
+    def receive(self, copy=True):
+        """
+        Receives the next frame.
+
+        Returns None if there is no new descriptor or the frame was overwritten before it could be read.
+
+        Returns:
+            tuple(numpy.ndarray, dict): The frame and its descriptor.
+        """
+        descriptor = self._subscriber.receive()
+        if descriptor is None:
+            return None
+        result = self._reader(descriptor["name"]).read(descriptor["seq"], copy)
+        if result is None:
+            return None
+        return result[0], descriptor
+
+    def is_valid(self, descriptor):
+        """Checks that a zero-copy frame received with copy=False has not been overwritten yet."""
+        return self._reader(descriptor["name"]).is_valid(descriptor["seq"])
+
+    def subscribe(self):
+        """Subscribes to the descriptor message."""
+        self._subscriber.subscribe()
+
+    def unsubscribe(self):
+        """Unsubscribes from the descriptor message."""
+        self._subscriber.unsubscribe()
+
+    def close(self):
+        """Detaches from every ring."""
+        for reader in self._readers.values():
+            reader.close()
+        self._readers = {}
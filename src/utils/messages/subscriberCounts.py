@@ -0,0 +1,69 @@
+# ==============================================================================
+# SUBSCRIBER COUNTS
+#
+# Lets producers skip work nobody will consume.
+#
+# threadGateway keeps the number of subscribers of every message it routes
+# and, whenever one of them changes, rewrites the SubscriberCount mailbox:
+#
+#   {"<Owner>/<msgID>": int, ...}      (only message types with subscribers)
+#
+# Any process reads it through has_subscribers(message) (or
+# messageHandlerSender.has_subscribers()). The table is cached per process
+# and only unpickled again when the mailbox version changed, so the check is
+# a shared memory header read.
+#
+# Mailbox messages bypass the gateway and cannot be counted, and before the
+# gateway published its first table nothing is known: both are reported as
+# having subscribers, so a producer never stops on missing information.
+# ==============================================================================
+
+import os
+
+from src.utils.messages.allMessages import SubscriberCount
+from src.utils.messages.mailboxChannel import mailboxChannel, is_mailbox
+
+_mailbox = None
+_version = 0
+_counts = None
+
+
+def _reset():
+    """Forked processes attach to the mailbox again."""
+    global _mailbox, _version, _counts
+    _mailbox = None
+    _version = 0
+    _counts = None
+
+
+os.register_at_fork(after_in_child=_reset)
+
+
+def key(message):
+    """Returns the "<Owner>/<msgID>" key of a message from allMessages.py."""
+    return f"{message.Owner.value}/{message.msgID.value}"
+
+
+def counts():
+    """Returns the newest subscriber table published by the gateway, or None if there is none yet."""
+    global _mailbox, _version, _counts
+    if _mailbox is None:
+        _mailbox = mailboxChannel(SubscriberCount)
+    result = _mailbox.read(_version)
+    if result is not None:
+        _version, _counts = result
+    return _counts
+
+
+def subscriber_count(message):
+    """Returns the number of gateway subscribers of a message, None if unknown."""
+    table = counts()
+    if table is None or is_mailbox(message):
+        return None
+    return table.get(key(message), 0)
+
+
+def has_subscribers(message):
+    """Checks whether a message may have a consumer (True when unknown)."""
+    count = subscriber_count(message)
+    return count is None or count > 0
@@ -0,0 +1,82 @@
+# ==============================================================================
+# SHARED MEMORY HELPERS
+#
+# Thin wrappers around multiprocessing.shared_memory used by the zero-copy
+# transports (frame rings, mailbox channels).
+#
+# Segments are created by their owner and attached by name from any other
+# process. Python < 3.13 registers *attached* segments with the resource
+# tracker as well, which unlinks them when the attaching process exits and
+# breaks every other user. attach_shared_memory() skips that registration so
+# only the owner decides when a segment disappears.
+# ==============================================================================
+
+import threading
+from multiprocessing import resource_tracker
+from multiprocessing.shared_memory import SharedMemory
+
+_untracked_lock = threading.Lock()
+
+
+def create_shared_memory(name, size):
+    """Creates a shared memory segment, replacing a stale one left by a previous run.
+
+    Args:
+        name (str): System-wide name of the segment.
+        size (int): Size in bytes.
+
+    Returns:
+        SharedMemory: The new segment, zero-filled.
+    """
+    try:
+        return SharedMemory(name=name, create=True, size=size)
+    except FileExistsError:
+        stale = SharedMemory(name=name, create=False)
+        stale.close()
+        stale.unlink()
+        return SharedMemory(name=name, create=True, size=size)
+
+
+def attach_shared_memory(name):
+    """Attaches to an existing segment without letting this process unlink it on exit.
+
+    Args:
+        name (str): System-wide name of the segment.
+
+    Returns:
+        SharedMemory | None: The attached segment, or None if it does not exist (yet).
+    """
+    try:
+        return SharedMemory(name=name, create=False, track=False)
+    except TypeError:
+        pass  # 'track' is only available from Python 3.13
+    except FileNotFoundError:
+        return None
+
+    # Processes forked from the owner share its resource tracker, so registering and unregistering again would
+    # also drop the owner's registration. Skip the registration entirely instead.
+    with _untracked_lock:
+        register = resource_tracker.register
+        resource_tracker.register = lambda name, rtype: None
+        try:
+            return SharedMemory(name=name, create=False)
+        except FileNotFoundError:
+            return None
+        finally:
+            resource_tracker.register = register
+
+
+def release_shared_memory(shm, unlink=False):
+    """Closes a segment and optionally removes it from the system."""
+    if shm is None:
+        return
+    try:
+        shm.close()
+    except BufferError:
+        # numpy views are still alive; the mapping is released when they are collected
+        pass
+    if unlink:
+        try:
+            shm.unlink()
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,61 @@
+import queue
+import threading
+import time
+from multiprocessing import Process
+
+from src.utils.messages.boundedQueue import boundedQueue
+
+
+def drain(gatewayQueue):
+    values = []
+    while True:
+        try:
+            values.append(gatewayQueue.get(timeout=0.2))
+        except queue.Empty:
+            return values
+
+
+def fill(gatewayQueue, count):
+    for index in range(count):
+        gatewayQueue.put(index)
+
+
+def test_full_queue_drops_the_oldest_messages():
+    gatewayQueue = boundedQueue(3)
+    fill(gatewayQueue, 10)
+    time.sleep(0.1)
+    values = drain(gatewayQueue)
+    assert values[-1] == 9
+    assert len(values) + gatewayQueue.dropped() == 10
+    assert values == sorted(values)
+
+
+def test_unbounded_queue_never_drops():
+    gatewayQueue = boundedQueue(0)
+    fill(gatewayQueue, 2000)
+    assert drain(gatewayQueue) == list(range(2000))
+    assert gatewayQueue.dropped() == 0
+
+
+def test_capacity_and_drop_counter_are_shared_with_child_processes():
+    gatewayQueue = boundedQueue(2)
+    child = Process(target=fill, args=(gatewayQueue, 5))
+    child.start()
+    child.join(5)
+    time.sleep(0.1)
+    values = drain(gatewayQueue)
+    assert values[-1] == 4 and len(values) + gatewayQueue.dropped() == 5
+
+
+def test_get_nowait_waits_out_an_eviction_instead_of_reporting_empty():
+    gatewayQueue = boundedQueue(4)
+    gatewayQueue.put("waiting")
+    time.sleep(0.1)
+    gatewayQueue._rlock.acquire()           # a producer evicting holds the reader lock briefly
+    threading.Timer(0.001, gatewayQueue._rlock.release).start()
+    assert gatewayQueue.get_nowait() == "waiting"
+    try:
+        gatewayQueue.get_nowait()
+        assert False, "the queue is empty"
+    except queue.Empty:
+        pass
@@ -0,0 +1,79 @@
+import io
+
+import numpy as np
+
+from src.hardware.Lidar.threads import ld19Protocol
+from src.hardware.Lidar.threads.ld19Framer import ld19Framer
+
+
+def make_packets(count, start=0):
+    """count CRC-valid packets, distinguishable by their timestamp."""
+    packets = np.zeros(count, dtype=ld19Protocol.PACKET_DTYPE)
+    packets["header"] = ld19Protocol.HEADER
+    packets["verlen"] = ld19Protocol.VERLEN
+    packets["speed"] = 3600
+    packets["start_angle"] = (np.arange(count) * 960) % 36000
+    packets["end_angle"] = (packets["start_angle"] + 880) % 36000
+    packets["points"]["distance"] = 1000 + np.arange(count)[:, None]
+    packets["points"]["intensity"] = 200
+    packets["timestamp"] = start + np.arange(count)
+    packets["crc"] = ld19Protocol.crc8(packets)
+    return packets
+
+
+def timestamps(packets):
+    return packets["timestamp"].tolist()
+
+
+def test_contiguous_stream_in_arbitrary_chunks():
+    data = make_packets(20).tobytes()
+    framer = ld19Framer(chunk_size=64)
+    received = [framer.feed(data[index:index + 13]) for index in range(0, len(data), 13)]
+    assert timestamps(np.concatenate(received)) == list(range(20))
+    assert framer.stats()["bad_crc"] == 0
+    assert framer.stats()["skipped_bytes"] == 0
+
+
+def test_garbage_between_packets_is_skipped():
+    packets = make_packets(3)
+    data = b"\x01\x02" + packets[0].tobytes() + b"\xff" * 5 + packets[1:].tobytes()
+    framer = ld19Framer()
+    assert timestamps(framer.feed(data)) == [0, 1, 2]
+    assert framer.skipped_bytes == 7
+
+
+def test_corrupted_packet_is_dropped_and_neighbours_kept():
+    data = bytearray(make_packets(3).tobytes())
+    data[ld19Protocol.PACKET_SIZE + 10] ^= 0x01
+    framer = ld19Framer()
+    assert timestamps(framer.feed(bytes(data))) == [0, 2]
+    assert framer.bad_crc >= 1
+
+
+def test_false_header_does_not_hide_the_next_packet():
+    # A header in the noise overlaps the real packet: resync one byte after the false header.
+    # (The noise is chosen so the false 47-byte candidate fails its CRC-8, as 255 in 256 do.)
+    data = bytes([ld19Protocol.HEADER, ld19Protocol.VERLEN]) + b"\x11" * 10 + make_packets(2).tobytes()
+    framer = ld19Framer()
+    assert timestamps(framer.feed(data)) == [0, 1]
+    assert framer.bad_crc == 1
+
+
+def test_incomplete_packet_is_kept_for_the_next_read():
+    data = make_packets(2).tobytes()
+    split = ld19Protocol.PACKET_SIZE + 20
+    framer = ld19Framer()
+    assert timestamps(framer.feed(data[:split])) == [0]
+    assert timestamps(framer.feed(data[split:])) == [1]
+
+
+def test_read_from_binary_source():
+    source = io.BytesIO(make_packets(100).tobytes())
+    framer = ld19Framer(chunk_size=256)
+    received = []
+    while True:
+        packets = framer.read(source)
+        if packets is None:
+            break
+        received.append(packets)
+    assert timestamps(np.concatenate(received)) == list(range(100))
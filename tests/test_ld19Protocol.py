@@ -0,0 +1,91 @@
+import numpy as np
+import pytest
+
+from src.hardware.Lidar.threads import ld19Protocol
+
+
+def reference_crc8(data):
+    """Bitwise CRC-8 of the LD19 datasheet (polynomial 0x4D, no reflection)."""
+    crc = 0
+    for byte in data:
+        crc ^= byte
+        for _ in range(8):
+            crc = ((crc << 1) ^ 0x4D) & 0xFF if crc & 0x80 else (crc << 1) & 0xFF
+    return crc
+
+
+def make_packets(count, start_angle=0, step=960, span=880, distance=1000):
+    packets = np.zeros(count, dtype=ld19Protocol.PACKET_DTYPE)
+    packets["header"] = ld19Protocol.HEADER
+    packets["verlen"] = ld19Protocol.VERLEN
+    packets["speed"] = 3600
+    packets["start_angle"] = (start_angle + np.arange(count) * step) % 36000
+    packets["end_angle"] = (packets["start_angle"] + span) % 36000
+    packets["points"]["distance"] = distance + np.arange(ld19Protocol.POINTS)
+    packets["points"]["intensity"] = 200
+    packets["timestamp"] = np.arange(count)
+    packets["crc"] = ld19Protocol.crc8(packets)
+    return packets
+
+
+def test_crc8_matches_bytewise_reference():
+    rng = np.random.default_rng(7)
+    raw = rng.integers(0, 256, size=(64, ld19Protocol.PACKET_SIZE), dtype=np.uint8)
+    packets = ld19Protocol.as_packets(raw.tobytes())
+
+    expected = [reference_crc8(row[:-1].tobytes()) for row in raw]
+    assert ld19Protocol.crc8(packets).tolist() == expected
+
+
+def test_as_packets_is_a_view_ignoring_trailing_bytes():
+    data = bytearray(make_packets(3).tobytes() + b"\x54\x2c\x00")
+    packets = ld19Protocol.as_packets(data)
+
+    assert packets.size == 3
+    data[ld19Protocol.PACKET_SIZE + 44] = 0x7F
+    assert packets["timestamp"][1] == 0x7F
+
+
+def test_valid_packets_rejects_bad_header_verlen_and_crc():
+    packets = make_packets(5)
+    packets["header"][1] = 0x55
+    packets["verlen"][2] = 0x2D
+    packets["crc"][1:3] = ld19Protocol.crc8(packets[1:3])
+    packets["points"]["distance"][3, 0] += 1
+
+    assert ld19Protocol.valid_packets(packets)["timestamp"].tolist() == [0, 4]
+    assert ld19Protocol.valid_packets(packets[:0]).size == 0
+
+
+def test_points_are_interpolated_between_start_and_end_angle():
+    packets = make_packets(2, start_angle=1000, step=2000, span=1100)
+    angle, distance, intensity = ld19Protocol.packet_points(packets)
+
+    assert angle.dtype == np.float32
+    assert angle[:12] == pytest.approx(np.linspace(10.0, 21.0, 12), abs=1e-4)
+    assert angle[12:] == pytest.approx(np.linspace(30.0, 41.0, 12), abs=1e-4)
+    assert distance[:12].tolist() == list(range(1000, 1012))
+    assert intensity.tolist() == [200] * 24
+
+
+def test_angles_wrap_through_zero():
+    packets = make_packets(1, start_angle=35500, span=1100)
+    angle, _, _ = ld19Protocol.packet_points(packets)
+
+    expected = np.mod(np.linspace(355.0, 366.0, 12), 360.0)
+    assert angle == pytest.approx(expected, abs=1e-3)
+    assert ((angle >= 0) & (angle < 360)).all()
+
+
+def test_zero_distances_are_dropped_unless_asked():
+    packets = make_packets(1)
+    packets["points"]["distance"][0, ::2] = 0
+
+    assert ld19Protocol.packet_points(packets)[1].size == 6
+    angle, distance, _ = ld19Protocol.packet_points(packets, drop_zero=False)
+    assert distance.size == angle.size == 12
+
+
+def test_start_angles_in_degrees():
+    packets = make_packets(3, start_angle=500, step=12000)
+    assert ld19Protocol.start_angles(packets).tolist() == pytest.approx([5.0, 125.0, 245.0])
@@ -0,0 +1,61 @@
+import time
+
+import pytest
+
+from src.hardware.Lidar.threads.ld19Recording import recordingSerial, replaySerial, iter_records
+
+
+class fakePort:
+    """Serial port returning a counter pattern, so replayed bytes can be checked."""
+
+    in_waiting = 0
+    is_open = True
+
+    def __init__(self):
+        self.position = 0
+
+    def read(self, size=1):
+        data = bytes((self.position + index) % 251 for index in range(size))
+        self.position += size
+        return data
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def recording(tmp_path):
+    path = str(tmp_path / "scan.ld19")
+    port = recordingSerial(fakePort(), path)
+    for size in (30, 47, 200, 5):
+        port.read(size)
+    port.close()
+    return path
+
+
+def test_appended_session_keeps_times_monotonic(recording):
+    port = recordingSerial(fakePort(), recording)
+    time.sleep(0.01)
+    port.read(10)
+    port.close()
+    times = [timestamp for timestamp, _ in iter_records(recording)]
+    assert len(times) == 5
+    assert times == sorted(times)
+
+
+def test_replay_returns_the_recorded_bytes(recording):
+    expected = b"".join(data for _, data in iter_records(recording))
+    replay = replaySerial(recording, speed=0)
+    buffer = bytearray(1000)
+    count = replay.readinto(buffer)
+    assert bytes(buffer[:count]) == expected
+    assert replay.readinto(buffer) == 0 and replay.finished
+
+
+def test_fast_looped_replay_keeps_pending_bytes_bounded(recording):
+    replay = replaySerial(recording, speed=0, loop=True, timeout=0.1)
+    buffer = bytearray(100)                 # more than the smallest records, less than a pass
+    for _ in range(200):
+        replay.in_waiting
+        assert replay.readinto(buffer) == 100
+        assert len(replay._pending) < 300   # at most one record beyond the read
@@ -0,0 +1,69 @@
+import os
+import struct
+from enum import Enum
+
+import pytest
+
+from src.utils.messages.mailboxChannel import mailboxChannel, _HEADER
+
+
+class pytestMailbox(Enum):
+    Queue = "General"
+    Owner = "pytest"
+    msgID = os.getpid()
+    msgType = "dict"
+    Channel = "mailbox"
+
+
+@pytest.fixture
+def mailbox():
+    writer = mailboxChannel(pytestMailbox, capacity=64)
+    reader = mailboxChannel(pytestMailbox)
+    yield writer, reader
+    reader.close()
+    writer.close()
+    mailboxChannel.release_all()
+
+
+def test_round_trip(mailbox):
+    writer, reader = mailbox
+    assert reader.read(0) is None            # nothing published yet
+    writer.write({"e_y": 0.1})
+    version, value = reader.read(0)
+    assert value == {"e_y": 0.1}
+    assert version == reader.version() == 2
+    assert reader.read(version) is None      # nothing newer
+
+
+def test_only_newest_value_is_read(mailbox):
+    writer, reader = mailbox
+    for index in range(5):
+        writer.write(index)
+    version, value = reader.read(0)
+    assert (version, value) == (10, 4)
+
+
+def test_corrupted_payload_is_rejected(mailbox):
+    writer, reader = mailbox
+    writer.write_bytes(b"payload")
+    reader._attach()
+    reader._shm.buf[_HEADER.size] ^= 0xFF    # torn / corrupted payload: CRC mismatch
+    assert reader.read_bytes(0) is None
+    writer.write_bytes(b"payload")
+    assert reader.read_bytes(0)[1] == b"payload"
+
+
+def test_write_in_progress_is_not_read(mailbox):
+    writer, reader = mailbox
+    writer.write_bytes(b"first")
+    reader._attach()
+    struct.pack_into("<Q", reader._shm.buf, 0, 3)   # odd version: a writer is in the middle of an update
+    assert reader.read_bytes(0) is None
+    assert reader.version() == 2
+
+
+def test_oversized_value_is_not_written(mailbox):
+    writer, reader = mailbox
+    writer.write_bytes(b"small")
+    writer.write_bytes(bytes(65))
+    assert reader.read_bytes(0)[1] == b"small"
@@ -0,0 +1,77 @@
+import math
+from enum import Enum
+
+import pytest
+
+from src.utils.messages.messageSchema import messageSchema, OPTIONAL
+
+
+class pytestMode(Enum):
+    AUTO = 1
+    MANUAL = 2
+
+
+class pytestScalar(Enum):
+    Owner = "pytest"
+    msgID = 1
+    msgType = "float"
+    Schema = "d"
+
+
+class pytestDict(Enum):
+    Owner = "pytest"
+    msgID = 2
+    msgType = "dict"
+    Schema = (("speed", "i"), ("mode", "B", pytestMode), ("valid", "?"), ("distance", "d", OPTIONAL))
+
+
+def test_scalar_round_trip():
+    schema = messageSchema(pytestScalar)
+    data = schema.pack(1.25)
+    assert len(data) == schema.size == 8
+    assert schema.unpack(data) == 1.25
+
+
+def test_dict_round_trip():
+    schema = messageSchema(pytestDict)
+    value = {"speed": -150, "mode": pytestMode.MANUAL, "valid": True, "distance": 0.5}
+    assert schema.unpack(schema.pack(value)) == value
+
+
+def test_missing_optional_field_is_packed_as_nan_and_dropped():
+    schema = messageSchema(pytestDict)
+    data = schema.pack({"speed": 10, "mode": pytestMode.AUTO, "valid": False})
+    assert math.isnan(schema._struct.unpack(data)[3])
+    assert schema.unpack(data) == {"speed": 10, "mode": pytestMode.AUTO, "valid": False}
+
+
+def test_integer_fields_accept_numeric_strings():
+    schema = messageSchema(pytestDict)
+    decoded = schema.unpack(schema.pack({"speed": "12.7", "mode": 2, "valid": 1, "distance": 1}))
+    assert decoded["speed"] == 12
+    assert decoded["mode"] is pytestMode.MANUAL
+    assert decoded["valid"] is True
+
+
+def test_unpack_ignores_trailing_bytes():
+    schema = messageSchema(pytestScalar)
+    assert schema.unpack(schema.pack(3.0) + b"\x00" * 16) == 3.0
+
+
+@pytest.mark.parametrize("value", [
+    {"mode": pytestMode.AUTO, "valid": True},             # required field missing
+    {"speed": 2 ** 40, "mode": 1, "valid": True},          # out of range for "i"
+    "not a dict",
+])
+def test_values_not_matching_the_schema_are_rejected(value):
+    assert messageSchema(pytestDict).pack(value) is None
+
+
+def test_unsupported_code_is_refused():
+    class pytestBad(Enum):
+        Owner = "pytest"
+        msgID = 3
+        Schema = (("name", "s"),)
+
+    with pytest.raises(ValueError):
+        messageSchema(pytestBad)
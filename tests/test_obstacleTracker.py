@@ -0,0 +1,79 @@
+import math
+
+import numpy as np
+import pytest
+
+from src.hardware.Lidar.threads import obstacleTracker as tracker_module
+from src.hardware.Lidar.threads.obstacleTracker import obstacleTracker, segment, to_cartesian
+
+
+def cluster(*centres, half=0.05):
+    """segment()-like output with one square cluster per (x, y) centre."""
+    x = np.array([c[0] for c in centres], dtype=np.float32)
+    y = np.array([c[1] for c in centres], dtype=np.float32)
+    return {"x_min": x - half, "x_max": x + half, "y_min": y - half, "y_max": y + half,
+            "x": x, "y": y, "range": np.hypot(x, y), "points": np.full(x.size, 10)}
+
+
+def test_to_cartesian_axes():
+    x, y, r = to_cartesian(np.array([270.0, 0.0, 180.0]), np.array([1000, 2000, 500]))
+    assert np.allclose(x, [1.0, 0.0, 0.0], atol=1e-6)    # 270 deg is straight ahead
+    assert np.allclose(y, [0.0, -2.0, 0.5], atol=1e-6)   # angles grow clockwise: 0 deg is on the right
+    assert np.allclose(r, [1.0, 2.0, 0.5])
+
+
+def test_segment_splits_separate_objects_and_drops_noise():
+    angle = np.concatenate([np.arange(260.0, 265.0, 0.8), np.arange(275.0, 280.0, 0.8), [100.0]])
+    distance = np.concatenate([np.full(7, 1000.0), np.full(7, 2500.0), [800.0]])
+    clusters = segment(angle, distance)
+    assert clusters["points"].tolist() == [7, 7]                 # the lone point is noise
+    assert sorted(np.round(clusters["range"], 2).tolist()) == [1.0, 2.5]
+
+
+def test_segment_without_points():
+    clusters = segment(np.empty(0), np.empty(0))
+    assert all(values.size == 0 for values in clusters.values())
+
+
+def test_tracks_are_confirmed_after_two_revolutions():
+    tracker = obstacleTracker()
+    assert tracker.update(cluster((1.0, 0.0)), 0.0) == []
+    tracks = tracker.update(cluster((1.0, 0.0)), 0.1)
+    assert len(tracks) == 1 and tracks[0]["ttc"] == math.inf
+
+
+def test_approaching_obstacle_converges_to_its_time_to_collision():
+    tracker = obstacleTracker()
+    speed, dt = 0.5, 0.1
+    for step in range(40):
+        tracks = tracker.update(cluster((3.0 - speed * dt * step, 0.0)), step * dt)
+    (track,) = tracks
+    near = track["x"] - 0.05
+    assert track["vx"] == pytest.approx(-speed, abs=0.02)
+    assert track["ttc"] == pytest.approx(near / speed, rel=0.05)
+
+
+def test_obstacle_outside_the_corridor_has_no_time_to_collision():
+    tracker = obstacleTracker()
+    for step in range(20):
+        tracks = tracker.update(cluster((3.0 - 0.05 * step, 1.0)), step * 0.1)
+    assert tracks[0]["vx"] < 0 and tracks[0]["ttc"] == math.inf
+
+
+def test_lost_tracks_are_dropped():
+    tracker = obstacleTracker()
+    tracker.update(cluster((1.0, 0.0)), 0.0)
+    tracker.update(cluster((1.0, 0.0)), 0.1)
+    for step in range(tracker_module.MAX_MISSED):
+        assert tracker.update(cluster(), 0.2 + 0.1 * step) == []   # missed, not confirmed, but kept
+    assert len(tracker.tracks) == 1
+    tracker.update(cluster(), 1.0)
+    assert tracker.tracks == []
+
+
+def test_closest_pairs_are_associated_first():
+    tracker = obstacleTracker()
+    tracker.update(cluster((1.0, 0.0), (1.0, 0.3)), 0.0)
+    ids = {round(t["y"], 1): t["id"] for t in tracker.update(cluster((1.0, 0.0), (1.0, 0.3)), 0.1)}
+    tracks = tracker.update(cluster((1.0, 0.28), (1.0, 0.02)), 0.2)
+    assert {round(t["y"], 1): t["id"] for t in tracks} == ids
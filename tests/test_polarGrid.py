@@ -0,0 +1,59 @@
+import math
+
+import numpy as np
+import pytest
+
+from src.hardware.Lidar.threads.polarGrid import polarGrid
+
+
+def points(*pairs):
+    angle, distance = zip(*pairs)
+    return np.array(angle, dtype=np.float32), np.array(distance, dtype=np.float32)
+
+
+@pytest.fixture
+def grid():
+    grid = polarGrid()
+    grid.update(*points((0.2, 900), (10.0, 800), (10.3, 500), (90.0, 2000), (270.0, 300), (359.9, 700)))
+    return grid
+
+
+def test_bins_keep_minimum_and_count(grid):
+    assert grid.distance[20] == 500
+    assert grid.count[20] == 2
+    assert grid.count.sum() == 6
+    assert math.isinf(grid.distance[21])
+
+
+def test_arc_end_is_exclusive(grid):
+    assert grid.arc(5.0, 10.5) == (500, 2)
+    assert grid.arc(5.0, 10.0) == (math.inf, 0)
+    assert grid.arc(10.0, 20.0) == (500, 2)
+
+
+def test_arc_wraps_through_zero(grid):
+    assert grid.arc(350.0, 5.0) == (700, 2)
+    assert grid.arc(-10.0, 5.0) == (700, 2)
+    assert grid.arc(350.0, 360.0) == (700, 1)
+
+
+def test_zones_match_arcs(grid):
+    arcs = {"front": (355.0, 15.0), "left": (80.0, 100.0), "rear": (180.0, 200.0), "right": (260.0, 280.0)}
+    assert grid.zones(arcs) == {name: grid.arc(*arc) for name, arc in arcs.items()}
+    assert grid.zones(arcs)["front"] == (500, 4)
+    assert grid.zones(arcs)["rear"] == (math.inf, 0)
+
+
+def test_reset_and_empty_update(grid):
+    grid.reset()
+    grid.update(*[np.empty(0, dtype=np.float32)] * 2)
+    assert grid.arc(0.0, 359.5) == (math.inf, 0)
+    assert grid.count.sum() == 0
+
+
+def test_coarse_bins():
+    grid = polarGrid(bins=36)
+    grid.update(*points((12.0, 400), (19.9, 300)))
+    assert grid.arc(10.0, 20.0) == (300, 2)
+    # Arcs are rounded outwards to whole bins
+    assert grid.arc(15.0, 16.0) == (300, 2)
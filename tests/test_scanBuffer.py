@@ -0,0 +1,105 @@
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from src.hardware.Lidar.threads.scanBuffer import scanBuffer
+
+
+def write_scan(scans, distance, count=10):
+    angle = np.linspace(0, 359, count, dtype=np.float32)
+    scans.writing.append(angle, np.full(count, distance, dtype=np.float32), np.full(count, 100, dtype=np.float32))
+    return scans.publish(time.perf_counter(), 0.0)
+
+
+def test_acquire_times_out_before_first_scan():
+    scans = scanBuffer()
+    assert scans.seq == 0
+    assert scans.acquire(0, timeout=0.01) is None
+
+
+def test_acquire_returns_newest_scan():
+    scans = scanBuffer()
+    assert write_scan(scans, 500) == 1
+    scan = scans.acquire(0, timeout=0)
+
+    assert scan.seq == 1
+    angle, distance, intensity = scan.points()
+    assert angle.size == 10
+    assert distance.tolist() == [500] * 10
+    assert scan.grid.arc(0.0, 359.5) == (500, 10)
+    scans.release(scan)
+    # Nothing newer than the scan already processed
+    assert scans.acquire(scan.seq, timeout=0.01) is None
+
+
+def test_held_slot_is_never_overwritten():
+    scans = scanBuffer(readers=2)
+    write_scan(scans, 1)
+    held = [scans.acquire(0, timeout=0)]
+    write_scan(scans, 2)
+    held.append(scans.acquire(held[0].seq, timeout=0))
+    for distance in range(3, 30):
+        write_scan(scans, distance)
+
+    assert held[0].seq == 1 and held[0].points()[1].tolist() == [1] * 10
+    assert held[1].seq == 2 and held[1].points()[1].tolist() == [2] * 10
+    assert scans.writing not in held
+    for scan in held:
+        scans.release(scan)
+
+
+def test_slow_reader_skips_to_newest():
+    scans = scanBuffer()
+    for distance in (10, 20, 30):
+        write_scan(scans, distance)
+    scan = scans.acquire(0, timeout=0)
+
+    assert scan.seq == 3
+    assert scan.points()[1][0] == 30
+    scans.release(scan)
+
+
+def test_acquire_wakes_on_publish():
+    scans = scanBuffer()
+    result = []
+    reader = threading.Thread(target=lambda: result.append(scans.acquire(0, timeout=2)))
+    reader.start()
+    time.sleep(0.02)
+    write_scan(scans, 700)
+    reader.join(1)
+
+    assert result and result[0].seq == 1
+    scans.release(result[0])
+
+
+def test_points_beyond_capacity_are_dropped_but_gridded():
+    scans = scanBuffer(capacity=8)
+    write_scan(scans, 400, count=12)
+    scan = scans.acquire(0, timeout=0)
+
+    assert scan.size == 8
+    assert scan.dropped == 4
+    assert scan.grid.count.sum() == 12
+    scans.release(scan)
+
+
+def test_publish_clears_the_next_slot():
+    scans = scanBuffer(readers=1)
+    for distance in (1, 2, 3, 4):
+        write_scan(scans, distance)
+    assert scans.writing.size == 0
+    assert scans.writing.grid.count.sum() == 0
+
+
+def test_more_readers_than_slots_is_an_error():
+    scans = scanBuffer(readers=1)
+    write_scan(scans, 1)
+    first = scans.acquire(0, timeout=0)
+    write_scan(scans, 2)
+    second = scans.acquire(first.seq, timeout=0)
+    with pytest.raises(RuntimeError):
+        write_scan(scans, 3)
+    scans.release(first)
+    scans.release(second)
@@ -0,0 +1,140 @@
+import logging
+import queue
+import threading
+import time
+from multiprocessing import Pipe
+
+import pytest
+
+import src.utils.messages.allMessages as allMessages
+from src.gateway.threads.subscriberOutbox import subscriberOutbox
+from src.gateway.threads.threadGateway import threadGateway
+from src.utils.messages.mailboxChannel import mailboxChannel
+
+
+def push_all(outbox, messages, timeout=5.0):
+    """Pushes from another thread, so a blocking write fails the test instead of hanging it."""
+    worker = threading.Thread(target=lambda: [outbox.push(message) for message in messages], daemon=True)
+    worker.start()
+    worker.join(timeout)
+    assert not worker.is_alive(), "push() blocked on a full pipe"
+
+
+@pytest.mark.parametrize("size", [100, 500, 2000, 40000])
+def test_stalled_subscriber_never_blocks(size):
+    receive, send = Pipe(duplex=False)
+    outbox = subscriberOutbox("stalled", send, "dropOldest", capacity=8)
+    push_all(outbox, [bytes(size)] * 5000)
+    assert len(outbox.pending) == 8
+    assert outbox.dropped > 0
+    assert outbox.flush() and not outbox.broken   # still no room, still pending
+
+
+def drain(receive):
+    values = []
+    while receive.poll(0.2):
+        values.append(receive.recv_bytes())
+    return values
+
+
+def message(index):
+    return b"%04d" % index + bytes(96)
+
+
+def fill(outbox):
+    """Pushes 100-byte messages until the pipe is full; returns how many went into the pipe."""
+    count = 0
+    while not outbox.waiting():
+        outbox.push(message(-1))
+        count += 1
+    outbox.pending.clear()
+    return count - 1
+
+
+@pytest.mark.parametrize("policy, expected", [
+    ("dropOldest", [7, 8, 9]),
+    ("dropNewest", [0, 1, 2]),
+    ("coalesceLatest", [9]),
+])
+def test_drop_policies(policy, expected):
+    receive, send = Pipe(duplex=False)
+    outbox = subscriberOutbox("slow", send, policy, capacity=3)
+    inPipe = fill(outbox)
+    for index in range(10):
+        outbox.push(message(index))
+    assert drain(receive) == [message(-1)] * inPipe
+    assert not outbox.flush()
+    assert [int(value[:4]) for value in drain(receive)] == expected
+    assert outbox.dropped == 10 - len(expected)
+
+
+def test_message_larger_than_the_pipe_is_written_in_parts():
+    receive, send = Pipe(duplex=False)
+    outbox = subscriberOutbox("reader", send)
+    big = bytes(range(256)) * 1024          # 256 KiB, four times a default pipe
+    outbox.push(big)
+    outbox.push(b"after")
+    assert outbox.waiting()
+    received = []
+    reader = threading.Thread(target=lambda: received.extend(receive.recv_bytes() for _ in range(2)))
+    reader.start()
+    deadline = time.perf_counter() + 5.0
+    while outbox.flush() and time.perf_counter() < deadline:
+        time.sleep(0.001)
+    reader.join(5.0)
+    assert received == [big, b"after"]
+
+
+def test_closed_subscriber_is_reported_broken():
+    receive, send = Pipe(duplex=False)
+    outbox = subscriberOutbox("gone", send)
+    receive.close()
+    outbox.push(b"value")
+    assert outbox.broken
+
+
+@pytest.fixture
+def gateway():
+    mailboxChannel.create_all(allMessages)
+    queues = {name: queue.Queue() for name in ("Critical", "Warning", "General", "Config", "Log")}
+    thread = threadGateway(queues, logging.getLogger("pytest"), False, outboxSize=4)
+    thread.start()
+    yield thread, queues
+    thread.stop()
+    thread.join(2)
+    mailboxChannel.release_all()
+
+
+def subscribe(queues, receiver, pipe):
+    queues["Config"].put({"Subscribe/Unsubscribe": "subscribe", "Owner": "pytest", "msgID": 1,
+                          "To": {"receiver": receiver, "pipe": pipe}})
+
+
+def test_gateway_keeps_dispatching_with_a_stalled_subscriber(gateway):
+    thread, queues = gateway
+    _, stalledSend = Pipe(duplex=False)
+    liveReceive, liveSend = Pipe(duplex=False)
+    subscribe(queues, "stalled", stalledSend)
+    subscribe(queues, "live", liveSend)
+
+    count = 3000
+    last = "%05d" % (count - 1) + "x" * 95
+    received = []
+
+    def read():
+        while not received or received[-1] != last:
+            received.append(liveReceive.recv()["value"])
+
+    reader = threading.Thread(target=read, daemon=True)
+    reader.start()
+    for index in range(count):
+        queues["General"].put({"Owner": "pytest", "msgID": 1, "msgType": "str", "msgValue": "%05d" % index + "x" * 95})
+    reader.join(10.0)
+
+    # The live subscriber got the whole stream up to the last message (a burst may overflow its outbox too)
+    assert thread.is_alive()
+    assert received[-1] == last
+    assert received == sorted(received)
+    stalled = thread.sendingList["pytest"][1]["stalled"]
+    assert len(stalled.pending) == 4
+    assert stalled.dropped > 0
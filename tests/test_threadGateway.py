@@ -0,0 +1,125 @@
+import logging
+import queue
+from multiprocessing import Pipe
+
+import pytest
+
+import src.utils.messages.allMessages as allMessages
+from src.gateway.threads.threadGateway import threadGateway
+from src.utils.messages.mailboxChannel import mailboxChannel
+
+
+@pytest.fixture
+def queues():
+    mailboxChannel.create_all(allMessages)
+    yield {name: queue.Queue() for name in ("Critical", "Warning", "General", "Config", "Log")}
+    mailboxChannel.release_all()
+
+
+def subscribe(queues, receiver, msgID=1):
+    receive, send = Pipe(duplex=False)
+    queues["Config"].put({"Subscribe/Unsubscribe": "subscribe", "Owner": "pytest", "msgID": msgID,
+                          "To": {"receiver": receiver, "pipe": send}})
+    return receive
+
+
+def put(queues, name, value, msgID=1):
+    queues[name].put({"Owner": "pytest", "msgID": msgID, "msgType": "str", "msgValue": value})
+
+
+def drain(receive):
+    values = []
+    try:
+        while receive.poll(0.05):
+            values.append(receive.recv()["value"])
+    except EOFError:
+        pass   # the gateway dropped (and closed) the sending end
+    return values
+
+
+def test_batch_takes_higher_priorities_first(queues):
+    gateway = threadGateway(queues, logging.getLogger("pytest"), False, batchSize=64)
+    receive = subscribe(queues, "reader")
+    put(queues, "General", "general")
+    put(queues, "Warning", "warning")
+    put(queues, "Critical", "critical")
+    gateway.thread_work()
+    assert drain(receive) == ["critical", "warning", "general"]
+
+
+def test_batch_is_bounded(queues):
+    gateway = threadGateway(queues, logging.getLogger("pytest"), False, batchSize=5)
+    receive = subscribe(queues, "reader")
+    for index in range(12):
+        put(queues, "General", str(index))
+    gateway.thread_work()
+    assert drain(receive) == [str(index) for index in range(5)]
+    gateway.thread_work()
+    gateway.thread_work()
+    assert drain(receive) == [str(index) for index in range(5, 12)]
+
+
+def test_config_is_applied_before_the_batch(queues):
+    gateway = threadGateway(queues, logging.getLogger("pytest"), False)
+    put(queues, "General", "first")
+    receive = subscribe(queues, "late")
+    gateway.thread_work()
+    assert drain(receive) == ["first"]
+
+
+def test_single_mode_forwards_one_message_per_cycle(queues):
+    gateway = threadGateway(queues, logging.getLogger("pytest"), False, dispatchMode="single")
+    receive = subscribe(queues, "reader")
+    gateway.thread_work()                   # applies the subscription
+    put(queues, "General", "a")
+    put(queues, "General", "b")
+    gateway.thread_work()
+    assert drain(receive) == ["a"]
+
+
+def test_routing_index_follows_subscriptions(queues):
+    gateway = threadGateway(queues, logging.getLogger("pytest"), False)
+    first = subscribe(queues, "first")
+    second = subscribe(queues, "second")
+    other = subscribe(queues, "other", msgID=2)
+    gateway.handle_config()
+    assert len(gateway.routes[("pytest", 1)]) == 2
+    assert len(gateway.routes[("pytest", 2)]) == 1
+
+    queues["Config"].put({"Subscribe/Unsubscribe": "unsubscribe", "Owner": "pytest", "msgID": 1,
+                          "To": {"receiver": "first"}})
+    put(queues, "General", "value")
+    gateway.thread_work()
+    assert drain(first) == []
+    assert drain(second) == ["value"]
+    assert drain(other) == []
+    assert [outbox.receiver for outbox in gateway.routes[("pytest", 1)]] == ["second"]
+
+
+def test_resubscribing_replaces_the_stale_pipe(queues):
+    gateway = threadGateway(queues, logging.getLogger("pytest"), False)
+    stale = subscribe(queues, "reader")
+    fresh = subscribe(queues, "reader")
+    put(queues, "General", "value")
+    gateway.thread_work()
+    assert drain(stale) == []
+    assert drain(fresh) == ["value"]
+
+
+def test_closed_subscriber_is_removed_from_the_index(queues):
+    gateway = threadGateway(queues, logging.getLogger("pytest"), False)
+    closed = subscribe(queues, "closed")
+    alive = subscribe(queues, "alive")
+    gateway.handle_config()
+    closed.close()
+    put(queues, "General", "value")
+    gateway.thread_work()
+    assert drain(alive) == ["value"]
+    assert [outbox.receiver for outbox in gateway.routes[("pytest", 1)]] == ["alive"]
+
+
+def test_unsubscribed_messages_are_not_routed(queues):
+    gateway = threadGateway(queues, logging.getLogger("pytest"), False)
+    put(queues, "General", "nobody")
+    gateway.thread_work()
+    assert ("pytest", 1) not in gateway.routes
@@ -0,0 +1,112 @@
+import time
+from multiprocessing import Pipe
+
+from src.templates.threadwithstop import ThreadWithStop
+
+
+class workThread(ThreadWithStop):
+    """Thread recording the start time of every cycle, with a fixed work time."""
+
+    def __init__(self, work=0.0, source=None, **kwargs):
+        super(workThread, self).__init__(**kwargs)
+        self.work = work
+        self.source = source
+        self.starts = []
+        self.received = []
+
+    def thread_work(self):
+        self.starts.append(time.perf_counter())
+        if self.source is not None:
+            while self.source.poll():
+                self.received.append(self.source.recv())
+        if self.work:
+            time.sleep(self.work)
+
+
+def run_for(thread, duration):
+    thread.start()
+    time.sleep(duration)
+    thread.stop()
+    thread.join(1)
+    assert not thread.is_alive()
+
+
+def test_fixed_rate_does_not_drift_with_work_time():
+    thread = workThread(work=0.01, pause=0.02, fixed_rate=True)
+    run_for(thread, 0.5)
+
+    stats = thread.loop_stats()
+    assert stats["period_ms"] == 20
+    assert 40 < stats["rate_hz"] < 55
+    # Sleeping 'pause' after the work would give 1 / 30ms
+    period = (thread.starts[-1] - thread.starts[1]) / (len(thread.starts) - 2)
+    assert period < 0.025
+    assert stats["work_ms"]["mean"] >= 10
+    assert stats["jitter_ms"]["max"] is not None
+
+
+def test_missed_deadlines_are_skipped_not_caught_up():
+    thread = workThread(work=0.05, pause=0.02, fixed_rate=True)
+    run_for(thread, 0.4)
+
+    stats = thread.loop_stats()
+    assert stats["overruns"] > 0
+    assert stats["missed_deadlines"] > 0
+    # No burst of back-to-back cycles after an overrun
+    gaps = [later - earlier for earlier, later in zip(thread.starts[1:], thread.starts[2:])]
+    assert min(gaps) >= 0.05
+
+
+def test_loop_stats_reset():
+    thread = workThread(pause=0.01, fixed_rate=True)
+    run_for(thread, 0.1)
+
+    assert thread.loop_stats(reset=True)["cycles"] > 0
+    stats = thread.loop_stats()
+    assert stats["cycles"] == 0
+    assert stats["rate_hz"] is None
+    assert stats["work_ms"] == {"mean": None, "p99": None, "max": None}
+
+
+def test_wait_on_wakes_before_the_pause():
+    receive, send = Pipe(duplex=False)
+    thread = workThread(source=receive, pause=5)
+    thread.wait_on(receive)
+    thread.start()
+    time.sleep(0.05)
+
+    sent = time.perf_counter()
+    send.send("data")
+    deadline = sent + 1
+    while not thread.received and time.perf_counter() < deadline:
+        time.sleep(0.001)
+
+    assert thread.received == ["data"]
+    assert thread.starts[-1] - sent < 0.5
+    thread.stop()
+    thread.join(1)
+    assert not thread.is_alive()
+
+
+def test_stop_wakes_thread_blocked_on_sources():
+    receive, send = Pipe(duplex=False)
+    thread = workThread(source=receive, pause=5)
+    thread.wait_on(receive, None)
+    run_for(thread, 0.05)
+    assert len(thread.starts) == 1
+
+
+def test_paused_thread_does_no_work_and_stops():
+    thread = workThread(pause=0.005)
+    thread.start()
+    time.sleep(0.02)
+    thread.pause()
+    time.sleep(0.02)
+    cycles = len(thread.starts)
+    time.sleep(0.05)
+
+    assert thread.is_paused()
+    assert len(thread.starts) == cycles
+    thread.stop()
+    thread.join(1)
+    assert not thread.is_alive()